@@ -0,0 +1,50 @@
+"""
+Options of the benchmarks.
+"""
+
+import pytest
+
+
+def pytest_addoption(parser):
+    """
+    Adds the size of synthetic data.
+    """
+
+    group = parser.getgroup("workout_bot benchmarks")
+    group.addoption("--sheet-weeks", type=int, default=52,
+                    help="weeks in a synthetic page")
+    group.addoption("--sheet-workouts", type=int, default=4,
+                    help="merged workouts in a week")
+    group.addoption("--sheet-sets", type=int, default=3,
+                    help="sets in a workout")
+    group.addoption("--sheet-exercises", type=int, default=4,
+                    help="exercises in a set")
+    group.addoption("--sheet-single-row-workouts", type=int, default=2,
+                    help="not merged one-row workouts in a week")
+    group.addoption("--exercise-links", type=int, default=10000,
+                    help="number of exercise links")
+
+
+@pytest.fixture(name="sheet_size")
+def fixture_sheet_size(request):
+    """
+    Size of synthetic page as keyword arguments of generate_page().
+    """
+
+    return {
+        "weeks": request.config.getoption("--sheet-weeks"),
+        "workouts": request.config.getoption("--sheet-workouts"),
+        "sets": request.config.getoption("--sheet-sets"),
+        "exercises": request.config.getoption("--sheet-exercises"),
+        "single_row_workouts":
+            request.config.getoption("--sheet-single-row-workouts")
+    }
+
+
+@pytest.fixture(name="exercise_links_number")
+def fixture_exercise_links_number(request):
+    """
+    Number of exercise links.
+    """
+
+    return request.config.getoption("--exercise-links")
@@ -0,0 +1,77 @@
+"""
+Synthetic Google spreadsheet data of configurable size.
+"""
+
+from datetime import date, timedelta
+
+
+def generate_page(weeks, workouts, sets, exercises, single_row_workouts=0):
+    """
+    Returns cell merges and values of a workout plan page the same as loaded
+    by GoogleSheetsLoader.
+
+    Every week has `workouts` merged workouts of `sets` sets with `exercises`
+    exercises each, followed by `single_row_workouts` not merged one-row
+    workouts.
+    """
+
+    # pylint: disable=too-many-locals
+
+    merges = []
+    values = []
+    week_begin = date(date.today().year, 1, 2)
+    for week in range(weeks):
+        week_end = week_begin + timedelta(days=6)
+        week_row = len(values)
+        for workout in range(workouts):
+            workout_row = len(values)
+            for workout_set in range(sets):
+                row = ["", "", f"{workout_set + 1}\\3\\по готовности"]
+                if workout_set == 0:
+                    row[1] = f"{workout + 1}\nвес примерно 85%+ от ПМ"
+                values.append(row)
+                for exercise in range(exercises):
+                    values.append([
+                        "",
+                        "",
+                        f"упражнение {exercise}",
+                        "3-5",
+                        f"{exercise * 10} кг"
+                    ])
+            merges.append(make_merge(workout_row, len(values), 1))
+        for _ in range(single_row_workouts):
+            values.append(["", "домашняя работа", "растяжка", "10 минут"])
+        values[week_row][0] = \
+            f"{week_begin:%d.%m}-{week_end:%d.%m} неделя {week + 1}"
+        merges.append(make_merge(week_row, len(values), 0))
+        week_begin += timedelta(days=7)
+    return merges, values
+
+
+def make_merge(begin, end, column):
+    """
+    Returns merge of value rows [begin, end) in the column, row indexes are
+    shifted by the header row.
+    """
+
+    return {
+        "sheetId": 1,
+        "startRowIndex": begin + 1,
+        "endRowIndex": end + 1,
+        "startColumnIndex": column,
+        "endColumnIndex": column + 1
+    }
+
+
+def generate_exercise_links(number):
+    """
+    Returns map of exercise names to links, names of generated pages are
+    among them.
+    """
+
+    links = {
+        f"упражнение {index}": f"https://youtu.be/{index}"
+        for index in range(number)
+    }
+    links["растяжка"] = "https://youtu.be/stretching"
+    return links
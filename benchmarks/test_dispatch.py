@@ -0,0 +1,90 @@
+"""
+Benchmarks of message dispatch.
+"""
+
+import asyncio
+import time
+from workout_bot.data_model.users import UserAction
+from tests.behavioral.behavioral_test_fixture import BehavioralTest
+from tests.behavioral.conftest import create_workout_table
+
+# Number of bots constructed one after another in one process
+BOTS_NUMBER = 20
+# Number of messages sent to each bot
+MESSAGES_NUMBER = 200
+
+
+def create_bot(tmp_path):
+    """
+    Creates bot with a training user and an admin authorizing users.
+    """
+
+    tmp_path.mkdir()
+    test = BehavioralTest(tmp_path)
+    table = create_workout_table()
+    test.add_table(table)
+    test.alice = test.add_user_context()
+    test.alice.set_table(table.table_id)
+    test.alice.set_page(list(table.pages)[0])
+    test.alice.set_user_action(UserAction.TRAINING)
+    test.bob = test.add_admin()
+    test.bob.set_user_action(UserAction.ADMIN_USER_AUTHORIZATION)
+    return test
+
+
+async def measure_dispatch(user, text):
+    """
+    Returns mean latency of message dispatch in microseconds.
+    """
+
+    start = time.perf_counter()
+    for _ in range(MESSAGES_NUMBER):
+        await user.send_message(text)
+    elapsed = time.perf_counter() - start
+    # drop answers accumulated by the bot mock
+    while user.bot.get_message(user.chat_with_bot.id) is not None:
+        pass
+    return elapsed / MESSAGES_NUMBER * 1e6
+
+
+async def test_dispatch_latency_flat(tmp_path):
+    """
+    Dispatch latency of the last constructed bot is not much worse than of
+    the first one.
+    """
+
+    latencies = []
+    for index in range(BOTS_NUMBER):
+        test = create_bot(tmp_path / str(index))
+        handled = await measure_dispatch(test.alice, "Все действия")
+        # checked by filters of all admin handlers and not handled
+        rejected = await measure_dispatch(test.bob, "Неизвестно")
+        latencies.append((handled, rejected))
+
+    print()
+    print("bot  handled, us  rejected, us")
+    for index, (handled, rejected) in enumerate(latencies):
+        print(f"{index + 1:3}  {handled:11.1f}  {rejected:12.1f}")
+
+    first_handled, first_rejected = latencies[0]
+    last_handled, last_rejected = latencies[-1]
+    assert last_handled < first_handled * 2
+    assert last_rejected < first_rejected * 2
+
+
+def test_handle_message(benchmark, tmp_path):
+    """
+    Handling of a message from training user with the behavioral mocks.
+    """
+
+    test = create_bot(tmp_path / "bot")
+    loop = asyncio.new_event_loop()
+
+    def handle_message():
+        loop.run_until_complete(test.alice.send_message("Все действия"))
+        return test.alice.bot.get_message(test.alice.chat_with_bot.id)
+
+    try:
+        assert benchmark(handle_message) == "Доступные действия:"
+    finally:
+        loop.close()
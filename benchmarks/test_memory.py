@@ -0,0 +1,116 @@
+"""
+Benchmarks of memory held by parsed workout plans.
+"""
+
+import tracemalloc
+from dataclasses import dataclass
+import pytest
+from workout_bot.google_sheets_feeder.google_sheets_adapter import (
+    GoogleSheetsAdapter
+)
+from .synthetic import generate_page
+
+# Memory is reported per this number of exercises
+EXERCISES_UNIT = 10000
+
+
+@dataclass
+class PlainExercise:
+    """
+    Exercise with instance dictionary as it was stored before slots.
+    """
+
+    description: str
+    reps_window: str = ''
+    weight: str = ''
+
+
+def copy_text(text):
+    """
+    Returns not interned copy of the string, as parsed from Sheets response.
+    """
+
+    return text.encode("utf-8").decode("utf-8")
+
+
+def parse_slotted(sheet_size):
+    """
+    Parses synthetic page into slotted workout classes.
+    """
+
+    merges, values = generate_page(**sheet_size)
+    return GoogleSheetsAdapter().parse_table_page(merges, values)
+
+
+def parse_plain(sheet_size):
+    """
+    Parses synthetic page and replaces exercises with plain dataclasses
+    holding their own strings.
+    """
+
+    weeks = parse_slotted(sheet_size)
+    for week in weeks:
+        for workout in week.workouts:
+            for workout_set in workout.sets:
+                workout_set.exercises = [
+                    PlainExercise(copy_text(exercise.description),
+                                  copy_text(exercise.reps_window),
+                                  copy_text(exercise.weight))
+                    for exercise in workout_set.exercises
+                ]
+    return weeks
+
+
+def count_exercises(weeks):
+    """
+    Returns number of exercises in all the weeks.
+    """
+
+    return sum(len(workout_set.exercises) for week in weeks
+               for workout in week.workouts for workout_set in workout.sets)
+
+
+def measure_retained_memory(parse, sheet_size):
+    """
+    Returns parsed weeks and memory in bytes held by them after the raw page
+    is released.
+    """
+
+    tracemalloc.start()
+    try:
+        weeks = parse(sheet_size)
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return weeks, size
+
+
+@pytest.mark.parametrize("parse", [parse_slotted, parse_plain],
+                         ids=["slotted", "plain"])
+def test_parsed_plan_memory(benchmark, sheet_size, parse):
+    """
+    Memory held by a parsed synthetic page per 10k exercises. Exercises of
+    the plain variant are stored as before slots and interning.
+    """
+
+    weeks, size = measure_retained_memory(parse, sheet_size)
+    exercises = count_exercises(weeks)
+    benchmark.extra_info["bytes_per_10k_exercises"] = \
+        size * EXERCISES_UNIT // exercises
+
+    benchmark(parse, sheet_size)
+
+    assert exercises > 0
+
+
+def test_slotted_plan_memory_is_smaller(sheet_size):
+    """
+    Slotted classes with interned strings hold less memory than plain ones.
+    """
+
+    slotted_weeks, slotted = measure_retained_memory(parse_slotted,
+                                                     sheet_size)
+    plain_weeks, plain = measure_retained_memory(parse_plain, sheet_size)
+
+    assert count_exercises(slotted_weeks) == count_exercises(plain_weeks)
+    assert slotted < plain
@@ -0,0 +1,49 @@
+"""
+Benchmarks of workout plan page parsing.
+"""
+
+from workout_bot.google_sheets_feeder.google_sheets_adapter import (
+    GoogleSheetsAdapter
+)
+from .synthetic import generate_page
+
+
+def test_parse_table_page(benchmark, sheet_size):
+    """
+    Parsing of a synthetic page.
+    """
+
+    merges, values = generate_page(**sheet_size)
+    adapter = GoogleSheetsAdapter()
+
+    weeks = benchmark(adapter.parse_table_page, merges, values)
+
+    assert len(weeks) == sheet_size["weeks"]
+
+
+def test_parse_merges(benchmark, sheet_size):
+    """
+    Parsing of synthetic page merges.
+    """
+
+    merges, values = generate_page(**sheet_size)
+    adapter = GoogleSheetsAdapter()
+
+    week_indexes, _ = benchmark(adapter.parse_merges, merges, values)
+
+    assert len(week_indexes) == sheet_size["weeks"]
+
+
+def test_parse_merges_single_row_workouts(benchmark):
+    """
+    Parsing of merges of a 2000 rows page with many one-row workouts.
+    """
+
+    merges, values = generate_page(weeks=40, workouts=2, sets=2, exercises=3,
+                                   single_row_workouts=34)
+    adapter = GoogleSheetsAdapter()
+
+    _, day_indexes = benchmark(adapter.parse_merges, merges, values)
+
+    assert len(values) == 2000
+    assert len(day_indexes) == 40 * (2 + 34)
@@ -0,0 +1,65 @@
+"""
+Benchmarks of workout messages rendering.
+"""
+
+from workout_bot.data_model.exercise_links import ExerciseLinkMatcher
+from workout_bot.google_sheets_feeder.google_sheets_adapter import (
+    GoogleSheetsAdapter
+)
+from workout_bot.view.workouts import workout_to_text_message
+from .synthetic import generate_exercise_links, generate_page
+
+
+class ExerciseLinksStub:
+    """
+    Exercise links with the matcher only.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, exercise_links):
+        self.matcher = ExerciseLinkMatcher(exercise_links)
+
+    def get_matcher(self):
+        """
+        Returns exercise link matcher.
+        """
+
+        return self.matcher
+
+
+class DataModelStub:
+    """
+    Data model with exercise links only.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, exercise_links):
+        self.exercise_links = ExerciseLinksStub(exercise_links)
+
+
+def test_workout_to_text_message(benchmark, sheet_size,
+                                 exercise_links_number):
+    """
+    Rendering of a synthetic workout with a large links dictionary.
+    """
+
+    merges, values = generate_page(**sheet_size)
+    weeks = GoogleSheetsAdapter().parse_table_page(merges, values)
+    workout = weeks[0].workouts[0]
+    data_model = DataModelStub(generate_exercise_links(exercise_links_number))
+
+    text = benchmark(workout_to_text_message, data_model, workout)
+
+    assert "https://youtu\\.be/0" in text
+
+
+def test_exercise_link_matcher_build(benchmark, exercise_links_number):
+    """
+    Building of the matcher for a large links dictionary.
+    """
+
+    exercise_links = generate_exercise_links(exercise_links_number)
+
+    benchmark(ExerciseLinkMatcher, exercise_links)
@@ -0,0 +1,82 @@
+"""
+Benchmarks of users storage.
+"""
+
+import random
+import pytest
+from workout_bot.data_model.users import Users, UserAction, UserContext
+
+USERS_NUMBERS = [10000, 100000]
+
+
+@pytest.fixture(name="users", scope="module", params=USERS_NUMBERS)
+def fixture_users(request, tmp_path_factory):
+    """
+    Users storage filled with generated users.
+    """
+
+    users_number = request.param
+    path = tmp_path_factory.mktemp(f"users_{users_number}")
+    users = Users(str(path / "users"), flush_size=users_number)
+    for user_id in range(1, users_number + 1):
+        action = UserAction.AWAITING_AUTHORIZATION if user_id % 100 == 0 \
+            else UserAction.TRAINING
+        users.set_user_context(UserContext(
+            user_id=user_id,
+            username=f"user{user_id}",
+            chat_id=user_id,
+            action=action
+        ))
+    users.flush()
+    users.number = users_number
+    yield users
+    users.close()
+
+
+def test_get_user_context(benchmark, users):
+    """
+    Reading of a random user.
+    """
+
+    user_ids = random.Random(0)
+
+    def get_user_context():
+        return users.get_user_context(user_ids.randint(1, users.number))
+
+    assert benchmark(get_user_context) is not None
+
+
+def test_set_user_context(benchmark, users):
+    """
+    Changing of a random user data.
+    """
+
+    user_ids = random.Random(0)
+
+    def set_user_context():
+        user_id = user_ids.randint(1, users.number)
+        users.set_user_input_data(user_id, user_id)
+
+    benchmark(set_user_context)
+    users.flush()
+
+
+def test_get_user_context_by_username(benchmark, users):
+    """
+    Looking up a user by username.
+    """
+
+    user_context = benchmark(users.get_user_context_by_username,
+                             f"@user{users.number}")
+
+    assert user_context.user_id == users.number
+
+
+def test_get_users_awaiting_authorization(benchmark, users):
+    """
+    Selecting users awaiting authorization.
+    """
+
+    awaiting = benchmark(users.get_users_awaiting_authorization)
+
+    assert len(awaiting) == users.number // 100
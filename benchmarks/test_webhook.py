@@ -0,0 +1,83 @@
+"""
+Benchmarks of updates served by webhook.
+"""
+
+import asyncio
+import statistics
+import time
+from workout_bot.data_model.users import UserAction
+from tests.behavioral.behavioral_test_fixture import DataModelMock
+from tests.behavioral.conftest import create_workout_table
+from tests.webhook.webhook_harness import WebhookHarness
+
+# Number of updates posted one after another
+UPDATES_NUMBER = 200
+# Number of chats posting updates at once
+CHATS_NUMBER = 50
+
+
+def create_data_model(tmp_path):
+    """
+    Creates data model with training users, user_id is from 1 to
+    CHATS_NUMBER.
+    """
+
+    data_model = DataModelMock(tmp_path)
+    table = create_workout_table()
+    data_model.workout_plans.update_workout_table(table)
+    data_model.workout_table_names.add_table(table.table_id, table.pages)
+    for user_id in range(1, CHATS_NUMBER + 1):
+        data_model.users.get_or_create_user_context(user_id)
+        data_model.users.set_table_for_user(user_id, table.table_id)
+        data_model.users.set_page_for_user(user_id, list(table.pages)[0])
+        data_model.users.set_user_action(user_id, UserAction.TRAINING)
+    return data_model
+
+
+async def measure_latency(harness, user_id, text):
+    """
+    Returns milliseconds from posting the update to the answer of the bot.
+    """
+
+    start = time.perf_counter()
+    await harness.send_message(user_id, text)
+    answered, answer = await harness.get_message(user_id)
+    assert answer == "Доступные действия:"
+    return (answered - start) * 1e3
+
+
+def print_latencies(name, latencies):
+    """
+    Prints mean, median and 95th percentile of latencies.
+    """
+
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{name:10}  {statistics.mean(latencies):8.2f}  "
+          f"{statistics.median(latencies):10.2f}  {p95:7.2f}")
+
+
+async def test_webhook_latency(tmp_path):
+    """
+    End-to-end latency of updates posted to the webhook one by one and by
+    many chats at once, Bot API is answered locally.
+    """
+
+    async with WebhookHarness(create_data_model(tmp_path)) as harness:
+        sequential = [
+            await measure_latency(harness, 1, "Все действия")
+            for _ in range(UPDATES_NUMBER)
+        ]
+        concurrent = []
+        for _ in range(UPDATES_NUMBER // CHATS_NUMBER):
+            concurrent += await asyncio.gather(*(
+                measure_latency(harness, user_id, "Все действия")
+                for user_id in range(1, CHATS_NUMBER + 1)
+            ))
+
+    print()
+    print("updates     mean, ms  median, ms  p95, ms")
+    print_latencies("sequential", sequential)
+    print_latencies("concurrent", concurrent)
+
+    assert len(concurrent) == UPDATES_NUMBER
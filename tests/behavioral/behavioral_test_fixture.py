@@ -2,6 +2,7 @@
 Infrastructure and mocks for behavioral tests.
 """
 
+import asyncio
 from dataclasses import dataclass
 from telegram.ext import CallbackQueryHandler, CommandHandler, MessageHandler
 from workout_bot.telegram_bot.telegram_bot import TelegramBot
@@ -316,6 +317,7 @@ class DataModelMock(DataModel):
 
     def __init__(self, tmp_path):
         self.updated = False
+        self.updates_number = 0
 
         super().__init__(
             str(tmp_path / self.USERS_STORAGE),
@@ -330,6 +332,7 @@ class DataModelMock(DataModel):
         """
 
         self.updated = True
+        self.updates_number += 1
 
 
 # pylint: disable=too-many-instance-attributes
@@ -352,6 +355,17 @@ class BehavioralTest:
         self.users = []
         self.workout_tables = []
 
+    @staticmethod
+    async def wait_background_tasks():
+        """
+        Waits for completion of tasks started by the bot in background.
+        """
+
+        current = asyncio.current_task()
+        await asyncio.gather(
+            *(task for task in asyncio.all_tasks() if task is not current)
+        )
+
     def add_user(self, first_name="", last_name="", user_name=""):
         """
         Adds user to the test and returns UserMock.
@@ -0,0 +1,35 @@
+"""
+Test several bots in one process.
+"""
+
+from .behavioral_test_fixture import BehavioralTest
+
+
+async def test_bots_have_own_handlers(tmp_path):
+    """
+    Given: two bots are created in one process.
+    When: Alice sends '/about' to the second bot.
+    Then: the number of handlers of the first bot does not change, Alice
+    gets the answer once.
+    """
+
+    (tmp_path / "first").mkdir()
+    (tmp_path / "second").mkdir()
+    first = BehavioralTest(tmp_path / "first")
+    message_handlers = len(first.telegram_bot.controllers.message_handlers)
+    query_handlers = len(first.telegram_bot.controllers.query_handlers)
+    second = BehavioralTest(tmp_path / "second")
+
+    for test in (first, second):
+        controllers = test.telegram_bot.controllers
+        assert len(controllers.message_handlers) == message_handlers
+        assert len(controllers.query_handlers) == query_handlers
+
+    alice = second.add_user()
+    await alice.send_message("/about")
+    alice.expect_answer(
+        "*Бот для тренировок*\n"
+        "Версия: behavioral\\_test\n"
+        "[Github](https://github\\.com/Alexey\\-N\\-Chernyshov/workout\\_bot)"
+    )
+    alice.expect_no_more_answers()
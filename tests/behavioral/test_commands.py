@@ -2,6 +2,8 @@
 Test commands handlers.
 """
 
+from workout_bot.data_model.users import UserAction
+
 
 async def test_command_about(behavioral_test_fixture):
     """
@@ -21,3 +23,61 @@ async def test_command_about(behavioral_test_fixture):
         "[Github](https://github\\.com/Alexey\\-N\\-Chernyshov/workout\\_bot)"
     alice.expect_answer(expected)
     alice.expect_no_more_answers()
+
+
+async def test_command_system_stats_admin(test_alice_training):
+    """
+    Given: Alice is an admin and has requested the same workout twice.
+    When: Alice sends '/system_stats'.
+    Then: Alice is shown statistics with message cache hits and misses.
+    """
+
+    test = test_alice_training
+    alice = test.alice
+    test.data_model.users.set_administrative_permission(alice.user.id)
+    test.data_model.users.set_user_action(alice.user.id, UserAction.TRAINING)
+    await alice.send_message("Перейти к тренировкам")
+    await alice.send_message("Перейти к тренировкам")
+    alice.expect_answer(test.get_expected_workout_text_message(alice))
+    alice.expect_answer(test.get_expected_workout_text_message(alice))
+
+    await alice.send_message("/system_stats")
+
+    update_time = test.data_model.statistics.get_training_plan_update_time()
+    expected = "Системная статистика:\n\n"
+    expected += f"Расписание обновлено: {update_time:%Y-%m-%d %H:%M}\n"
+    expected += "Количество запросов: 2\n"
+    expected += "Количество команд: 1\n"
+    expected += "Количество пользователей: 1\n"
+    expected += "Кэш сообщений: попаданий 1, промахов 1\n"
+    alice.expect_answer(expected)
+    alice.expect_no_more_answers()
+
+
+async def test_command_profile_disabled(behavioral_test_fixture):
+    """
+    Given: Alice is an admin, profiling is disabled.
+    When: Alice sends '/profile'.
+    Then: Alice is told profiling is disabled.
+    """
+
+    alice = behavioral_test_fixture.add_admin()
+
+    await alice.send_message("/profile")
+
+    alice.expect_answer("Профилирование выключено")
+    alice.expect_no_more_answers()
+
+
+async def test_command_profile_not_admin(behavioral_test_fixture):
+    """
+    Given: Alice is a user.
+    When: Alice sends '/profile'.
+    Then: Alice gets no answer.
+    """
+
+    alice = behavioral_test_fixture.add_user_context()
+
+    await alice.send_message("/profile")
+
+    alice.expect_no_more_answers()
@@ -0,0 +1,68 @@
+"""
+Tests of concurrent update handling.
+"""
+
+import asyncio
+import threading
+from workout_bot.data_model.users import UserAction
+from workout_bot.view.tables import get_all_tables_message
+
+TABLE_LINK = "https://docs.google.com/spreadsheets/d/" \
+    "1x2DpoqS9lxUNNWKf5hp4VhHWblWZm-mTTu5I5L3jhtw"
+ABOUT = "*Бот для тренировок*\n" \
+    "Версия: behavioral\\_test\n" \
+    "[Github](https://github\\.com/Alexey\\-N\\-Chernyshov/workout\\_bot)"
+
+
+async def test_slow_update_does_not_block_other_chats(test_table_management):
+    """
+    Given: Alice is an admin adding a table, loading of its pages is slow.
+    When: Bob sends '/about' while the pages are loading.
+    Then: Bob gets the answer before the pages are loaded.
+    """
+
+    test = test_table_management
+    alice = test.users[0]
+    alice.set_user_action(UserAction.ADMIN_ADDING_TABLE)
+    bob = test.add_user()
+    loading = threading.Event()
+    loaded = threading.Event()
+
+    def get_sheet_names(_table_id):
+        loading.set()
+        loaded.wait(5)
+        return []
+
+    test.loader.get_sheet_names = get_sheet_names
+    alice_task = asyncio.create_task(alice.send_message(TABLE_LINK))
+    await asyncio.get_running_loop().run_in_executor(None, loading.wait, 5)
+
+    await bob.send_message("/about")
+
+    bob.expect_answer(ABOUT)
+    bob.expect_no_more_answers()
+    assert not alice_task.done()
+    loaded.set()
+    await alice_task
+    alice.assert_user_action(UserAction.ADMIN_TABLE_MANAGEMENT)
+
+
+async def test_updates_of_chat_are_ordered(test_table_management):
+    """
+    Given: Alice is an admin adding a table.
+    When: Alice sends the table link and then show all tables without
+    waiting for the answer.
+    Then: The link is handled first, the tables are shown after it.
+    """
+
+    test = test_table_management
+    alice = test.users[0]
+    alice.set_user_action(UserAction.ADMIN_ADDING_TABLE)
+
+    await asyncio.gather(alice.send_message(TABLE_LINK),
+                         alice.send_message("Показать все таблицы"))
+
+    assert alice.bot.chats[alice.chat_with_bot.id][-1] == \
+        get_all_tables_message(test.data_model)
+    alice.assert_user_action(UserAction.ADMIN_TABLE_MANAGEMENT)
+    assert len(test.telegram_bot.chat_locks) == 0
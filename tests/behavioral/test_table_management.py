@@ -2,6 +2,7 @@
 Tests related to admin table management.
 """
 
+import pytest
 from workout_bot.data_model.users import UserAction
 from workout_bot.view.tables import (
     get_all_tables_message, get_table_name_message
@@ -163,6 +164,7 @@ async def test_update_tables(test_table_management):
 
     expected = "Идёт обновление таблиц, может занять несколько секунд"
     alice.expect_answer(expected)
+    await test_table_management.wait_background_tasks()
     alice.expect_answer("Таблицы обновлены")
     alice.expect_answer("Управление таблицами")
     alice.expect_no_more_answers()
@@ -170,6 +172,71 @@ async def test_update_tables(test_table_management):
     assert test_table_management.data_model.updated
 
 
+async def test_update_tables_requests_coalesced(test_table_management):
+    """
+    Given: Alice and Bob are admins in ADMIN_TABLE_MANAGEMENT.
+    When: Both send update tables while the update is running.
+    Then: Tables are updated once and both are notified.
+    """
+
+    test = test_table_management
+    alice = test.users[0]
+    bob = test.add_admin()
+    bob.set_user_action(UserAction.ADMIN_TABLE_MANAGEMENT)
+
+    await alice.send_message("Прочитать таблицы")
+    await bob.send_message("Прочитать таблицы")
+    await test.wait_background_tasks()
+
+    assert test.data_model.updates_number == 1
+    expected = "Идёт обновление таблиц, может занять несколько секунд"
+    alice.expect_answer(expected)
+    alice.expect_answer("Таблицы обновлены")
+    alice.expect_answer("Управление таблицами")
+    alice.expect_no_more_answers()
+    bob.expect_answer("Обновление таблиц уже идёт")
+    bob.expect_answer("Таблицы обновлены")
+    bob.expect_answer("Управление таблицами")
+    bob.expect_no_more_answers()
+
+
+async def test_update_tables_notification_failure(test_table_management,
+                                                  monkeypatch, caplog):
+    """
+    Given: Alice is an admin in ADMIN_TABLE_MANAGEMENT.
+    When: Tables are updated, but sending the result to Alice fails.
+    Then: The failure is logged and the next request starts a new update.
+    """
+
+    test = test_table_management
+    alice = test.users[0]
+    bot = test.application.bot
+    send_message = bot.send_message
+
+    async def send_message_failing(chat_id, text, **kwargs):
+        if text == "Таблицы обновлены":
+            raise RuntimeError("Telegram is unavailable")
+        await send_message(chat_id, text, **kwargs)
+
+    monkeypatch.setattr(bot, "send_message", send_message_failing)
+    await alice.send_message("Прочитать таблицы")
+    with pytest.raises(RuntimeError):
+        await test.wait_background_tasks()
+    assert "Tables update task failed" in caplog.text
+
+    monkeypatch.setattr(bot, "send_message", send_message)
+    await alice.send_message("Прочитать таблицы")
+    await test.wait_background_tasks()
+
+    assert test.data_model.updates_number == 2
+    expected = "Идёт обновление таблиц, может занять несколько секунд"
+    alice.expect_answer(expected)
+    alice.expect_answer(expected)
+    alice.expect_answer("Таблицы обновлены")
+    alice.expect_answer("Управление таблицами")
+    alice.expect_no_more_answers()
+
+
 async def test_go_administration(test_table_management):
     """
     Given: Alice is an admin and in ADMIN_TABLE_MANAGEMENT.
@@ -2,7 +2,10 @@
 Tests related to training status.
 """
 
+import datetime
+from freezegun import freeze_time
 from workout_bot.data_model.users import UserAction
+from workout_bot.data_model.workout_plans import WeekRoutine
 from workout_bot.view.workouts import (
     get_workout_text_message, get_week_routine_text_message
 )
@@ -208,6 +211,24 @@ async def test_training_all_action(test_alice_training):
     alice.assert_user_action(UserAction.TRAINING)
 
 
+async def test_training_handler_latency_recorded(test_alice_training):
+    """
+    Given: Alice is TRAINING.
+    When: Alice sends show all message.
+    Then: the handler latency is recorded in metrics.
+    """
+
+    alice = test_alice_training.alice
+
+    await alice.send_message("Все действия")
+
+    registry = test_alice_training.data_model.statistics.registry
+    assert registry.get_sample_value(
+        "workout_bot_handler_seconds_count",
+        {"handler": "handle_all_actions"}
+    ) == 1
+
+
 async def test_training_invalid_plan(test_with_workout_tables):
     """
     Given: Alice is authorized and plan is invalid, and she is TRAINING.
@@ -452,3 +473,158 @@ async def test_go_previous_week(test_alice_training):
     # she gets message with new week number 0
     # she gets message with the last workout of the last week
     expect_week_routine(test_alice_training, 0, 0)
+
+
+async def test_go_current_week(test_alice_training):
+    """
+    Given: Alice is TRAINING in the second workout of the second week.
+    When: Alice goes to the current week during the first week.
+    Then: The current week is the first and current workout is the first.
+    """
+
+    alice = test_alice_training.alice
+    alice.set_week_number(1)
+    alice.set_workout_number(1)
+
+    with freeze_time("2022-08-31"):
+        await alice.send_message("Текущая неделя")
+
+    expect_week_routine(test_alice_training, 0, 0)
+
+
+async def test_go_current_week_after_plan(test_alice_training):
+    """
+    Given: Alice is TRAINING in the first week.
+    When: Alice goes to the current week after the plan is over.
+    Then: The current week is the last and current workout is the first.
+    """
+
+    alice = test_alice_training.alice
+    alice.set_week_number(0)
+    alice.set_workout_number(1)
+
+    with freeze_time("2023-01-10"):
+        await alice.send_message("Текущая неделя")
+
+    expect_week_routine(test_alice_training, 1, 0)
+
+
+async def test_go_current_week_rest_week(test_alice_training):
+    """
+    Given: Alice is TRAINING in the first week, the second week has no
+    workouts.
+    When: Alice goes to the current week during the second week.
+    Then: The current week is the third and current workout is the first.
+    """
+
+    test = test_alice_training
+    first_week, second_week = test.table1.pages[test.plan]
+    rest_week = WeekRoutine(second_week.start_date, second_week.end_date, 2,
+                            [], "rest week")
+    third_week = WeekRoutine(datetime.date(2022, 9, 12),
+                             datetime.date(2022, 9, 18), 3,
+                             second_week.workouts, "week three comment")
+    test.table1.pages[test.plan] = [first_week, rest_week, third_week]
+    test.data_model.workout_plans.update_workout_table(test.table1)
+    test.alice.set_week_number(0)
+    test.alice.set_workout_number(0)
+
+    with freeze_time("2022-09-07"):
+        await test.alice.send_message("Текущая неделя")
+
+    expect_week_routine(test, 2, 0)
+
+
+def set_plan_with_empty_weeks(test):
+    """
+    Replaces the plan of Alice with the plan where the weeks with workouts
+    are surrounded by weeks without workouts: empty, workouts, empty,
+    workouts, empty.
+    """
+
+    first_week, second_week = test.table1.pages[test.plan]
+    test.table1.pages[test.plan] = [
+        WeekRoutine(datetime.date(2022, 8, 22), datetime.date(2022, 8, 28),
+                    1, [], "empty week"),
+        first_week,
+        WeekRoutine(datetime.date(2022, 9, 5), datetime.date(2022, 9, 11),
+                    3, [], "rest week"),
+        second_week,
+        WeekRoutine(datetime.date(2022, 9, 19), datetime.date(2022, 9, 25),
+                    5, [], "empty week"),
+    ]
+    test.data_model.workout_plans.update_workout_table(test.table1)
+
+
+async def test_go_first_week_empty_weeks(test_alice_training):
+    """
+    Given: Alice is TRAINING in the last week with workouts, the plan begins
+    and ends with weeks without workouts.
+    When: Alice goes to the first week.
+    Then: The current week is the first week with workouts.
+    """
+
+    set_plan_with_empty_weeks(test_alice_training)
+    test_alice_training.alice.set_week_number(3)
+    test_alice_training.alice.set_workout_number(1)
+
+    await test_alice_training.alice.send_message("Первая неделя")
+
+    expect_week_routine(test_alice_training, 1, 0)
+
+
+async def test_go_last_week_empty_weeks(test_alice_training):
+    """
+    Given: Alice is TRAINING in the first week with workouts, the plan begins
+    and ends with weeks without workouts.
+    When: Alice goes to the last week.
+    Then: The current week is the last week with workouts.
+    """
+
+    set_plan_with_empty_weeks(test_alice_training)
+    test_alice_training.alice.set_week_number(1)
+    test_alice_training.alice.set_workout_number(1)
+
+    await test_alice_training.alice.send_message("Последняя неделя")
+
+    expect_week_routine(test_alice_training, 3, 0)
+
+
+async def test_go_next_week_empty_weeks(test_alice_training):
+    """
+    Given: Alice is TRAINING, the plan begins and ends with weeks without
+    workouts and has a week without workouts in the middle.
+    When: Alice goes to the next week twice.
+    Then: The week without workouts is skipped, and the last week with
+    workouts is kept.
+    """
+
+    test = test_alice_training
+    set_plan_with_empty_weeks(test)
+    test.alice.set_week_number(1)
+    test.alice.set_workout_number(1)
+
+    await test.alice.send_message("Следующая неделя")
+    expect_week_routine(test, 3, 0)
+    await test.alice.send_message("Следующая неделя")
+    expect_week_routine(test, 3, 0)
+
+
+async def test_go_previous_week_empty_weeks(test_alice_training):
+    """
+    Given: Alice is TRAINING, the plan begins and ends with weeks without
+    workouts and has a week without workouts in the middle.
+    When: Alice goes to the previous week twice.
+    Then: The week without workouts is skipped, and the first week with
+    workouts is kept.
+    """
+
+    test = test_alice_training
+    set_plan_with_empty_weeks(test)
+    test.alice.set_week_number(3)
+    test.alice.set_workout_number(1)
+
+    await test.alice.send_message("Прошлая неделя")
+    expect_week_routine(test, 1, 0)
+    await test.alice.send_message("Прошлая неделя")
+    expect_week_routine(test, 1, 0)
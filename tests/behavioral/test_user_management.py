@@ -164,6 +164,36 @@ async def test_assign_user_table(test_user_management):
     assert waiting.get_user_context().current_table_id == table_id
 
 
+async def test_assign_user_table_keeps_concurrent_change(
+        test_user_management
+):
+    """
+    Given: Admin is in ADMIN_USER_ASSIGNING_TABLE state.
+    When: admin assigns a table, and another chat changes the admin table
+    while the user is notified.
+    Then: admin is in ADMIN_USER_MANAGEMENT state with the changed table.
+    """
+
+    admin = test_user_management.admin
+    admin.set_user_action(UserAction.ADMIN_USER_ASSIGNING_TABLE)
+    waiting = test_user_management.waiting
+    admin.set_user_data(AssignTableUserContext(waiting.user.id))
+    bot = test_user_management.application.bot
+    send_message = bot.send_message
+
+    async def send_message_changing_admin(chat_id, text, **kwargs):
+        if chat_id == waiting.chat_with_bot.id:
+            admin.set_table("other_table_id")
+        await send_message(chat_id, text, **kwargs)
+
+    bot.send_message = send_message_changing_admin
+    await admin.send_message(test_user_management.workout_table.table_name)
+
+    admin.assert_user_action(UserAction.ADMIN_USER_MANAGEMENT)
+    assert admin.get_user_context().current_table_id == "other_table_id"
+    assert admin.get_user_context().user_input_data is None
+
+
 async def test_assign_user_wrong_table(test_user_management):
     """
     Given: Admin is in ADMIN_USER_ASSIGNING_TABLE state and user in
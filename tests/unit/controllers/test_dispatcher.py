@@ -0,0 +1,57 @@
+"""
+Tests for messages dispatching.
+"""
+
+from workout_bot.data_model.users import UserAction
+from workout_bot.controllers.dispatcher import message_filter
+from workout_bot.controllers.dispatcher import MessageDispatcher
+
+
+def make_handler(actions=None, texts=None):
+    """
+    Returns handler with always satisfied filter.
+    """
+
+    @message_filter(actions=actions, texts=texts)
+    def handler_filter(_data_model, _update):
+        return True
+
+    async def handler(_data_model, _update, _context):
+        return True
+
+    return handler_filter, handler
+
+
+def test_dispatcher_by_action_and_text():
+    """
+    Only handlers accepting the action and the text are returned.
+    """
+
+    next_workout = make_handler((UserAction.TRAINING,), ("далее",))
+    any_training = make_handler((UserAction.TRAINING,))
+    blocked = make_handler((UserAction.BLOCKED,))
+    dispatcher = MessageDispatcher([next_workout, any_training, blocked])
+
+    assert dispatcher.get_handlers(UserAction.TRAINING, "далее") == \
+        [next_workout, any_training]
+    assert dispatcher.get_handlers(UserAction.TRAINING, "привет") == \
+        [any_training]
+    assert dispatcher.get_handlers(UserAction.BLOCKED, "далее") == [blocked]
+    assert not dispatcher.get_handlers(UserAction.ADMINISTRATION, "далее")
+
+
+def test_dispatcher_keeps_order():
+    """
+    Handlers are returned in the order of registration, handlers without
+    declared actions and texts accept any message.
+    """
+
+    any_message = make_handler()
+    exact = make_handler((UserAction.TRAINING,), ("далее",))
+    any_text = make_handler((UserAction.TRAINING,))
+    dispatcher = MessageDispatcher([any_text, exact, any_message])
+
+    assert dispatcher.get_handlers(UserAction.TRAINING, "далее") == \
+        [any_text, exact, any_message]
+    assert dispatcher.get_handlers(UserAction.CHOOSING_PLAN, "далее") == \
+        [any_message]
@@ -0,0 +1,278 @@
+"""
+Tests for DataModel.
+"""
+
+import asyncio
+import datetime
+import threading
+from workout_bot.data_model.data_model import DataModel
+from workout_bot.data_model.users import UserAction, UserContext
+from workout_bot.data_model.workout_plans import (
+    WeekRoutine, Workout, WorkoutPlans, WorkoutTable
+)
+
+
+def create_data_model(tmp_path):
+    """
+    Returns data model storing data in tmp_path.
+    """
+
+    return DataModel(str(tmp_path / "users"),
+                     "exercise_links_table_id",
+                     "exercise_links_pagename",
+                     str(tmp_path / "table_ids"))
+
+
+def create_workout_plans(table_name):
+    """
+    Returns workout plans with a single table.
+    """
+
+    workout_plans = WorkoutPlans()
+    workout_plans.update_workout_table(
+        WorkoutTable("table_id", table_name, {})
+    )
+    return workout_plans
+
+
+def test_publish_workout_plans_increments_version(tmp_path):
+    """
+    Every published plans get the next version.
+    """
+
+    data_model = create_data_model(tmp_path)
+    first_version = data_model.data_version
+
+    data_model.publish_workout_plans(create_workout_plans("first"))
+    data_model.publish_workout_plans(create_workout_plans("second"))
+
+    assert data_model.data_version == first_version + 2
+    assert data_model.workout_plans.get_plan_name("table_id") == "second"
+
+
+def test_pinned_workout_plans(tmp_path):
+    """
+    Plans published during a request are not seen by the request, the next
+    request gets them.
+    """
+
+    data_model = create_data_model(tmp_path)
+    data_model.publish_workout_plans(create_workout_plans("old"))
+    old_version = data_model.data_version
+
+    with data_model.pinned_workout_plans() as pinned:
+        data_model.publish_workout_plans(create_workout_plans("new"))
+
+        assert data_model.workout_plans is pinned
+        assert data_model.workout_plans.get_plan_name("table_id") == "old"
+        assert data_model.data_version == old_version
+
+    assert data_model.workout_plans.get_plan_name("table_id") == "new"
+    assert data_model.data_version == old_version + 1
+
+
+async def test_pinned_workout_plans_per_task(tmp_path):
+    """
+    Concurrent requests pin plans independently.
+    """
+
+    data_model = create_data_model(tmp_path)
+    data_model.publish_workout_plans(create_workout_plans("old"))
+    pinned_event = asyncio.Event()
+    published_event = asyncio.Event()
+
+    async def old_request():
+        with data_model.pinned_workout_plans():
+            pinned_event.set()
+            await published_event.wait()
+            return data_model.workout_plans.get_plan_name("table_id")
+
+    async def new_request():
+        await pinned_event.wait()
+        data_model.publish_workout_plans(create_workout_plans("new"))
+        published_event.set()
+        with data_model.pinned_workout_plans():
+            return data_model.workout_plans.get_plan_name("table_id")
+
+    names = await asyncio.gather(old_request(), new_request())
+
+    assert names == ["old", "new"]
+
+
+def test_next_workout_for_user_skips_empty_week(tmp_path):
+    """
+    The next workout after the last workout of a week is the first workout
+    of the next week with workouts, the last workout stays the last.
+    """
+
+    data_model = create_data_model(tmp_path)
+    weeks = [
+        WeekRoutine(datetime.date(2022, 8, 29), datetime.date(2022, 9, 4),
+                    week + 1,
+                    [Workout("workout", [], 1) for _ in range(workouts)],
+                    "")
+        for week, workouts in enumerate((2, 0, 1))
+    ]
+    workout_plans = WorkoutPlans()
+    workout_plans.update_workout_table(
+        WorkoutTable("table_id", "table_name", {"plan": weeks})
+    )
+    data_model.publish_workout_plans(workout_plans)
+    user_context = data_model.users.get_or_create_user_context(1)
+    user_context.current_table_id = "table_id"
+    user_context.current_page = "plan"
+    user_context.current_week = 0
+    user_context.current_workout = 1
+    data_model.users.set_user_context(user_context)
+
+    positions = []
+    for _ in range(2):
+        data_model.next_workout_for_user(1)
+        user_context = data_model.users.get_user_context(1)
+        positions.append((user_context.current_week,
+                          user_context.current_workout))
+
+    assert positions == [(2, 0), (2, 0)]
+
+
+def test_advance_users_to_current_week(tmp_path):
+    """
+    Training users behind the week containing the day are moved to its first
+    workout, other users are not changed.
+    """
+
+    data_model = create_data_model(tmp_path)
+    first_day = datetime.date(2022, 8, 29)
+    weeks = [
+        WeekRoutine(first_day + datetime.timedelta(days=7 * week),
+                    first_day + datetime.timedelta(days=7 * week + 6),
+                    week + 1, [Workout("workout", [], 1)], "")
+        for week in range(3)
+    ]
+    workout_plans = WorkoutPlans()
+    workout_plans.update_workout_table(
+        WorkoutTable("table_id", "table_name", {"plan": weeks})
+    )
+    data_model.publish_workout_plans(workout_plans)
+    for user_id, action, week, page in (
+            (1, UserAction.TRAINING, 0, "plan"),
+            (2, UserAction.TRAINING, 2, "plan"),
+            (3, UserAction.CHOOSING_PLAN, 0, "plan"),
+            (4, UserAction.TRAINING, 0, "absent plan")):
+        data_model.users.set_user_context(UserContext(
+            user_id=user_id, action=action, current_table_id="table_id",
+            current_page=page, current_week=week, current_workout=0
+        ))
+
+    moved = data_model.advance_users_to_current_week(datetime.date(2022, 9, 7))
+
+    assert moved == 1
+    assert [data_model.users.get_user_context(user_id).current_week
+            for user_id in (1, 2, 3, 4)] == [1, 2, 0, 0]
+
+
+def test_next_workout_for_user_from_empty_week(tmp_path):
+    """
+    The next workout of a user on a week without workouts is the first
+    workout of the next week with workouts. A user after the end of a
+    shortened plan stays on its last workout.
+    """
+
+    data_model = create_data_model(tmp_path)
+    weeks = [
+        WeekRoutine(datetime.date(2022, 8, 29), datetime.date(2022, 9, 4),
+                    week + 1,
+                    [Workout("workout", [], 1) for _ in range(workouts)],
+                    "")
+        for week, workouts in enumerate((2, 0, 2))
+    ]
+    workout_plans = WorkoutPlans()
+    workout_plans.update_workout_table(
+        WorkoutTable("table_id", "table_name", {"plan": weeks})
+    )
+    data_model.publish_workout_plans(workout_plans)
+
+    positions = []
+    for week in (1, 7):
+        data_model.users.set_user_context(UserContext(
+            user_id=1, current_table_id="table_id", current_page="plan",
+            current_week=week, current_workout=0
+        ))
+        data_model.next_workout_for_user(1)
+        user_context = data_model.users.get_user_context(1)
+        positions.append((user_context.current_week,
+                          user_context.current_workout))
+
+    assert positions == [(2, 0), (2, 1)]
+
+
+def test_advance_users_over_rest_week(tmp_path):
+    """
+    If the week containing the day has no workouts, training users are moved
+    to the next week with workouts.
+    """
+
+    data_model = create_data_model(tmp_path)
+    first_day = datetime.date(2022, 8, 29)
+    weeks = [
+        WeekRoutine(first_day + datetime.timedelta(days=7 * week),
+                    first_day + datetime.timedelta(days=7 * week + 6),
+                    week + 1,
+                    [Workout("workout", [], 1) for _ in range(workouts)],
+                    "")
+        for week, workouts in enumerate((1, 0, 1))
+    ]
+    workout_plans = WorkoutPlans()
+    workout_plans.update_workout_table(
+        WorkoutTable("table_id", "table_name", {"plan": weeks})
+    )
+    data_model.publish_workout_plans(workout_plans)
+    data_model.users.set_user_context(UserContext(
+        user_id=1, action=UserAction.TRAINING, current_table_id="table_id",
+        current_page="plan", current_week=0, current_workout=0
+    ))
+
+    moved = data_model.advance_users_to_current_week(datetime.date(2022, 9, 7))
+
+    assert moved == 1
+    assert data_model.users.get_user_context(1).current_week == 2
+
+
+def test_advance_users_waits_for_tables_update(tmp_path):
+    """
+    Users are not moved while tables are updated, they are moved by the
+    plans published by the update.
+    """
+
+    data_model = create_data_model(tmp_path)
+    first_day = datetime.date(2022, 8, 29)
+    weeks = [
+        WeekRoutine(first_day + datetime.timedelta(days=7 * week),
+                    first_day + datetime.timedelta(days=7 * week + 6),
+                    week + 1, [Workout("workout", [], 1)], "")
+        for week in range(2)
+    ]
+    data_model.users.set_user_context(UserContext(
+        user_id=1, action=UserAction.TRAINING, current_table_id="table_id",
+        current_page="plan", current_week=0, current_workout=0
+    ))
+    moved = []
+
+    with data_model.update_lock:
+        advance = threading.Thread(target=lambda: moved.append(
+            data_model.advance_users_to_current_week(
+                datetime.date(2022, 9, 7)
+            )
+        ))
+        advance.start()
+        advance.join(0.1)
+        assert advance.is_alive()
+        workout_plans = WorkoutPlans()
+        workout_plans.update_workout_table(
+            WorkoutTable("table_id", "table_name", {"plan": weeks})
+        )
+        data_model.publish_workout_plans(workout_plans)
+    advance.join()
+
+    assert moved == [1]
+    assert data_model.users.get_user_context(1).current_week == 1
@@ -0,0 +1,88 @@
+"""
+Tests for exercise links matcher.
+"""
+
+from workout_bot.data_model.exercise_links import ExerciseLinkMatcher
+
+
+def test_matcher_no_match():
+    """
+    Returns None if no exercise name is in text.
+    """
+
+    matcher = ExerciseLinkMatcher({"squats": "http://squat-link"})
+
+    assert matcher.find("- plank, 1 minute\n") is None
+
+
+def test_matcher_empty_links():
+    """
+    Matcher without links finds nothing.
+    """
+
+    matcher = ExerciseLinkMatcher({})
+
+    assert matcher.find("- plank, 1 minute\n") is None
+
+
+def test_matcher_longest_name_wins():
+    """
+    The longest name is chosen even if a shorter one occurs earlier.
+    """
+
+    matcher = ExerciseLinkMatcher({
+        "squats": "http://squat-link",
+        "goblet squats": "http://goblet-squat-link",
+    })
+    text = "- squats, then Goblet Squats\n"
+
+    begin, end, link = matcher.find(text)
+
+    assert text[begin:end] == "Goblet Squats"
+    assert link == "http://goblet-squat-link"
+
+
+def test_matcher_first_occurrence():
+    """
+    The first occurrence of the name is chosen.
+    """
+
+    matcher = ExerciseLinkMatcher({"plank": "http://plank-link"})
+    text = "- plank and plank\n"
+
+    begin, end, _ = matcher.find(text)
+
+    assert (begin, end) == (2, 7)
+
+
+def test_matcher_overlapping_names():
+    """
+    Names that are suffixes of other names are found inside them.
+    """
+
+    matcher = ExerciseLinkMatcher({
+        "side plank": "http://side-plank-link",
+        "plank jacks": "http://plank-jacks-link",
+    })
+    text = "- side plank jacks\n"
+
+    begin, end, link = matcher.find(text)
+
+    assert text[begin:end] == "plank jacks"
+    assert link == "http://plank-jacks-link"
+
+
+def test_matcher_same_length_keeps_table_order():
+    """
+    Names of the same length are prioritized in the links table order.
+    """
+
+    matcher = ExerciseLinkMatcher({
+        "lunge": "http://lunge-link",
+        "plank": "http://plank-link",
+    })
+    text = "- plank, lunge\n"
+
+    _, _, link = matcher.find(text)
+
+    assert link == "http://lunge-link"
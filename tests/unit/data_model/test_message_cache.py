@@ -0,0 +1,53 @@
+"""
+Tests for rendered messages cache.
+"""
+
+from workout_bot.data_model.message_cache import MessageCache
+
+
+def test_message_cache_hit():
+    """
+    Message is rendered once and then returned from cache.
+    """
+
+    cache = MessageCache()
+    rendered = []
+
+    def render():
+        rendered.append(1)
+        return "message"
+
+    assert cache.get_or_render(("workout", 1), render) == "message"
+    assert cache.get_or_render(("workout", 1), render) == "message"
+    assert len(rendered) == 1
+    assert cache.get_hits() == 1
+    assert cache.get_misses() == 1
+
+
+def test_message_cache_data_version():
+    """
+    Message with a new data version in key is rendered again.
+    """
+
+    cache = MessageCache()
+
+    assert cache.get_or_render(("workout", 1, 0), lambda: "old") == "old"
+    assert cache.get_or_render(("workout", 1, 1), lambda: "new") == "new"
+    assert cache.get_misses() == 2
+
+
+def test_message_cache_evicts_least_recently_used():
+    """
+    The least recently used message is evicted when cache is full.
+    """
+
+    cache = MessageCache(max_size=2)
+    cache.get_or_render("first", lambda: "first")
+    cache.get_or_render("second", lambda: "second")
+    # first is used recently, so second is evicted
+    cache.get_or_render("first", lambda: "unexpected")
+    cache.get_or_render("third", lambda: "third")
+
+    assert cache.get_size() == 2
+    assert cache.get_or_render("first", lambda: "unexpected") == "first"
+    assert cache.get_or_render("second", lambda: "rendered") == "rendered"
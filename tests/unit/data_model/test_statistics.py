@@ -0,0 +1,40 @@
+"""
+Tests for application statistics.
+"""
+
+from workout_bot.data_model.statistics import Statistics
+
+
+def test_statistics_counters():
+    """
+    Requests and commands are counted by metrics.
+    """
+
+    statistics = Statistics()
+
+    statistics.record_request()
+    statistics.record_request()
+    statistics.record_command()
+
+    assert statistics.get_total_requests() == 2
+    assert statistics.get_total_commands() == 1
+    assert Statistics().get_total_requests() == 0
+
+
+def test_statistics_metrics_text():
+    """
+    Metrics are exposed in text exposition format.
+    """
+
+    statistics = Statistics()
+
+    statistics.record_handler("handle_next", 0.01)
+    statistics.record_table_reload("table_id", 2.5)
+    statistics.record_users_read()
+
+    metrics = statistics.get_metrics()
+    assert 'workout_bot_handler_seconds_count{handler="handle_next"} 1.0' \
+        in metrics
+    assert 'workout_bot_table_reload_seconds{table_id="table_id"} 2.5' \
+        in metrics
+    assert "workout_bot_users_reads_total 1.0" in metrics
@@ -2,7 +2,11 @@
 Tests for user data model.
 """
 
+import shelve
+import sqlite3
+import threading
 from workout_bot.data_model.users import Users, UserAction, UserContext
+from workout_bot.data_model.users import JOURNAL_SUFFIX, SQLITE_SUFFIX
 from workout_bot.data_model.users import BlockUserContext
 
 STORAGE = "storage"
@@ -92,3 +96,248 @@ def test_get_user_context_by_short_wrong_username(tmp_path):
 
     assert users.get_user_context_by_short_username("wrong_prefix") is None
     assert users.get_user_context_by_short_username("id: not_a_num") is None
+
+
+def test_get_user_context_by_username(tmp_path):
+    """
+    User is found by username with or without '@'.
+    """
+
+    users = Users(str(tmp_path / STORAGE))
+    users.set_user_context(UserContext(user_id=1, username="alice"))
+    users.set_user_context(UserContext(user_id=2, username="bob"))
+
+    assert users.get_user_context_by_username("alice").user_id == 1
+    assert users.get_user_context_by_username("@bob").user_id == 2
+    assert users.get_user_context_by_username("charlie") is None
+
+
+def test_get_potential_admins(tmp_path):
+    """
+    Potential admins are users neither blocked nor admins.
+    """
+
+    users = Users(str(tmp_path / STORAGE))
+    alice = UserContext(user_id=1, action=UserAction.TRAINING)
+    users.set_user_context(alice)
+    users.set_user_context(UserContext(user_id=2, action=UserAction.BLOCKED))
+    users.set_user_context(UserContext(user_id=3))
+    users.set_administrative_permission(3)
+
+    assert users.get_potential_admins() == {alice}
+    assert users.get_users_number() == 3
+
+
+def test_update_users(tmp_path):
+    """
+    Only users with the action are updated, changed users are stored.
+    """
+
+    storage_path = str(tmp_path / STORAGE)
+    users = Users(storage_path)
+    users.set_user_context(UserContext(user_id=1, action=UserAction.TRAINING,
+                                       current_week=0))
+    users.set_user_context(UserContext(user_id=2, action=UserAction.TRAINING,
+                                       current_week=3))
+    users.set_user_context(UserContext(user_id=3, action=UserAction.BLOCKED,
+                                       current_week=0))
+
+    def advance(user_context):
+        if user_context.current_week >= 2:
+            return False
+        user_context.current_week = 2
+        return True
+
+    assert users.update_users(UserAction.TRAINING, advance) == 1
+    assert count_stored_users(storage_path) == 3
+    assert users.get_user_context(1).current_week == 2
+    assert users.get_user_context(2).current_week == 3
+    assert users.get_user_context(3).current_week == 0
+
+
+def test_concurrent_changes_not_lost(tmp_path):
+    """
+    Changes of different fields of the same user made by several threads
+    are all stored.
+    """
+
+    users = Users(str(tmp_path / STORAGE))
+    users.set_user_context(UserContext(user_id=1))
+
+    def change_action():
+        for _ in range(200):
+            users.set_user_action(1, UserAction.CHOOSING_PLAN)
+        users.set_user_action(1, UserAction.TRAINING)
+
+    def change_data():
+        for number in range(200):
+            users.set_user_input_data(1, number)
+        users.set_user_input_data(1, "done")
+
+    threads = [threading.Thread(target=change_action),
+               threading.Thread(target=change_data)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    user_context = users.get_user_context(1)
+    assert user_context.action == UserAction.TRAINING
+    assert user_context.user_input_data == "done"
+
+
+def test_set_user_action_and_input_data(tmp_path):
+    """
+    Action and input data are set together, other fields are kept.
+    """
+
+    users = Users(str(tmp_path / STORAGE))
+    users.set_user_context(UserContext(user_id=1, current_table_id="table",
+                                       user_input_data="data"))
+
+    users.set_user_action_and_input_data(1, UserAction.ADMIN_USER_BLOCKING,
+                                         BlockUserContext(2))
+
+    user_context = users.get_user_context(1)
+    assert user_context.action == UserAction.ADMIN_USER_BLOCKING
+    assert user_context.user_input_data == BlockUserContext(2)
+    assert user_context.current_table_id == "table"
+
+
+def test_update_user_keeps_batch_changes(tmp_path):
+    """
+    Changes of the user made by update_user() and by concurrent batch
+    updates are all stored.
+    """
+
+    users = Users(str(tmp_path / STORAGE))
+    users.set_user_context(UserContext(user_id=1, action=UserAction.TRAINING,
+                                       current_week=0, current_workout=0))
+
+    def next_workout(user_context):
+        user_context.current_workout += 1
+
+    def next_week(user_context):
+        user_context.current_week += 1
+        return True
+
+    def change_workout():
+        for _ in range(200):
+            users.update_user(1, next_workout)
+
+    def change_week():
+        for _ in range(200):
+            users.update_users(UserAction.TRAINING, next_week)
+
+    threads = [threading.Thread(target=change_workout),
+               threading.Thread(target=change_week)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    user_context = users.get_user_context(1)
+    assert user_context.current_workout == 200
+    assert user_context.current_week == 200
+
+
+def test_migration_from_shelve(tmp_path):
+    """
+    Users are migrated from shelve storage only once.
+    """
+
+    storage_path = str(tmp_path / STORAGE)
+    with shelve.open(storage_path) as storage:
+        storage["1"] = UserContext(user_id=1, username="alice",
+                                   action=UserAction.TRAINING)
+        storage["2"] = UserContext(user_id=2)
+
+    users = Users(storage_path)
+    assert users.get_users_number() == 2
+    assert users.get_user_context_by_username("alice").user_id == 1
+    assert users.get_users_awaiting_authorization() == {UserContext(2)}
+    users.block_user(1)
+    del users
+
+    users = Users(storage_path)
+    assert users.get_users_number() == 2
+    assert users.is_user_blocked(1)
+
+
+def count_stored_users(storage_path):
+    """
+    Returns number of users written to the database file.
+    """
+
+    connection = sqlite3.connect(storage_path + SQLITE_SUFFIX)
+    count = connection.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+    connection.close()
+    return count
+
+
+def test_changes_written_behind(tmp_path):
+    """
+    Changes are written to the database by flush or when flush_size users
+    are changed.
+    """
+
+    storage_path = str(tmp_path / STORAGE)
+    users = Users(storage_path, flush_size=3)
+
+    users.set_user_context(UserContext(user_id=1))
+    users.set_user_context(UserContext(user_id=2))
+    assert count_stored_users(storage_path) == 0
+    assert users.get_user_context(2).user_id == 2
+
+    users.set_user_context(UserContext(user_id=3))
+    assert count_stored_users(storage_path) == 3
+
+    users.set_user_context(UserContext(user_id=4))
+    users.flush()
+    assert count_stored_users(storage_path) == 4
+
+    users.set_user_context(UserContext(user_id=5))
+    users.close()
+    assert count_stored_users(storage_path) == 5
+
+
+def test_changes_recovered_from_journal(tmp_path):
+    """
+    Changes not flushed before crash are recovered from journal, partially
+    written record is ignored.
+    """
+
+    storage_path = str(tmp_path / STORAGE)
+    users = Users(storage_path)
+    users.set_user_context(UserContext(user_id=1))
+    users.set_user_context(UserContext(user_id=2, username="bob"))
+    users.sync_journal()
+    # crash while writing the next record
+    with open(storage_path + JOURNAL_SUFFIX, "ab") as journal:
+        journal.write(b"\x80\x05partial")
+    del users
+
+    users = Users(storage_path)
+    assert count_stored_users(storage_path) == 2
+    assert users.get_user_context_by_username("bob").user_id == 2
+
+
+def test_journal_written_by_sync(tmp_path):
+    """
+    Changes reach the journal file by sync_journal(), flush empties the
+    journal.
+    """
+
+    storage_path = str(tmp_path / STORAGE)
+    journal_path = tmp_path / (STORAGE + JOURNAL_SUFFIX)
+    users = Users(storage_path)
+
+    users.set_user_context(UserContext(user_id=1))
+    assert journal_path.stat().st_size == 0
+
+    users.sync_journal()
+    assert journal_path.stat().st_size > 0
+
+    users.flush()
+    assert journal_path.stat().st_size == 0
+    users.close()
@@ -2,7 +2,17 @@
 Tests for workout plans data model.
 """
 
+import datetime
+import pickle
+from dataclasses import FrozenInstanceError
+import pytest
+from workout_bot.data_model.workout_plans import SNAPSHOT_VERSION
+from workout_bot.data_model.workout_plans import Exercise
+from workout_bot.data_model.workout_plans import Set
+from workout_bot.data_model.workout_plans import WeekRoutine
+from workout_bot.data_model.workout_plans import Workout
 from workout_bot.data_model.workout_plans import WorkoutPlans
+from workout_bot.data_model.workout_plans import WorkoutSequence
 from workout_bot.data_model.workout_plans import WorkoutTable
 
 
@@ -18,3 +28,220 @@ def test_workout_table_ids():
 
     assert workout_plans.is_table_id_present("table_id")
     assert not workout_plans.is_table_id_present("not_present")
+
+
+def test_workout_plans_snapshot(tmp_path):
+    """
+    Workout plans are restored from the saved snapshot.
+    """
+
+    filename = str(tmp_path / "snapshot")
+    workout_set = Set("set", 1, [Exercise("squats", "10", "20 kg")], "3")
+    week = WeekRoutine(datetime.date(2022, 8, 29), datetime.date(2022, 9, 4),
+                       1, [Workout("workout", [workout_set], 1, 1)],
+                       "comment")
+    table = WorkoutTable("table_id", "table_name", {"plan": [week]})
+    workout_plans = WorkoutPlans()
+    workout_plans.update_workout_table(table)
+
+    workout_plans.save_snapshot(filename)
+    loaded = WorkoutPlans.load_snapshot(filename)
+
+    assert loaded.get_workout_table("table_id") == table
+    assert loaded.get_week_routine("table_id", "plan", 0) == week
+
+
+def test_workout_plans_snapshot_absent(tmp_path):
+    """
+    Nothing is loaded if snapshot is absent.
+    """
+
+    assert WorkoutPlans.load_snapshot(str(tmp_path / "absent")) is None
+
+
+def test_workout_plans_snapshot_outdated(tmp_path):
+    """
+    Snapshot of another version or corrupted snapshot is not loaded.
+    """
+
+    outdated = tmp_path / "outdated"
+    with open(outdated, "wb") as snapshot_file:
+        pickle.dump((SNAPSHOT_VERSION - 1, {}), snapshot_file)
+    corrupted = tmp_path / "corrupted"
+    corrupted.write_bytes(b"corrupted")
+
+    assert WorkoutPlans.load_snapshot(str(outdated)) is None
+    assert WorkoutPlans.load_snapshot(str(corrupted)) is None
+
+
+def test_workout_classes_are_slotted():
+    """
+    Workout classes have no instance dictionary, exercises are immutable.
+    """
+
+    exercise = Exercise("squats", "10")
+    workout_set = Set("", 1, [exercise])
+    workout = Workout("workout", [workout_set], 1)
+    week = WeekRoutine(datetime.date(2022, 8, 29), datetime.date(2022, 9, 4),
+                       1, [workout], "")
+
+    for instance in (exercise, workout_set, workout, week):
+        assert not hasattr(instance, "__dict__")
+    assert exercise.weight == ""
+    assert exercise == Exercise("squats", "10", "")
+    with pytest.raises(FrozenInstanceError):
+        exercise.weight = "20 kg"
+    workout_set.rounds = "3"
+    assert workout_set.rounds == "3"
+
+
+def create_weeks(workout_numbers):
+    """
+    Returns weeks with the given numbers of workouts.
+    """
+
+    return [
+        WeekRoutine(datetime.date(2022, 8, 29), datetime.date(2022, 9, 4),
+                    week + 1,
+                    [Workout(f"workout {workout}", [], workout + 1)
+                     for workout in range(workout_number)],
+                    "")
+        for week, workout_number in enumerate(workout_numbers)
+    ]
+
+
+def test_workout_sequence_navigation():
+    """
+    Workouts are navigated across weeks, empty weeks are skipped.
+    """
+
+    sequence = WorkoutSequence(create_weeks([2, 0, 1, 3]))
+
+    assert len(sequence) == 6
+    assert sequence.week_offsets == [0, 2, 2, 3]
+    assert sequence.get_position(sequence.first()) == (0, 0)
+    assert sequence.get_position(sequence.last()) == (3, 2)
+    cursor = sequence.get_cursor(0, 1)
+    assert sequence.get_position(sequence.next(cursor)) == (2, 0)
+    assert sequence.get_position(sequence.previous(cursor)) == (0, 0)
+    assert sequence.next(sequence.last()) == sequence.last()
+    assert sequence.previous(sequence.first()) == sequence.first()
+    assert sequence.get_position(sequence.jump(4)) == (3, 1)
+    assert sequence.jump(100) == sequence.last()
+
+
+def test_workout_sequence_cursor_out_of_week():
+    """
+    Cursor of a missing workout is the last workout before the next week.
+    """
+
+    sequence = WorkoutSequence(create_weeks([2, 0, 1]))
+
+    assert sequence.get_position(sequence.get_cursor(0, 5)) == (0, 1)
+    assert sequence.get_position(
+        sequence.next(sequence.get_cursor(1, 0))
+    ) == (2, 0)
+
+
+def test_workout_sequence_cursor_after_plan_end():
+    """
+    Position after the end of the plan, for example after the plan is
+    shortened, is the last week.
+    """
+
+    sequence = WorkoutSequence(create_weeks([2, 1]))
+
+    assert sequence.get_position(sequence.get_cursor(5, 0)) == (1, 0)
+
+
+def test_workout_sequence_cursor_empty_week():
+    """
+    Cursor of a week without workouts is the next workout, or the last one
+    if there are no workouts after the week.
+    """
+
+    sequence = WorkoutSequence(create_weeks([2, 0, 0, 1, 0]))
+
+    assert sequence.get_position(sequence.get_cursor(1, 0)) == (3, 0)
+    assert sequence.get_position(sequence.get_cursor(2, 3)) == (3, 0)
+    assert sequence.get_position(sequence.get_cursor(4, 0)) == (3, 0)
+
+
+def test_workout_sequence_week_navigation():
+    """
+    Weeks are navigated to their first workouts, empty weeks are skipped.
+    """
+
+    sequence = WorkoutSequence(create_weeks([0, 2, 0, 3, 0]))
+
+    assert sequence.get_position(sequence.week_begin(sequence.last())) == \
+        (3, 0)
+    cursor = sequence.get_cursor(1, 1)
+    assert sequence.get_position(sequence.next_week(cursor)) == (3, 0)
+    assert sequence.get_position(sequence.previous_week(cursor)) == (1, 0)
+    cursor = sequence.get_cursor(3, 2)
+    assert sequence.get_position(sequence.next_week(cursor)) == (3, 0)
+    assert sequence.get_position(sequence.previous_week(cursor)) == (1, 0)
+
+
+def test_workout_plans_sequence():
+    """
+    Workout sequences are built for all the pages of updated table.
+    """
+
+    table = WorkoutTable("table_id", "table_name",
+                         {"plan": create_weeks([1, 2])})
+    workout_plans = WorkoutPlans()
+    workout_plans.update_workout_table(table)
+
+    assert len(workout_plans.get_workout_sequence("table_id", "plan")) == 3
+
+    table = WorkoutTable("table_id", "table_name",
+                         {"new plan": create_weeks([1])})
+    workout_plans.update_workout_table(table)
+
+    assert len(workout_plans.get_workout_sequence("table_id",
+                                                  "new plan")) == 1
+    with pytest.raises(KeyError):
+        workout_plans.get_workout_sequence("table_id", "plan")
+
+
+def test_workout_sequence_find_week():
+    """
+    The week containing the date is found, dates between or outside weeks
+    have no week, weeks may be not sorted by dates.
+    """
+
+    weeks = create_weeks([1, 1, 1])
+    weeks[0].start_date = datetime.date(2023, 1, 9)
+    weeks[0].end_date = datetime.date(2023, 1, 15)
+    weeks[1].start_date = datetime.date(2023, 1, 2)
+    weeks[1].end_date = datetime.date(2023, 1, 8)
+    weeks[2].start_date = datetime.date(2023, 1, 23)
+    weeks[2].end_date = datetime.date(2023, 1, 29)
+    sequence = WorkoutSequence(weeks)
+
+    assert sequence.find_week(datetime.date(2023, 1, 2)) == 1
+    assert sequence.find_week(datetime.date(2023, 1, 8)) == 1
+    assert sequence.find_week(datetime.date(2023, 1, 12)) == 0
+    assert sequence.find_week(datetime.date(2023, 1, 29)) == 2
+    assert sequence.find_week(datetime.date(2023, 1, 1)) is None
+    assert sequence.find_week(datetime.date(2023, 1, 18)) is None
+    assert sequence.find_week(datetime.date(2023, 1, 30)) is None
+
+
+def test_workout_sequence_find_week_without_workouts():
+    """
+    Week without workouts is skipped to the next week with workouts, there
+    is no week if no workouts follow.
+    """
+
+    first_day = datetime.date(2023, 1, 2)
+    weeks = create_weeks([1, 0, 1, 0])
+    for number, week in enumerate(weeks):
+        week.start_date = first_day + datetime.timedelta(days=7 * number)
+        week.end_date = week.start_date + datetime.timedelta(days=6)
+    sequence = WorkoutSequence(weeks)
+
+    assert sequence.find_week(datetime.date(2023, 1, 10)) == 2
+    assert sequence.find_week(datetime.date(2023, 1, 24)) is None
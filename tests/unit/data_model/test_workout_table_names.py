@@ -158,3 +158,21 @@ def test_switch_page_new_table(tmp_path):
     plans = tables.get_plan_names("table_id")
     assert len(plans) == 1
     assert "new page" in plans
+
+
+def test_get_tables_returns_copy(tmp_path):
+    """
+    Returned tables and plans are not changed by later updates.
+    """
+
+    tables = WorkoutTableNames(str(tmp_path / STORAGE))
+    tables.add_table("table", ["page1"])
+
+    stored_tables = tables.get_tables()
+    plans = tables.get_plan_names("table")
+    tables.switch_pages("table", "page2")
+    tables.add_table("other table", ["page1"])
+
+    assert stored_tables == {"table": {"page1"}}
+    assert plans == {"page1"}
+    assert tables.get_plan_names("table") == {"page1", "page2"}
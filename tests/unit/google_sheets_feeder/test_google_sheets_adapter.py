@@ -4,8 +4,11 @@ Tests for GoogleSheetsAdapter
 import datetime
 import os
 from freezegun import freeze_time
-from workout_bot.google_sheets_feeder.google_sheets_adapter \
-    import GoogleSheetsAdapter
+from workout_bot.google_sheets_feeder.google_sheets_adapter import (
+    GoogleSheetsAdapter, ROW_BLANK, ROW_SET, ROW_EXERCISE, ROW_EXERCISE_REPS,
+    ROW_EXERCISE_WEIGHT, ROW_WEEK_BEGIN, ROW_WEEK_END, ROW_WORKOUT_BEGIN,
+    ROW_WORKOUT_END
+)
 from .data.exercises_data import RAW_EXERCISE_DATA, EXPECTED_EXERCISE_DATA
 from .data.workouts_empty import RAW_TABLE_DATA, EXPECTED_WORKOUTS
 from .data.workouts_one_per_line import (
@@ -177,3 +180,139 @@ def test_workout_set_description_without_number():
     workout_set = adapter.parse_workout_set(raw_set_description)
     assert workout_set.number == 2
     assert workout_set.description == "ТА"
+
+
+def test_parse_merges_single_row_workouts():
+    """
+    Rows not covered by workout merges become one-row workouts, merges may
+    come in any order.
+    """
+
+    adapter = GoogleSheetsAdapter()
+    merges = [
+        {"startRowIndex": 4, "endRowIndex": 6,
+         "startColumnIndex": 1, "endColumnIndex": 2},
+        {"startRowIndex": 1, "endRowIndex": 8,
+         "startColumnIndex": 0, "endColumnIndex": 1},
+        {"startRowIndex": 1, "endRowIndex": 3,
+         "startColumnIndex": 1, "endColumnIndex": 2},
+    ]
+    values = [["row"]] * 7
+
+    actual = adapter.parse_merges(merges, values)
+
+    assert actual == ([(0, 7)], [(0, 2), (2, 3), (3, 5), (5, 6), (6, 7)])
+
+
+def test_classify_rows():
+    """
+    Every row is tagged with its content and with week and workout bounds.
+    """
+
+    adapter = GoogleSheetsAdapter()
+    merges = [
+        {"startRowIndex": 1, "endRowIndex": 6,
+         "startColumnIndex": 0, "endColumnIndex": 1},
+        {"startRowIndex": 1, "endRowIndex": 5,
+         "startColumnIndex": 1, "endColumnIndex": 2},
+    ]
+    values = [
+        ["1.01-7.01", "1 тренировка", "1\\ разминка"],
+        ["", "", "приседания"],
+        ["", "", "жим", "10"],
+        ["", "", "тяга", "8", "60"],
+        [],
+    ]
+
+    actual = [tag for _, tag in adapter.classify_rows(merges, values)]
+
+    assert actual == [
+        ROW_SET | ROW_WEEK_BEGIN | ROW_WORKOUT_BEGIN,
+        ROW_EXERCISE,
+        ROW_EXERCISE_REPS,
+        ROW_EXERCISE_WEIGHT | ROW_WORKOUT_END,
+        ROW_BLANK | ROW_WORKOUT_BEGIN | ROW_WORKOUT_END | ROW_WEEK_END,
+    ]
+
+
+def test_parse_table_page_numbers_weeks():
+    """
+    Weeks of the page are parsed in order and numbered from 1.
+    """
+
+    adapter = GoogleSheetsAdapter()
+    merges = [
+        {"startRowIndex": 1, "endRowIndex": 3,
+         "startColumnIndex": 0, "endColumnIndex": 1},
+        {"startRowIndex": 3, "endRowIndex": 5,
+         "startColumnIndex": 0, "endColumnIndex": 1},
+        {"startRowIndex": 1, "endRowIndex": 3,
+         "startColumnIndex": 1, "endColumnIndex": 2},
+        {"startRowIndex": 3, "endRowIndex": 5,
+         "startColumnIndex": 1, "endColumnIndex": 2},
+    ]
+    values = [
+        ["2.01-8.01", "1 тренировка", "1\\ разминка"],
+        ["", "", "приседания"],
+        ["9.01-15.01", "1 тренировка", "1\\ разминка"],
+        ["", "", "жим"],
+    ]
+
+    weeks = adapter.parse_table_page(merges, values)
+
+    assert [week.number for week in weeks] == [1, 2]
+    assert weeks[0].workouts[0].sets[0].exercises[0].description == \
+        "приседания"
+    assert weeks[1].workouts[0].sets[0].exercises[0].description == "жим"
+
+
+def test_rows_after_last_week():
+    """
+    Rows after the last week merge do not end the week again and do not add
+    workouts to it.
+    """
+
+    adapter = GoogleSheetsAdapter()
+    merges = [
+        {"startRowIndex": 1, "endRowIndex": 3,
+         "startColumnIndex": 0, "endColumnIndex": 1},
+        {"startRowIndex": 3, "endRowIndex": 5,
+         "startColumnIndex": 0, "endColumnIndex": 1},
+        {"startRowIndex": 1, "endRowIndex": 3,
+         "startColumnIndex": 1, "endColumnIndex": 2},
+        {"startRowIndex": 3, "endRowIndex": 5,
+         "startColumnIndex": 1, "endColumnIndex": 2},
+    ]
+    values = [
+        ["2.01-8.01", "1 тренировка", "1\\ разминка"],
+        ["", "", "приседания"],
+        ["9.01-15.01", "1 тренировка", "1\\ разминка"],
+        ["", "", "жим"],
+        [],
+        ["", "заметка", "тяга"],
+    ]
+
+    tags = [tag for _, tag in adapter.classify_rows(merges, values)]
+    weeks = adapter.parse_table_page(merges, values)
+
+    assert [bool(tag & ROW_WEEK_END) for tag in tags] == \
+        [False, True, False, True, False, False]
+    assert [week.number for week in weeks] == [1, 2]
+    assert len(weeks[1].workouts) == 1
+
+
+def test_page_without_merges():
+    """
+    Page without week merges has no weeks.
+    """
+
+    adapter = GoogleSheetsAdapter()
+    values = [
+        ["", "заметка"],
+        ["", "", "приседания"],
+    ]
+
+    tags = [tag for _, tag in adapter.classify_rows([], values)]
+
+    assert not any(tag & (ROW_WEEK_BEGIN | ROW_WEEK_END) for tag in tags)
+    assert not adapter.parse_table_page([], values)
@@ -2,6 +2,12 @@
 Tests for GoogleSheetsFeeder.
 """
 
+import threading
+from workout_bot.data_model.workout_plans import WorkoutPlans, WorkoutTable
+from workout_bot.google_sheets_feeder.google_sheets_feeder import (
+    GoogleSheetsFeeder
+)
+
 
 class GoogleSheetsLoaderMock:
     """
@@ -31,6 +37,13 @@ class GoogleSheetsLoaderMock:
 
         self.callback()
 
+    def get_table_values_and_merges(self, table_id, pagenames):
+        """
+        Mock function, returns callback result.
+        """
+
+        return self.callback(table_id, pagenames)
+
 
 class GoogleSheetsAdapterMock:
     """
@@ -39,6 +52,7 @@ class GoogleSheetsAdapterMock:
 
     def __init__(self, callback):
         self.callback = callback
+        self.parsed_pages = []
 
     def parse_exercise_links(self, values):
         """
@@ -54,6 +68,32 @@ class GoogleSheetsAdapterMock:
         Mock function, calls callback.
         """
 
+    def parse_table_page(self, merges, values):
+        """
+        Mock function, records parsed page and returns no weeks.
+        """
+
+        self.parsed_pages.append((merges, values))
+        return []
+
+
+class WorkoutTableNamesStub:
+    """
+    Stub of WorkoutTableNames.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, tables):
+        self.tables = tables
+
+    def get_tables(self):
+        """
+        Returns all the tables.
+        """
+
+        return self.tables
+
 
 def success_callback():
     """
@@ -61,3 +101,114 @@ def success_callback():
     """
 
     return None
+
+
+def table_callback(table_id, pagenames):
+    """
+    Returns loaded table named after table_id with empty pages.
+    """
+
+    return ("name " + table_id, {page: ([], []) for page in pagenames})
+
+
+def test_get_workouts_loads_all_tables():
+    """
+    All tables with all pages are loaded.
+    """
+
+    feeder = GoogleSheetsFeeder(GoogleSheetsLoaderMock(table_callback),
+                                GoogleSheetsAdapterMock(success_callback))
+    workout_tables = WorkoutTableNamesStub({
+        "table_1": {"page_1", "page_2"},
+        "table_2": {"page_1"}
+    })
+
+    plans = feeder.get_workouts(workout_tables)
+
+    assert plans.get_table_names() == {"name table_1", "name table_2"}
+    assert set(plans.get_workout_table("table_1").pages) == {"page_1",
+                                                             "page_2"}
+    assert set(plans.get_workout_table("table_2").pages) == {"page_1"}
+
+
+def test_get_workouts_loads_tables_concurrently():
+    """
+    Tables are loaded in parallel by several workers.
+    """
+
+    barrier = threading.Barrier(2, timeout=5)
+
+    def callback(table_id, pagenames):
+        # both tables must be loading at the same time to pass the barrier
+        barrier.wait()
+        return table_callback(table_id, pagenames)
+
+    feeder = GoogleSheetsFeeder(GoogleSheetsLoaderMock(callback),
+                                GoogleSheetsAdapterMock(success_callback),
+                                max_workers=2)
+    workout_tables = WorkoutTableNamesStub({
+        "table_1": {"page"},
+        "table_2": {"page"}
+    })
+
+    plans = feeder.get_workouts(workout_tables)
+
+    assert plans.is_table_id_present("table_1")
+    assert plans.is_table_id_present("table_2")
+
+
+def test_get_workouts_failed_table_is_isolated():
+    """
+    Table failed to load doesn't affect other tables, the previously loaded
+    version of the failed table is kept.
+    """
+
+    def callback(table_id, pagenames):
+        if table_id in ("broken", "new_broken"):
+            # loader returns None on error
+            return None
+        return table_callback(table_id, pagenames)
+
+    previous_table = WorkoutTable("broken", "previous", {})
+    previous_plans = WorkoutPlans()
+    previous_plans.update_workout_table(previous_table)
+    feeder = GoogleSheetsFeeder(GoogleSheetsLoaderMock(callback),
+                                GoogleSheetsAdapterMock(success_callback))
+    workout_tables = WorkoutTableNamesStub({
+        "broken": {"page"},
+        "table": {"page"},
+        "new_broken": {"page"}
+    })
+
+    plans = feeder.get_workouts(workout_tables, previous_plans)
+
+    assert plans.get_workout_table("broken") is previous_table
+    assert plans.get_plan_name("table") == "name table"
+    assert not plans.is_table_id_present("new_broken")
+
+
+def test_get_workouts_parses_only_changed_pages():
+    """
+    Unchanged pages are not parsed again, parsed weeks are reused.
+    """
+
+    table = {
+        "page_1": ([], [["1"]]),
+        "page_2": ([], [["2"]])
+    }
+    adapter = GoogleSheetsAdapterMock(success_callback)
+    feeder = GoogleSheetsFeeder(
+        GoogleSheetsLoaderMock(lambda table_id, _: ("name", dict(table))),
+        adapter
+    )
+    workout_tables = WorkoutTableNamesStub({"table": {"page_1", "page_2"}})
+
+    first = feeder.get_workouts(workout_tables)
+    assert len(adapter.parsed_pages) == 2
+
+    table["page_2"] = ([], [["changed"]])
+    second = feeder.get_workouts(workout_tables)
+
+    assert adapter.parsed_pages[2:] == [([], [["changed"]])]
+    assert second.get_workout_table("table").pages["page_1"] is \
+        first.get_workout_table("table").pages["page_1"]
@@ -0,0 +1,235 @@
+"""
+Tests for GoogleSheetsLoader.
+"""
+
+import threading
+from workout_bot.data_model.statistics import Statistics
+from workout_bot.google_sheets_feeder import google_sheets_loader
+from workout_bot.google_sheets_feeder.google_sheets_loader import (
+    GoogleSheetsLoader, get_range_title
+)
+
+
+class RequestMock:
+    """
+    Mock of Google API request.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, result):
+        self.result = result
+
+    def execute(self):
+        """
+        Returns predefined result.
+        """
+
+        return self.result
+
+
+class SheetsServiceMock:
+    """
+    Mock of Google Sheets service, returns the same data for any request.
+    """
+
+    def __init__(self, on_request=None):
+        self.on_request = on_request
+        self.sheets = [{"properties": {"title": "page"}, "merges": []}]
+
+    def spreadsheets(self):
+        """
+        Returns spreadsheets resource.
+        """
+
+        return self
+
+    def values(self):
+        """
+        Returns values resource.
+        """
+
+        return self
+
+    def get(self, **_kwargs):
+        """
+        Returns request for metadata or values.
+        """
+
+        if self.on_request:
+            self.on_request()
+        return RequestMock({
+            "properties": {"title": "table"},
+            "sheets": self.sheets,
+            "values": [["header"], ["value"]]
+        })
+
+    def batchGet(self, ranges, **_kwargs):
+        """
+        Returns request for values of several ranges.
+        """
+
+        # pylint: disable=invalid-name
+
+        if self.on_request:
+            self.on_request()
+        return RequestMock({
+            "valueRanges": [
+                {"range": name, "values": [["header"], [name]]}
+                for name in ranges
+            ]
+        })
+
+
+class CredentialsMock:
+    """
+    Mock of Google credentials.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    valid = True
+
+
+def mock_google_api(monkeypatch, on_request=None):
+    """
+    Replaces credentials loading and service building with mocks.
+    Returns the list of built services.
+    """
+
+    services = []
+
+    def build(*_args, **_kwargs):
+        services.append(SheetsServiceMock(on_request))
+        return services[-1]
+
+    credentials = []
+
+    def get_credentials(_self, _google_token_file):
+        credentials.append(CredentialsMock())
+        return credentials[-1]
+
+    monkeypatch.setattr(google_sheets_loader, "build", build)
+    monkeypatch.setattr(GoogleSheetsLoader, "get_credentials",
+                        get_credentials)
+    return services, credentials
+
+
+def test_service_is_reused(monkeypatch):
+    """
+    Credentials are read and service is built only once for many requests.
+    """
+
+    services, credentials = mock_google_api(monkeypatch)
+    loader = GoogleSheetsLoader()
+
+    for _ in range(3):
+        assert loader.get_values_and_merges("table_id", "page") == \
+            ("table", [], [["value"]])
+        assert loader.get_values("table_id", "page") == [["value"]]
+        assert loader.get_sheet_names("table_id") == ["page"]
+
+    assert len(services) == 1
+    assert len(credentials) == 1
+
+
+def test_service_per_concurrent_thread(monkeypatch):
+    """
+    Concurrent threads don't share a service.
+    """
+
+    barrier = threading.Barrier(2, timeout=5)
+    services, _ = mock_google_api(monkeypatch, barrier.wait)
+    loader = GoogleSheetsLoader()
+
+    threads = [
+        threading.Thread(target=loader.get_values, args=("table_id", "page"))
+        for _ in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(services) == 2
+    assert not barrier.broken
+
+
+def test_table_values_and_merges_loaded_in_two_requests(monkeypatch):
+    """
+    All pages of the table are loaded with one metadata request and one
+    values request.
+    """
+
+    requests = []
+    services, _ = mock_google_api(monkeypatch, lambda: requests.append(1))
+    loader = GoogleSheetsLoader()
+    merge = {"startRowIndex": 1, "endRowIndex": 3,
+             "startColumnIndex": 0, "endColumnIndex": 1}
+    with loader.service() as service:
+        service.sheets = [
+            {"properties": {"title": "page_1"}, "merges": [merge]},
+            {"properties": {"title": "page_2"}}
+        ]
+
+    actual = loader.get_table_values_and_merges("table_id",
+                                                ["page_1", "page_2"])
+
+    assert actual == ("table", {
+        "page_1": ([merge], [["page_1!A:E"]]),
+        "page_2": ([], [["page_2!A:E"]])
+    })
+    assert len(requests) == 2
+    assert len(services) == 1
+
+
+def test_page_without_sheet_is_reported(monkeypatch, caplog):
+    """
+    A page without sheet in the spreadsheet metadata is parsed without
+    merges and a warning is logged.
+    """
+
+    mock_google_api(monkeypatch)
+    loader = GoogleSheetsLoader()
+
+    _, pages = loader.get_table_values_and_merges("table_id", ["Page"])
+
+    assert pages["Page"] == ([], [["Page!A:E"]])
+    assert "No sheet Page in table_id" in caplog.text
+
+
+def test_range_title():
+    """
+    Sheet title is taken from the range, quotes are removed.
+    """
+
+    assert get_range_title("Plan!A1:E100") == "Plan"
+    assert get_range_title("'My plan'!A1:E100") == "My plan"
+    assert get_range_title("'Alice''s plan'!A1:E100") == "Alice's plan"
+
+
+def test_requests_statistics(monkeypatch):
+    """
+    Every Sheets API request is recorded by its method.
+    """
+
+    mock_google_api(monkeypatch)
+    statistics = Statistics()
+    loader = GoogleSheetsLoader(statistics)
+
+    loader.get_values_and_merges("table_id", "page")
+    loader.get_sheet_names("table_id")
+
+    registry = statistics.registry
+    assert registry.get_sample_value(
+        "workout_bot_sheets_requests_total",
+        {"method": "spreadsheets.get"}
+    ) == 2
+    assert registry.get_sample_value(
+        "workout_bot_sheets_request_seconds_count",
+        {"method": "spreadsheets.values.get"}
+    ) == 1
+    assert registry.get_sample_value(
+        "workout_bot_sheets_errors_total",
+        {"method": "spreadsheets.get"}
+    ) is None
@@ -0,0 +1,72 @@
+"""
+Tests for hot paths profiler.
+"""
+
+import pytest
+from workout_bot.performance.profiler import Profiler
+
+
+def test_profiler_disabled():
+    """
+    Disabled profiler records nothing.
+    """
+
+    profiler = Profiler()
+
+    @profiler.profiled("square")
+    def square(value):
+        return value * value
+
+    assert square(3) == 9
+    assert not profiler.get_top()
+
+
+def test_profiler_top():
+    """
+    Paths are ordered by 95th percentile of the latest calls.
+    """
+
+    profiler = Profiler(window=10)
+    for _ in range(20):
+        profiler.record("fast", 0.001)
+    for _ in range(3):
+        profiler.record("slow", 0.1)
+
+    top = profiler.get_top()
+
+    assert [path for path, *_ in top] == ["slow", "fast"]
+    path, calls, mean, median, p95, maximum = top[1]
+    assert (path, calls) == ("fast", 20)
+    assert mean == pytest.approx(0.001)
+    assert median == p95 == maximum == 0.001
+    assert len(profiler.get_top(1)) == 1
+    assert profiler.format_top().splitlines()[1].startswith("slow 3 100.00")
+
+
+async def test_profiler_enabled():
+    """
+    Enabled profiler records calls of functions and coroutines, attributes
+    of decorated functions are kept.
+    """
+
+    profiler = Profiler()
+    profiler.enabled = True
+
+    @profiler.profiled("handler_filter")
+    def handler_filter():
+        return True
+
+    handler_filter.actions = None
+
+    @profiler.profiled_async("handler")
+    async def handler():
+        return True
+
+    wrapped_filter = profiler.profiled("wrapped")(handler_filter)
+
+    assert handler_filter()
+    assert wrapped_filter()
+    assert await handler()
+    assert wrapped_filter.actions is None
+    calls = {path: calls for path, calls, *_ in profiler.get_top()}
+    assert calls == {"handler_filter": 2, "wrapped": 1, "handler": 1}
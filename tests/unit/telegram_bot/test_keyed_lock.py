@@ -0,0 +1,67 @@
+"""
+Tests for KeyedLock.
+"""
+
+import asyncio
+from workout_bot.telegram_bot.keyed_lock import KeyedLock
+
+
+async def test_same_key_in_order():
+    """
+    Coroutines with the same key run one by one in order of acquiring.
+    """
+
+    lock = KeyedLock()
+    events = []
+
+    async def hold(name, delay):
+        async with lock.acquire("key"):
+            events.append(name + " begin")
+            await asyncio.sleep(delay)
+            events.append(name + " end")
+
+    await asyncio.gather(hold("first", 0.02), hold("second", 0),
+                         hold("third", 0))
+
+    assert events == ["first begin", "first end", "second begin",
+                      "second end", "third begin", "third end"]
+    assert len(lock) == 0
+
+
+async def test_different_keys_concurrently():
+    """
+    Coroutines with different keys do not wait for each other.
+    """
+
+    lock = KeyedLock()
+    second_done = asyncio.Event()
+
+    async def first():
+        async with lock.acquire(1):
+            await asyncio.wait_for(second_done.wait(), 1)
+
+    async def second():
+        async with lock.acquire(2):
+            second_done.set()
+
+    await asyncio.gather(first(), second())
+
+    assert len(lock) == 0
+
+
+async def test_released_on_error():
+    """
+    The lock is released and removed if the holder fails.
+    """
+
+    lock = KeyedLock()
+
+    try:
+        async with lock.acquire("key"):
+            raise ValueError()
+    except ValueError:
+        pass
+
+    assert len(lock) == 0
+    async with lock.acquire("key"):
+        assert len(lock) == 1
@@ -0,0 +1,80 @@
+"""
+Tests for the request context of update.
+"""
+
+from workout_bot.data_model.users import Users
+from workout_bot.data_model.workout_table_names import WorkoutTableNames
+from workout_bot.telegram_bot.request_context import RequestContext
+
+
+class TelegramUserStub:
+    """
+    Telegram user stub.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, user_id):
+        self.id = user_id  # pylint: disable=invalid-name
+
+
+class UsersStub(Users):
+    """
+    Counts user contexts loaded from storage.
+    """
+
+    def __init__(self, filename):
+        super().__init__(filename)
+        self.loads = 0
+
+    def get_user_context(self, user_id):
+        self.loads += 1
+        return super().get_user_context(user_id)
+
+
+class DataModelStub:
+    """
+    Data model with users and workout table names only.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, tmp_path):
+        self.users = UsersStub(str(tmp_path / "users"))
+        self.workout_table_names = WorkoutTableNames(
+            str(tmp_path / "tables")
+        )
+
+
+def test_request_context_loads_user_once(tmp_path):
+    """
+    The user context is loaded once for all filters and handlers.
+    """
+
+    data_model = DataModelStub(tmp_path)
+    request = RequestContext(data_model, None, TelegramUserStub(1),
+                             " Далее ")
+
+    assert request.text == "далее"
+    user_context = request.user_context
+    assert user_context.user_id == 1
+    assert request.user_context is user_context
+    assert data_model.users.loads == 1
+
+
+def test_request_context_plan_valid(tmp_path):
+    """
+    Plan is valid if the table and the page of the user are present.
+    """
+
+    data_model = DataModelStub(tmp_path)
+    data_model.workout_table_names.add_table("table_id", ["plan"])
+    data_model.users.get_or_create_user_context(1)
+    data_model.users.set_table_for_user(1, "table_id")
+    data_model.users.set_page_for_user(1, "plan")
+    data_model.users.get_or_create_user_context(2)
+    data_model.users.set_table_for_user(2, "table_id")
+
+    assert RequestContext(data_model, None, TelegramUserStub(1)).plan_valid
+    assert not RequestContext(data_model, None,
+                              TelegramUserStub(2)).plan_valid
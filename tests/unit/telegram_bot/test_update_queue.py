@@ -0,0 +1,27 @@
+"""
+Tests for PendingUpdatesQueue.
+"""
+
+import asyncio
+from workout_bot.telegram_bot.update_queue import PendingUpdatesQueue
+
+
+async def test_put_waits_for_handled_update():
+    """
+    Taken but not handled updates are pending, put() waits until one of them
+    is handled.
+    """
+
+    queue = PendingUpdatesQueue(2)
+    await queue.put(1)
+    await queue.put(2)
+    await queue.get()
+    await queue.get()
+
+    put_task = asyncio.create_task(queue.put(3))
+    await asyncio.sleep(0)
+    assert not put_task.done()
+
+    queue.task_done()
+    await asyncio.wait_for(put_task, 1)
+    assert await queue.get() == 3
@@ -4,6 +4,7 @@ Tests for workout representation.
 
 import datetime
 from dataclasses import dataclass
+from workout_bot.data_model.exercise_links import ExerciseLinkMatcher
 from workout_bot.data_model.workout_plans import Exercise
 from workout_bot.data_model.workout_plans import Set
 from workout_bot.data_model.workout_plans import Workout
@@ -36,6 +37,13 @@ class StubDataModel:
 
             return self.exercise_links
 
+        def get_matcher(self):
+            """
+            Returns matcher built from the exercise links.
+            """
+
+            return ExerciseLinkMatcher(self.exercise_links)
+
     @dataclass
     class StubWorkoutPlans:
         """
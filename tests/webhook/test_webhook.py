@@ -0,0 +1,76 @@
+"""
+Tests for serving webhook.
+"""
+
+import asyncio
+from http import HTTPStatus
+import pytest
+from workout_bot.telegram_bot.telegram_bot import webhook_arguments
+from tests.behavioral.behavioral_test_fixture import DataModelMock
+from .webhook_harness import WebhookHarness
+
+
+async def test_update_handled(tmp_path):
+    """
+    Update posted to the webhook is handled and answered by the bot.
+    """
+
+    async with WebhookHarness(DataModelMock(tmp_path)) as harness:
+        status = await harness.send_message(1, "/about")
+        _, text = await harness.get_message(1)
+
+    assert status == HTTPStatus.OK
+    assert text.startswith("*Бот для тренировок*")
+
+
+async def test_secret_token_checked(tmp_path):
+    """
+    Updates without the secret token or with a wrong one are rejected and not
+    handled.
+    """
+
+    async with WebhookHarness(DataModelMock(tmp_path)) as harness:
+        missing = await harness.send_message(1, "/about", secret_token=None)
+        wrong = await harness.send_message(1, "/about", secret_token="wrong")
+        await harness.send_message(2, "/about")
+        await harness.get_message(2)
+
+    assert missing == HTTPStatus.FORBIDDEN
+    assert wrong == HTTPStatus.FORBIDDEN
+    assert harness.api.get_chat(1).empty()
+
+
+async def test_backpressure(tmp_path):
+    """
+    While the limit of updates is pending, the webhook does not answer, so
+    Telegram holds the next updates.
+    """
+
+    async with WebhookHarness(DataModelMock(tmp_path),
+                              pending_updates=1) as harness:
+        harness.api.sending_allowed.clear()
+        try:
+            assert await harness.send_message(1, "/about") == HTTPStatus.OK
+            second = asyncio.create_task(harness.send_message(2, "/about"))
+            await asyncio.sleep(0.2)
+            assert not second.done()
+        finally:
+            harness.api.sending_allowed.set()
+        assert await asyncio.wait_for(second, 5) == HTTPStatus.OK
+        await harness.get_message(1)
+        await harness.get_message(2)
+
+
+def test_webhook_arguments():
+    """
+    Listener defaults to the local host, url and secret token are required.
+    """
+
+    arguments = webhook_arguments({"url": "https://example.com/path",
+                                   "secret_token": "secret"})
+
+    assert arguments["listen"] == "127.0.0.1"
+    assert arguments["webhook_url"] == "https://example.com/path"
+    assert arguments["secret_token"] == "secret"
+    with pytest.raises(KeyError):
+        webhook_arguments({"url": "https://example.com/path"})
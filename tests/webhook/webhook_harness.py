@@ -0,0 +1,195 @@
+"""
+Runs the bot serving webhook on a local port without Telegram. Synthetic
+updates are posted to the endpoint the same way Telegram does, Bot API
+requests of the bot are answered locally.
+"""
+
+import asyncio
+import json
+import socket
+import time
+from http import HTTPStatus
+import httpx
+from telegram.request import BaseRequest
+from workout_bot.telegram_bot.telegram_bot import (
+    TelegramBot, build_application, webhook_arguments
+)
+from tests.behavioral.behavioral_test_fixture import LoaderMock
+
+BOT_TOKEN = "123456:webhook-harness"
+SECRET_TOKEN = "webhook-harness-secret"
+URL_PATH = "webhook"
+BOT_USER = {
+    "id": 123456,
+    "is_bot": True,
+    "first_name": "workout_bot",
+    "username": "workout_bot"
+}
+CONCURRENT_UPDATES = 16
+PENDING_UPDATES = 256
+
+
+def free_port():
+    """
+    Returns a port that is free on the local host.
+    """
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TelegramApiMock(BaseRequest):
+    """
+    Answers Bot API requests without network. Messages sent by the bot are
+    recorded with the time they are sent, sending may be held to emulate slow
+    Bot API.
+    """
+
+    def __init__(self):
+        # map chat_id -> asyncio.Queue of (perf_counter time, text)
+        self.chats = {}
+        self.message_id = 0
+        # sendMessage waits while the event is cleared
+        self.sending_allowed = asyncio.Event()
+        self.sending_allowed.set()
+
+    async def initialize(self):
+        """
+        Nothing to initialize.
+        """
+
+    async def shutdown(self):
+        """
+        Nothing to shut down.
+        """
+
+    def get_chat(self, chat_id):
+        """
+        Returns the queue of messages sent to the chat.
+        """
+
+        if chat_id not in self.chats:
+            self.chats[chat_id] = asyncio.Queue()
+        return self.chats[chat_id]
+
+    async def do_request(self, url, method, *_args, request_data=None,
+                         **_kwargs):
+        """
+        Answers getMe, sendMessage and any other method with success.
+        """
+
+        api_method = url.rsplit("/", 1)[-1]
+        parameters = request_data.parameters if request_data else {}
+        result = True
+        if api_method == "getMe":
+            result = BOT_USER
+        elif api_method == "sendMessage":
+            await self.sending_allowed.wait()
+            chat_id = int(parameters["chat_id"])
+            self.get_chat(chat_id).put_nowait(
+                (time.perf_counter(), parameters["text"])
+            )
+            self.message_id += 1
+            result = {
+                "message_id": self.message_id,
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "text": parameters["text"]
+            }
+        return HTTPStatus.OK, \
+            json.dumps({"ok": True, "result": result}).encode()
+
+
+class WebhookHarness:
+    """
+    The bot with the real python-telegram-bot application serving webhook
+    on a local port. Is used as async context manager.
+    """
+
+    def __init__(self, data_model, port=None,
+                 pending_updates=PENDING_UPDATES):
+        self.api = TelegramApiMock()
+        self.application = build_application(BOT_TOKEN, self.api,
+                                             CONCURRENT_UPDATES,
+                                             pending_updates)
+        self.telegram_bot = TelegramBot(self.application, LoaderMock(),
+                                        data_model, "webhook_harness")
+        if port is None:
+            port = free_port()
+        self.webhook = {
+            "port": port,
+            "url_path": URL_PATH,
+            "url": f"https://example.com/{URL_PATH}",
+            "secret_token": SECRET_TOKEN
+        }
+        self.url = f"http://127.0.0.1:{port}/{URL_PATH}"
+        self.update_id = 0
+        self.client = None
+
+    async def __aenter__(self):
+        await self.application.initialize()
+        await self.application.updater.start_webhook(
+            **webhook_arguments(self.webhook)
+        )
+        await self.application.start()
+        self.client = httpx.AsyncClient()
+        return self
+
+    async def __aexit__(self, *_exc_info):
+        await self.client.aclose()
+        await self.application.updater.stop()
+        await self.application.stop()
+        await self.application.shutdown()
+
+    async def post_update(self, update, secret_token=SECRET_TOKEN):
+        """
+        Posts update JSON to the webhook, returns HTTP status code.
+        """
+
+        headers = {"Content-Type": "application/json"}
+        if secret_token is not None:
+            headers["X-Telegram-Bot-Api-Secret-Token"] = secret_token
+        response = await self.client.post(self.url, headers=headers,
+                                          content=json.dumps(update))
+        return response.status_code
+
+    def create_message_update(self, user_id, text):
+        """
+        Returns update JSON of a private text message from the user, commands
+        are marked as Telegram does.
+        """
+
+        self.update_id += 1
+        message = {
+            "message_id": self.update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "User"},
+            "text": text
+        }
+        if text.startswith("/"):
+            message["entities"] = [{
+                "type": "bot_command",
+                "offset": 0,
+                "length": len(text.split()[0])
+            }]
+        return {"update_id": self.update_id, "message": message}
+
+    async def send_message(self, user_id, text, secret_token=SECRET_TOKEN):
+        """
+        Posts a text message from the user, returns HTTP status code.
+        """
+
+        return await self.post_update(
+            self.create_message_update(user_id, text),
+            secret_token
+        )
+
+    async def get_message(self, chat_id):
+        """
+        Waits for a message sent by the bot to the chat, returns
+        (perf_counter time, text).
+        """
+
+        return await self.api.get_chat(chat_id).get()
@@ -3,22 +3,35 @@ Telegram bot for workouts app entry point.
 """
 
 import asyncio
+import functools
 import logging
+import signal
 import time
 import threading
 from pathlib import Path
 import schedule
 import yaml
 
-from telegram.ext import ApplicationBuilder
 from data_model.data_model import DataModel
-from telegram_bot.telegram_bot import TelegramBot
-from google_sheets_feeder.google_sheets_loader import (
-    GoogleSheetsLoader
-)
+from data_model.users import DEFAULT_FLUSH_SIZE
+from telegram_bot.telegram_bot import TelegramBot, build_application
+from telegram_bot.timed_request import TimedRequest
+from performance.profiler import profiler
+from google_sheets_feeder.google_sheets_feeder import DEFAULT_LOADING_WORKERS
 
 VERSION_FILE_NAME = 'git_commit_version.txt'
 TELEGRAM_TOKEN_FILE = "secrets/telegram_token.txt"
+CONFIG_FILE = "secrets/config.yml"
+# Seconds between writes of changed users to the storage
+USERS_FLUSH_INTERVAL = 5
+# Seconds between syncs of the users journal, changes made after the last
+# sync may be lost on crash
+USERS_JOURNAL_SYNC_INTERVAL = 1
+# Updates handled concurrently, updates of one chat are handled in order
+CONCURRENT_UPDATES = 16
+# Updates received and not handled yet, receiving waits while the limit is
+# reached
+PENDING_UPDATES = 256
 
 
 logging.basicConfig(
@@ -27,43 +40,110 @@ logging.basicConfig(
 )
 
 
-def init_data_model():
+def read_config():
+    """
+    Reads configuration file.
+    """
+
+    with open(CONFIG_FILE, encoding="utf-8") as config_file:
+        return yaml.safe_load(config_file)
+
+
+def init_data_model(config):
     """
     Initializes data model.
     """
 
-    with open("secrets/config.yml", encoding="utf-8") as config_file:
-        config = yaml.safe_load(config_file)
-        table_id = config["spreadsheet_id"]
-        pagenames = config["pagenames"]
-        admins = config["admins"]
-        users_storage = config["users_storage"]
-        exercise_links_table_id = config["exercise_links_table_id"]
-        exercise_links_pagename = config["exercise_links_pagename"]
-        workout_table_ids_storage = config["workout_table_ids_storage"]
-
-        data_model = DataModel(users_storage,
-                               exercise_links_table_id,
-                               exercise_links_pagename,
-                               workout_table_ids_storage)
-        data_model.workout_table_names.add_table(table_id, pagenames)
-        for admin in admins:
-            user_id = int(admin)
-            if not data_model.users.is_present(user_id):
-                data_model.users.get_or_create_user_context(user_id)
-                data_model.users.set_table_for_user(user_id, table_id)
-            data_model.users.set_administrative_permission(user_id)
+    table_id = config["spreadsheet_id"]
+    pagenames = config["pagenames"]
+    admins = config["admins"]
+    users_storage = config["users_storage"]
+    exercise_links_table_id = config["exercise_links_table_id"]
+    exercise_links_pagename = config["exercise_links_pagename"]
+    workout_table_ids_storage = config["workout_table_ids_storage"]
+    loading_workers = config.get("loading_workers",
+                                 DEFAULT_LOADING_WORKERS)
+    workout_plans_snapshot = config.get("workout_plans_snapshot")
+    users_flush_size = config.get("users_flush_size", DEFAULT_FLUSH_SIZE)
+
+    data_model = DataModel(users_storage,
+                           exercise_links_table_id,
+                           exercise_links_pagename,
+                           workout_table_ids_storage,
+                           loading_workers=loading_workers,
+                           snapshot_filename=workout_plans_snapshot,
+                           users_flush_size=users_flush_size)
+    data_model.workout_table_names.add_table(table_id, pagenames)
+    for admin in admins:
+        user_id = int(admin)
+        if not data_model.users.is_present(user_id):
+            data_model.users.get_or_create_user_context(user_id)
+            data_model.users.set_table_for_user(user_id, table_id)
+        data_model.users.set_administrative_permission(user_id)
+    if data_model.load_snapshot():
+        # serve the snapshot while the latest tables are loading
+        logging.info("Workout plans snapshot loaded")
+        update_thread = threading.Thread(target=data_model.update_tables)
+        update_thread.daemon = True
+        update_thread.start()
+    else:
         data_model.update_tables()
 
-        return data_model
+    return data_model
+
+
+def log_profile():
+    """
+    Logs the slowest profiled calls. Is called by the event loop, not in a
+    signal handler, as the profiler lock may be held by the interrupted code.
+    """
+
+    logging.info("Profile, ms:\n%s", profiler.format_top())
+
+
+def logged_job(job):
+    """
+    Wraps scheduled job, so its exception is logged and does not stop other
+    jobs.
+    """
+
+    @functools.wraps(job)
+    def wrapper():
+        try:
+            job()
+        except Exception:  # pylint: disable=broad-except
+            logging.exception("Scheduled job %s failed", job.__name__)
+
+    return wrapper
 
 
-def scheduler(data_model):
+def scheduler(data_model, users_flush_interval, advance_week=False):
     """
-    Schedules google table updates daily at 3 a.m.
+    Schedules google table updates daily at 3 a.m., periodic users flush and
+    journal sync. If advance_week is set, users are moved to the current week
+    in the same job right after the update, even if the update fails.
     """
 
-    schedule.every().day.at("03:00").do(data_model.update_tables)
+    update_tables = logged_job(data_model.update_tables)
+    advance_users = logged_job(data_model.advance_users_to_current_week)
+
+    def update_tables_and_advance_users():
+        """
+        Updates tables, then moves users by the updated plans.
+        """
+
+        update_tables()
+        advance_users()
+
+    schedule.every().day.at("03:00").do(
+        update_tables_and_advance_users if advance_week else update_tables
+    )
+    schedule.every(users_flush_interval).seconds.do(
+        logged_job(data_model.users.flush)
+    )
+    schedule.every(USERS_JOURNAL_SYNC_INTERVAL).seconds.do(
+        logged_job(data_model.users.sync_journal)
+    )
     while True:
         schedule.run_pending()
         time.sleep(1)
@@ -82,31 +162,56 @@ def main():
             version = file.readline().strip()
             logging.info("workout_bot %s", version)
 
+    config = read_config()
+    app_data_model = init_data_model(config)
+    users_flush_interval = config.get("users_flush_interval",
+                                      USERS_FLUSH_INTERVAL)
+    if config.get("profiling", False):
+        # the report is shown by /profile command or logged on SIGUSR1
+        profiler.enabled = True
+        logging.info("Profiling enabled")
+    metrics_port = config.get("metrics_port")
+    if metrics_port:
+        app_data_model.statistics.start_metrics_server(metrics_port)
+        logging.info("Metrics are exposed on port %s", metrics_port)
+
     with open(TELEGRAM_TOKEN_FILE, encoding="utf-8") as token_file:
         telegram_bot_token = token_file.readline().strip()
-    telegram_application = ApplicationBuilder() \
-        .token(telegram_bot_token).build()
-
-    app_data_model = init_data_model()
+    telegram_application = build_application(
+        telegram_bot_token,
+        TimedRequest(app_data_model.statistics),
+        config.get("concurrent_updates", CONCURRENT_UPDATES),
+        config.get("pending_updates", PENDING_UPDATES)
+    )
 
+    # the loader is shared to reuse its credentials and Sheets services
     bot = TelegramBot(
         telegram_application,
-        GoogleSheetsLoader(),
+        app_data_model.feeder.loader,
         app_data_model,
         version
     )
 
     schedule_thread = threading.Thread(
         target=scheduler,
-        args=(app_data_model,)
+        args=(app_data_model, users_flush_interval,
+              config.get("advance_to_current_week", False))
     )
     schedule_thread.daemon = True
     schedule_thread.start()
 
     loop = asyncio.get_event_loop()
+    if profiler.enabled and hasattr(signal, "SIGUSR1"):
+        loop.add_signal_handler(signal.SIGUSR1, log_profile)
     loop.run_until_complete(bot.register_commands())
 
-    bot.start_bot()
+    # webhook section: url, secret_token, optional listen, port, url_path
+    # and max_connections, long polling is used without it
+    webhook = config.get("webhook")
+    if webhook:
+        logging.info("Serving webhook %s", webhook["url"])
+    bot.start_bot(webhook)
+    app_data_model.users.close()
 
 
 if __name__ == "__main__":
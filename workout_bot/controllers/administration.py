@@ -4,7 +4,7 @@ Administration related messages handlers.
 
 from telegram import KeyboardButton, ReplyKeyboardMarkup
 from data_model.users import UserAction
-from telegram_bot.utils import get_user_context
+from .dispatcher import message_filter
 
 
 async def show_admin_panel(bot, chat_id, user_context):
@@ -32,16 +32,16 @@ def handle_go_administration():
     Handles go to administration.
     """
 
-    def handler_filter(data_model, update):
+    @message_filter(actions=(UserAction.ADMIN_USER_MANAGEMENT,
+                             UserAction.ADMIN_TABLE_MANAGEMENT,
+                             UserAction.TRAINING),
+                    texts=("администрирование",))
+    def handler_filter(_data_model, _update):
         """
         Admin in ADMIN_TABLE_MANAGEMENT state.
         """
-        user_context = get_user_context(data_model, update)
-        message_text = update.message.text.strip().lower()
-        return (user_context.action in (UserAction.ADMIN_USER_MANAGEMENT,
-                                        UserAction.ADMIN_TABLE_MANAGEMENT,
-                                        UserAction.TRAINING)
-                and message_text == "администрирование")
+
+        return True
 
     async def handler(data_model, update, context):
         """
@@ -2,18 +2,22 @@
 Authorization messages handlers.
 """
 
+from data_model.users import UserAction
+from .dispatcher import message_filter
+
 
 def handle_blocked():
     """
     Shows blocking message for blocked users.
     """
 
-    def handler_filter(data_model, update):
+    @message_filter(actions=(UserAction.BLOCKED,))
+    def handler_filter(_data_model, _update):
         """
         Checks if user is blocked.
         """
 
-        return data_model.users.is_user_blocked(update.message.from_user.id)
+        return True
 
     async def handler(_data_model, update, context):
         """
@@ -33,13 +37,13 @@ def handle_unauthorized():
     Asks unathorized users wait for authorization.
     """
 
-    def handler_filter(data_model, update):
+    @message_filter(actions=(UserAction.AWAITING_AUTHORIZATION,))
+    def handler_filter(_data_model, _update):
         """
         Checks if user unauthorized.
         """
 
-        return data_model.users \
-            .is_user_awaiting_authorization(update.message.from_user.id)
+        return True
 
     async def handler(_data_model, update, context):
         await context.bot.send_message(
@@ -2,7 +2,10 @@
 All controllers for telegram bot interaction.
 """
 
+import time
 from dataclasses import dataclass
+from performance.profiler import profiler
+from .dispatcher import MessageDispatcher, get_handler_name
 from .authorization import authorization_handlers
 from .administration import administration_message_handlers
 from .training_management import training_management_message_handlers
@@ -10,33 +13,54 @@ from .table_management import TableManagementController
 from .user_management import user_management_message_handlers
 
 
+def profiled_handler(handler_filter, handler):
+    """
+    Returns filter and handler pair timed by profiler when it is enabled.
+    """
+
+    name = get_handler_name(handler)
+    return (profiler.profiled(name + ".filter")(handler_filter),
+            profiler.profiled_async(name + ".handler")(handler))
+
+
 @dataclass
 class Controllers:
     """
     One place of all controllers used in the bot.
     """
 
-    message_handlers = []
-    query_handlers = []
-
     def __init__(self, loader, data_model):
         table_management = TableManagementController(loader, data_model)
-        self.message_handlers.extend(authorization_handlers)
-        self.message_handlers.extend(administration_message_handlers)
-        self.message_handlers.extend(training_management_message_handlers)
-        self.message_handlers.extend(table_management.message_handlers())
-        self.message_handlers.extend(user_management_message_handlers)
-
-        self.query_handlers.extend(table_management.query_handlers())
+        # handlers are registered per instance, several bots may coexist
+        self.message_handlers = [
+            profiled_handler(handler_filter, handler)
+            for handler_filter, handler in (
+                *authorization_handlers,
+                *administration_message_handlers,
+                *training_management_message_handlers,
+                *table_management.message_handlers(),
+                *user_management_message_handlers
+            )
+        ]
+        self.query_handlers = [
+            profiled_handler(handler_filter, handler)
+            for handler_filter, handler in table_management.query_handlers()
+        ]
+        self.message_dispatcher = MessageDispatcher(self.message_handlers)
 
     async def handle_message(self, data_model, update, context):
         """
         Calls the first handler that satisfies the filter.
+
+        Only handlers accepting the user action and the message text are
+        checked. Update is a RequestContext shared by filters and handlers.
         """
 
-        for handler_filter, handler in self.message_handlers:
+        for handler_filter, handler in self.message_dispatcher.get_handlers(
+                update.user_context.action, update.text):
             if handler_filter(data_model, update):
-                return await handler(data_model, update, context)
+                return await self.call_handler(handler, data_model, update,
+                                               context)
         return False
 
     async def handle_query(self, data_model, update, context):
@@ -46,5 +70,21 @@ class Controllers:
 
         for handler_filter, handler in self.query_handlers:
             if handler_filter(data_model, update):
-                return await handler(data_model, update, context)
+                return await self.call_handler(handler, data_model, update,
+                                               context)
         return False
+
+    @staticmethod
+    async def call_handler(handler, data_model, update, context):
+        """
+        Calls handler and records its latency.
+        """
+
+        start = time.perf_counter()
+        try:
+            return await handler(data_model, update, context)
+        finally:
+            data_model.statistics.record_handler(
+                get_handler_name(handler),
+                time.perf_counter() - start
+            )
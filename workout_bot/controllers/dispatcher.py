@@ -0,0 +1,82 @@
+"""
+Dispatching of messages to handlers.
+"""
+
+from data_model.users import UserAction
+
+
+def get_handler_name(handler):
+    """
+    Returns name of the function creating handler, for example
+    `handle_next` or `TableManagementController.handle_show_tables`.
+    """
+
+    return handler.__qualname__.split(".<locals>", 1)[0]
+
+
+def message_filter(actions=None, texts=None):
+    """
+    Decorator for message handler filter.
+
+    Declares user actions and normalized (stripped, lowercase) message texts
+    the handler accepts, None means any. The filter itself checks only the
+    rest of conditions.
+    """
+
+    def decorator(handler_filter):
+        handler_filter.actions = None if actions is None \
+            else frozenset(actions)
+        handler_filter.texts = None if texts is None else frozenset(texts)
+        return handler_filter
+
+    return decorator
+
+
+class MessageDispatcher:
+    """
+    Index of message handlers by user action and normalized message text.
+
+    Handlers keep the order of registration, so the first handler which
+    filter is satisfied is still the one to be called.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, handlers):
+        # map action -> {text -> [(handler_filter, handler)]}
+        self.__by_text = {}
+        # map action -> [(handler_filter, handler)] accepting any text
+        self.__any_text = {}
+
+        for action in UserAction:
+            accepted = [
+                (handler_filter, handler)
+                for handler_filter, handler in handlers
+                if getattr(handler_filter, "actions", None) is None
+                or action in handler_filter.actions
+            ]
+            self.__any_text[action] = [
+                (handler_filter, handler)
+                for handler_filter, handler in accepted
+                if getattr(handler_filter, "texts", None) is None
+            ]
+            texts = set()
+            for handler_filter, _ in accepted:
+                texts.update(getattr(handler_filter, "texts", None) or ())
+            self.__by_text[action] = {
+                text: [
+                    (handler_filter, handler)
+                    for handler_filter, handler in accepted
+                    if getattr(handler_filter, "texts", None) is None
+                    or text in handler_filter.texts
+                ]
+                for text in texts
+            }
+
+    def get_handlers(self, action, text):
+        """
+        Returns handlers accepting user action and normalized message text in
+        the order of registration.
+        """
+
+        return self.__by_text[action].get(text, self.__any_text[action])
@@ -2,6 +2,8 @@
 Provides user interaction for table manamegent.
 """
 
+import asyncio
+import logging
 from telegram import (
     KeyboardButton, ReplyKeyboardMarkup, InlineKeyboardButton,
     InlineKeyboardMarkup
@@ -13,6 +15,16 @@ from view.tables import (
 from view.utils import escape_text
 from google_sheets_feeder.utils import get_table_id_from_link
 from telegram_bot.utils import get_user_context
+from .dispatcher import message_filter
+
+
+def log_update_failure(task):
+    """
+    Logs the exception of the finished tables update task, so it is not lost.
+    """
+
+    if not task.cancelled() and task.exception() is not None:
+        logging.error("Tables update task failed", exc_info=task.exception())
 
 
 class TableManagementController:
@@ -23,6 +35,9 @@ class TableManagementController:
     def __init__(self, loader, data_model):
         self.loader = loader
         self.data_model = data_model
+        # running tables update and chats waiting for its completion
+        self.update_task = None
+        self.update_chat_ids = set()
 
     def message_handlers(self):
         """
@@ -101,12 +116,17 @@ class TableManagementController:
         await bot.send_message(chat_id, text, reply_markup=reply_markup,
                                parse_mode="MarkdownV2")
 
-    def inline_keyboard_table_pages(self, data_model, table_id):
+    async def inline_keyboard_table_pages(self, data_model, table_id):
         """
-        Builds InlineKeyboard with all pages in table.
+        Builds InlineKeyboard with all pages in table. Pages are loaded in a
+        thread pool not to block the event loop.
         """
 
-        pages = self.loader.get_sheet_names(table_id)
+        pages = await asyncio.get_running_loop().run_in_executor(
+            None,
+            self.loader.get_sheet_names,
+            table_id
+        )
         pages_present = data_model.workout_table_names.get_plan_names(table_id)
         keyboard = []
         if pages:
@@ -150,7 +170,7 @@ class TableManagementController:
         text += "⏺ \\- страница не добавлена\n"
         text += "✅ \\- страница добавлена"
 
-        reply_markup = self.inline_keyboard_table_pages(
+        reply_markup = await self.inline_keyboard_table_pages(
             self.data_model,
             table_id
         )
@@ -166,18 +186,17 @@ class TableManagementController:
         Handles switch to table management.
         """
 
+        @message_filter(actions=(UserAction.TRAINING,
+                                 UserAction.ADMINISTRATION,
+                                 UserAction.ADMIN_TABLE_MANAGEMENT),
+                        texts=("управление таблицами",))
         def handler_filter(data_model, update):
             """
             The admin wants go to table management.
             """
 
             user_context = get_user_context(data_model, update)
-            message_text = update.message.text.strip().lower()
-            return (user_context.administrative_permission and
-                    user_context.action in (UserAction.TRAINING,
-                                            UserAction.ADMINISTRATION,
-                                            UserAction.ADMIN_TABLE_MANAGEMENT)
-                    and message_text == "управление таблицами")
+            return user_context.administrative_permission
 
         async def handler(data_model, update, context):
             """
@@ -199,15 +218,14 @@ class TableManagementController:
         Handles show all tables.
         """
 
-        def handler_filter(data_model, update):
+        @message_filter(actions=(UserAction.ADMIN_TABLE_MANAGEMENT,),
+                        texts=("показать все таблицы",))
+        def handler_filter(_data_model, _update):
             """
             Admin wants do display all tables.
             """
 
-            user_context = get_user_context(data_model, update)
-            message_text = update.message.text.strip().lower()
-            return (user_context.action == UserAction.ADMIN_TABLE_MANAGEMENT
-                    and message_text == "показать все таблицы")
+            return True
 
         async def handler(data_model, update, context):
             """
@@ -230,16 +248,15 @@ class TableManagementController:
         Handles add table/page.
         """
 
+        @message_filter(actions=(UserAction.ADMIN_TABLE_MANAGEMENT,),
+                        texts=("добавить таблицу",))
         def handler_filter(data_model, update):
             """
             Admin wants to add table or page.
             """
 
             user_context = get_user_context(data_model, update)
-            message_text = update.message.text.strip().lower()
-            return (user_context.administrative_permission and
-                    user_context.action == UserAction.ADMIN_TABLE_MANAGEMENT
-                    and message_text == ("добавить таблицу"))
+            return user_context.administrative_permission
 
         async def handler(data_model, update, context):
             """
@@ -265,15 +282,14 @@ class TableManagementController:
         Handles cancel message when adding table prompt is active.
         """
 
-        def handler_filter(data_model, update):
+        @message_filter(actions=(UserAction.ADMIN_ADDING_TABLE,),
+                        texts=("отмена",))
+        def handler_filter(_data_model, _update):
             """
             User is in ADMIN_ADDING_TABLE and sent Cancel message.
             """
 
-            user_context = get_user_context(data_model, update)
-            message_text = update.message.text.strip().lower()
-            return (user_context.action == UserAction.ADMIN_ADDING_TABLE
-                    and message_text == ("отмена"))
+            return True
 
         async def handler(data_model, update, context):
             """
@@ -297,13 +313,13 @@ class TableManagementController:
         Handles table link submission by admin.
         """
 
-        def handler_filter(data_model, update):
+        @message_filter(actions=(UserAction.ADMIN_ADDING_TABLE,))
+        def handler_filter(_data_model, _update):
             """
             Admin is in ADMIN_ADDING_TABLE and has sent table id.
             """
 
-            user_context = get_user_context(data_model, update)
-            return user_context.action == UserAction.ADMIN_ADDING_TABLE
+            return True
 
         async def handler(data_model, update, context):
             """
@@ -345,16 +361,15 @@ class TableManagementController:
         Handles change table that already has been added.
         """
 
+        @message_filter(actions=(UserAction.ADMIN_TABLE_MANAGEMENT,),
+                        texts=("изменить таблицу",))
         def handler_filter(data_model, update):
             """
             Admin sent change table message.
             """
 
             user_context = get_user_context(data_model, update)
-            message_text = update.message.text.strip().lower()
-            return (user_context.administrative_permission and
-                    user_context.action == UserAction.ADMIN_TABLE_MANAGEMENT
-                    and message_text == "изменить таблицу")
+            return user_context.administrative_permission
 
         async def handler(data_model, update, context):
             """
@@ -392,47 +407,79 @@ class TableManagementController:
         Handles update tables request.
         """
 
+        @message_filter(actions=(UserAction.ADMIN_TABLE_MANAGEMENT,),
+                        texts=("прочитать таблицы",))
         def handler_filter(data_model, update):
             """
             Admin wants to update all tables.
             """
 
             user_context = get_user_context(data_model, update)
-            message_text = update.message.text.strip().lower()
-            return (user_context.administrative_permission and
-                    user_context.action == UserAction.ADMIN_TABLE_MANAGEMENT
-                    and message_text == "прочитать таблицы")
+            return user_context.administrative_permission
 
         async def handler(data_model, update, context):
             """
-            Updates all tables.
+            Starts tables update in background if it is not running yet.
             """
 
             user_context = get_user_context(data_model, update)
             chat_id = user_context.chat_id
-            text = "Идёт обновление таблиц, может занять несколько секунд"
+            if self.update_task is None:
+                text = "Идёт обновление таблиц, может занять несколько секунд"
+                self.update_task = asyncio.create_task(
+                    self.update_tables(data_model, context.bot)
+                )
+                self.update_task.add_done_callback(log_update_failure)
+            else:
+                text = "Обновление таблиц уже идёт"
+            self.update_chat_ids.add(chat_id)
             await context.bot.send_message(chat_id, text)
-            data_model.update_tables()
-            await context.bot.send_message(chat_id, "Таблицы обновлены")
-            await TableManagementController.send_with_table_management_panel(
-                context.bot,
-                chat_id
-            )
 
         return handler_filter, handler
 
+    async def update_tables(self, data_model, bot):
+        """
+        Updates tables in a thread pool not to block the event loop, and
+        notifies all the chats waiting for the update. The task stays in
+        update_task until all the chats are notified, chats joining meanwhile
+        are notified too.
+        """
+
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                None,
+                data_model.update_tables
+            )
+            text = "Таблицы обновлены"
+        except Exception:  # pylint: disable=broad-exception-caught
+            logging.exception("Failed to update tables")
+            text = "Ошибка при обновлении таблиц"
+
+        try:
+            while self.update_chat_ids:
+                chat_ids = self.update_chat_ids
+                self.update_chat_ids = set()
+                for chat_id in chat_ids:
+                    await bot.send_message(chat_id, text)
+                    await TableManagementController \
+                        .send_with_table_management_panel(bot, chat_id)
+        finally:
+            # the next request starts a new update
+            self.update_chat_ids = set()
+            self.update_task = None
+
     def handle_other_messages(self):
         """
         Handles other messages.
         """
 
-        def handler_filter(data_model, update):
+        @message_filter(actions=(UserAction.ADMIN_TABLE_MANAGEMENT,))
+        def handler_filter(_data_model, _update):
             """
             Admin in ADMIN_TABLE_MANAGEMENT state.
             """
 
-            user_context = get_user_context(data_model, update)
-            return user_context.action == UserAction.ADMIN_TABLE_MANAGEMENT
+            return True
 
         async def handler(data_model, update, context):
             """
@@ -458,13 +505,12 @@ class TableManagementController:
             Checks user is admin and action is switch page.
             """
 
-            user_id = update.callback_query.from_user.id
-            user_context = data_model.users.get_user_context(user_id)
+            user_context = get_user_context(data_model, update)
             action = TableManagementController.InlineKeyboardData.decode(
                 update.callback_query.data
             ).action
             return (user_context.administrative_permission and
-                    action is
+                    action ==
                     TableManagementController.QUERY_ACTION_SWITCH_PAGE)
 
         async def handler(data_model, update, context):
@@ -488,7 +534,7 @@ class TableManagementController:
                 )
             else:
                 data_model.workout_table_names.switch_pages(table_id, page)
-                reply_keyboard = self.inline_keyboard_table_pages(
+                reply_keyboard = await self.inline_keyboard_table_pages(
                     data_model,
                     table_id
                 )
@@ -508,13 +554,12 @@ class TableManagementController:
             Checks the user is admin and action is choose table.
             """
 
-            user_id = update.callback_query.from_user.id
-            user_context = data_model.users.get_user_context(user_id)
+            user_context = get_user_context(data_model, update)
             action = TableManagementController.InlineKeyboardData.decode(
                 update.callback_query.data
             ).action
             return (user_context.administrative_permission and
-                    action is
+                    action ==
                     TableManagementController.QUERY_ACTION_CHOOSE_TABLE)
 
         async def handler(_data_model, update, context):
@@ -2,11 +2,13 @@
 Provides user interaction for training.
 """
 
+from datetime import date
 from telegram import ReplyKeyboardMarkup, KeyboardButton, ReplyKeyboardRemove
 from data_model.users import UserAction
 from view.workouts import get_workout_text_message
 from view.workouts import get_week_routine_text_message
 from telegram_bot.utils import get_user_context
+from .dispatcher import message_filter
 
 
 async def start_training(data_model, update, context):
@@ -89,6 +91,7 @@ async def send_all_actions(bot, chat_id):
             KeyboardButton("Начальная неделя"),
             KeyboardButton("Последняя неделя")
         ],
+        [KeyboardButton("Текущая неделя")],
         [
             KeyboardButton("Прошлая неделя"),
             KeyboardButton("Следующая неделя")
@@ -128,10 +131,18 @@ async def send_week_schedule(bot, data_model, user_context):
     Sends week workout schedule.
     """
 
-    message = get_week_routine_text_message(data_model,
-                                            user_context.current_table_id,
-                                            user_context.current_page,
-                                            user_context.current_week)
+    key = ("week",
+           user_context.current_table_id,
+           user_context.current_page,
+           user_context.current_week,
+           data_model.data_version)
+    message = data_model.message_cache.get_or_render(
+        key,
+        lambda: get_week_routine_text_message(data_model,
+                                              user_context.current_table_id,
+                                              user_context.current_page,
+                                              user_context.current_week)
+    )
     await send_with_next_or_all_buttons(bot, user_context, message)
 
 
@@ -140,11 +151,20 @@ async def send_workout(bot, data_model, user_context):
     Sends workout.
     """
 
-    message = get_workout_text_message(data_model,
-                                       user_context.current_table_id,
-                                       user_context.current_page,
-                                       user_context.current_week,
-                                       user_context.current_workout)
+    key = ("workout",
+           user_context.current_table_id,
+           user_context.current_page,
+           user_context.current_week,
+           user_context.current_workout,
+           data_model.data_version)
+    message = data_model.message_cache.get_or_render(
+        key,
+        lambda: get_workout_text_message(data_model,
+                                         user_context.current_table_id,
+                                         user_context.current_page,
+                                         user_context.current_week,
+                                         user_context.current_workout)
+    )
     await send_with_next_or_all_buttons(bot, user_context, message)
 
 
@@ -153,18 +173,17 @@ def handle_go_training():
     Handles switch to training status.
     """
 
-    def handler_filter(data_model, update):
+    @message_filter(actions=(UserAction.TRAINING,
+                             UserAction.ADMINISTRATION,
+                             UserAction.ADMIN_TABLE_MANAGEMENT),
+                    texts=("перейти к тренировкам",))
+    def handler_filter(_data_model, _update):
         """
         The user needs to change plan if she is in TRAINING state and plan is
         not valid.
         """
 
-        user_context = get_user_context(data_model, update)
-        message_text = update.message.text.strip().lower()
-        return (user_context.action in (UserAction.TRAINING,
-                                        UserAction.ADMINISTRATION,
-                                        UserAction.ADMIN_TABLE_MANAGEMENT)
-                and message_text == "перейти к тренировкам")
+        return True
 
     async def handler(data_model, update, context):
         """
@@ -182,25 +201,16 @@ def handle_need_change_plan():
     Handles any message, checks if the client needs to change plan.
     """
 
-    def handler_filter(data_model, update):
+    @message_filter(actions=(UserAction.TRAINING,))
+    def handler_filter(_data_model, update):
         """
         The user needs to change plan if she is in TRAINING state and plan is
         not valid.
         """
 
-        user_context = get_user_context(data_model, update)
-        message_text = update.message.text.strip().lower()
-        table_id = user_context.current_table_id
-        current_page = user_context.current_page
-        need_change_plan = not (
-            data_model.workout_table_names.is_table_present(table_id) and
-            data_model.workout_table_names.is_plan_present(table_id,
-                                                           current_page)
-        )
-        return user_context.action == UserAction.TRAINING \
-            and (need_change_plan or message_text in ("выбрать программу",
-                                                      "сменить программу",
-                                                      "поменять программу"))
+        return update.text in ("выбрать программу", "сменить программу",
+                               "поменять программу") \
+            or not update.plan_valid
 
     async def handler(data_model, update, context):
         """
@@ -221,13 +231,13 @@ def handle_message_change_plan():
     Handles messages in change plan state.
     """
 
-    def handler_filter(data_model, update):
+    @message_filter(actions=(UserAction.CHOOSING_PLAN,))
+    def handler_filter(_data_model, _update):
         """
         Checks if user in CHOOSING_PLAN state.
         """
 
-        user_context = get_user_context(data_model, update)
-        return user_context.action == UserAction.CHOOSING_PLAN
+        return True
 
     async def handler(data_model, update, context):
         """
@@ -262,15 +272,14 @@ def handle_all_actions():
     The user wants to display all possible actions in TRAINING status.
     """
 
-    def handler_filter(data_model, update):
+    @message_filter(actions=(UserAction.TRAINING,),
+                    texts=("все действия",))
+    def handler_filter(_data_model, _update):
         """
         The user in TRAINING status
         """
 
-        message_text = update.message.text.strip().lower()
-        user_context = get_user_context(data_model, update)
-        return (user_context.action == UserAction.TRAINING
-                and message_text == "все действия")
+        return True
 
     async def handler(data_model, update, context):
         """
@@ -291,15 +300,14 @@ def handle_next():
     Handles messages in change plan state.
     """
 
-    def handler_filter(data_model, update):
+    @message_filter(actions=(UserAction.TRAINING,),
+                    texts=("далее", "следующая тренировка"))
+    def handler_filter(_data_model, _update):
         """
         Checks if user in TRAINING state and sends "next".
         """
 
-        message_text = update.message.text.strip().lower()
-        user_context = get_user_context(data_model, update)
-        return (user_context.action == UserAction.TRAINING
-                and (message_text in ("далее", "следующая тренировка")))
+        return True
 
     async def handler(data_model, update, context):
         """
@@ -307,9 +315,10 @@ def handle_next():
         """
 
         user_id = update.message.from_user.id
-        user_context = data_model.users.get_user_context(user_id)
-        week_previous = user_context.current_week
+        week_previous = data_model.users.get_user_context(user_id) \
+            .current_week
         data_model.next_workout_for_user(user_id)
+        user_context = data_model.users.get_user_context(user_id)
         if week_previous != user_context.current_week:
             # show week schedule if week changes
             await send_week_schedule(context.bot, data_model, user_context)
@@ -319,30 +328,52 @@ def handle_next():
     return handler_filter, handler
 
 
+def move_to_week(data_model, user_id, move):
+    """
+    Moves the user to the workout cursor returned by move(sequence, cursor)
+    for the current cursor of the user, weeks without workouts are skipped.
+    The position is kept if the plan has no workouts.
+
+    Returns the updated UserContext.
+    """
+
+    def update(user_context):
+        sequence = data_model.workout_plans \
+            .get_workout_sequence(user_context.current_table_id,
+                                  user_context.current_page)
+        if sequence:
+            cursor = sequence.get_cursor(user_context.current_week,
+                                         user_context.current_workout)
+            user_context.current_week, user_context.current_workout = \
+                sequence.get_position(move(sequence, cursor))
+
+    return data_model.users.update_user(user_id, update)
+
+
 def handle_first_week():
     """
     The user wants to go to the first week.
     """
 
-    def handler_filter(data_model, update):
+    @message_filter(actions=(UserAction.TRAINING,),
+                    texts=("первая неделя", "начальная неделя"))
+    def handler_filter(_data_model, _update):
         """
         The user in TRAINING status and presses go to the first week.
         """
 
-        message_text = update.message.text.strip().lower()
-        user_context = get_user_context(data_model, update)
-        return (user_context.action == UserAction.TRAINING
-                and message_text in ("первая неделя", "начальная неделя"))
+        return True
 
     async def handler(data_model, update, context):
         """
         Shows all possible actions.
         """
 
-        user_context = get_user_context(data_model, update)
-        user_context.current_week = 0
-        user_context.current_workout = 0
-        data_model.users.set_user_context(user_context)
+        user_id = get_user_context(data_model, update).user_id
+        user_context = move_to_week(
+            data_model, user_id,
+            lambda sequence, _cursor: sequence.first()
+        )
         await send_week_schedule(context.bot, data_model, user_context)
         await send_workout(context.bot, data_model, user_context)
         return True
@@ -355,28 +386,70 @@ def handle_last_week():
     The user wants to go to the last week.
     """
 
-    def handler_filter(data_model, update):
+    @message_filter(actions=(UserAction.TRAINING,),
+                    texts=("последняя неделя", "крайняя неделя"))
+    def handler_filter(_data_model, _update):
         """
         The user in TRAINING status and presses go to the last week.
         """
 
-        message_text = update.message.text.strip().lower()
-        user_context = get_user_context(data_model, update)
-        return (user_context.action == UserAction.TRAINING
-                and message_text in ("последняя неделя", "крайняя неделя",
-                                     "текущая неделя"))
+        return True
 
     async def handler(data_model, update, context):
         """
         Shows all possible actions.
         """
 
-        user_context = get_user_context(data_model, update)
-        user_context.current_week = data_model.workout_plans \
-            .get_week_number(user_context.current_table_id,
-                             user_context.current_page) - 1
-        user_context.current_workout = 0
-        data_model.users.set_user_context(user_context)
+        user_id = get_user_context(data_model, update).user_id
+        user_context = move_to_week(
+            data_model, user_id,
+            lambda sequence, _cursor: sequence.week_begin(sequence.last())
+        )
+        await send_week_schedule(context.bot, data_model, user_context)
+        await send_workout(context.bot, data_model, user_context)
+        return True
+
+    return handler_filter, handler
+
+
+def handle_current_week():
+    """
+    The user wants to go to the week of today.
+    """
+
+    @message_filter(actions=(UserAction.TRAINING,),
+                    texts=("текущая неделя",))
+    def handler_filter(_data_model, _update):
+        """
+        The user in TRAINING status and presses go to the current week.
+        """
+
+        return True
+
+    async def handler(data_model, update, context):
+        """
+        Shows the week containing today, the last week with workouts if there
+        is no such week.
+        """
+
+        def move(user_context):
+            sequence = data_model.workout_plans \
+                .get_workout_sequence(user_context.current_table_id,
+                                      user_context.current_page)
+            week = sequence.find_week(date.today())
+            if week is None and sequence:
+                week = sequence.get_position(sequence.last())[0]
+            if week is None:
+                week = data_model.workout_plans \
+                    .get_week_number(user_context.current_table_id,
+                                     user_context.current_page) - 1
+            user_context.current_week = week
+            user_context.current_workout = 0
+
+        user_context = data_model.users.update_user(
+            get_user_context(data_model, update).user_id,
+            move
+        )
         await send_week_schedule(context.bot, data_model, user_context)
         await send_workout(context.bot, data_model, user_context)
         return True
@@ -389,28 +462,25 @@ def handle_next_week():
     The user wants to go to the last week.
     """
 
-    def handler_filter(data_model, update):
+    @message_filter(actions=(UserAction.TRAINING,),
+                    texts=("следующая неделя",))
+    def handler_filter(_data_model, _update):
         """
         The user in TRAINING status and presses go to the next week.
         """
 
-        message_text = update.message.text.strip().lower()
-        user_context = get_user_context(data_model, update)
-        return (user_context.action == UserAction.TRAINING
-                and message_text == "следующая неделя")
+        return True
 
     async def handler(data_model, update, context):
         """
         Shows all possible actions.
         """
 
-        user_context = get_user_context(data_model, update)
-        if user_context.current_week < data_model.workout_plans \
-                .get_week_number(user_context.current_table_id,
-                                 user_context.current_page) - 1:
-            user_context.current_week += 1
-        user_context.current_workout = 0
-        data_model.users.set_user_context(user_context)
+        user_id = get_user_context(data_model, update).user_id
+        user_context = move_to_week(
+            data_model, user_id,
+            lambda sequence, cursor: sequence.next_week(cursor)
+        )
         await send_week_schedule(context.bot, data_model, user_context)
         await send_workout(context.bot, data_model, user_context)
         return True
@@ -423,26 +493,25 @@ def handle_previous_week():
     The user wants to go to the last week.
     """
 
-    def handler_filter(data_model, update):
+    @message_filter(actions=(UserAction.TRAINING,),
+                    texts=("прошлая неделя", "предыдущая неделя"))
+    def handler_filter(_data_model, _update):
         """
         The user in TRAINING status and presses go to the previous week.
         """
 
-        message_text = update.message.text.strip().lower()
-        user_context = get_user_context(data_model, update)
-        return (user_context.action == UserAction.TRAINING
-                and message_text in ("прошлая неделя", "предыдущая неделя"))
+        return True
 
     async def handler(data_model, update, context):
         """
         Shows all possible actions.
         """
 
-        user_context = get_user_context(data_model, update)
-        if user_context.current_week > 0:
-            user_context.current_week -= 1
-        user_context.current_workout = 0
-        data_model.users.set_user_context(user_context)
+        user_id = get_user_context(data_model, update).user_id
+        user_context = move_to_week(
+            data_model, user_id,
+            lambda sequence, cursor: sequence.previous_week(cursor)
+        )
         await send_week_schedule(context.bot, data_model, user_context)
         await send_workout(context.bot, data_model, user_context)
         return True
@@ -458,6 +527,7 @@ training_management_message_handlers = [
     handle_next(),
     handle_first_week(),
     handle_last_week(),
+    handle_current_week(),
     handle_next_week(),
     handle_previous_week()
 ]
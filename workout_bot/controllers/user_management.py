@@ -11,6 +11,7 @@ from view.users import (
 )
 from view.utils import escape_text
 from telegram_bot.utils import get_user_context
+from .dispatcher import message_filter
 
 
 async def send_with_user_management_panel(
@@ -172,23 +173,36 @@ async def prompt_add_admin(bot, chat_id, data_model):
     )
 
 
+def return_to_user_management(data_model, user_id):
+    """
+    Moves the admin back to user management. Only the action and input data
+    are changed, in one write under the users lock, so changes made to the
+    admin by other chats are kept.
+    """
+
+    data_model.users.set_user_action_and_input_data(
+        user_id,
+        UserAction.ADMIN_USER_MANAGEMENT,
+        None
+    )
+
+
 def handle_go_user_management():
     """
     Handles switch to user management.
     """
 
+    @message_filter(actions=(UserAction.TRAINING,
+                             UserAction.ADMINISTRATION,
+                             UserAction.ADMIN_USER_MANAGEMENT),
+                    texts=("управление пользователями",))
     def handler_filter(data_model, update):
         """
         The admin sends go to user management message.
         """
 
         user_context = get_user_context(data_model, update)
-        message_text = update.message.text.strip().lower()
-        return (user_context.administrative_permission and
-                user_context.action in (UserAction.TRAINING,
-                                        UserAction.ADMINISTRATION,
-                                        UserAction.ADMIN_USER_MANAGEMENT)
-                and message_text == "управление пользователями")
+        return user_context.administrative_permission
 
     async def handler(data_model, update, context):
         """
@@ -211,16 +225,15 @@ def handle_go_user_authorization():
     User authorization handler.
     """
 
+    @message_filter(actions=(UserAction.ADMIN_USER_MANAGEMENT,),
+                    texts=("авторизация пользователей",))
     def handler_filter(data_model, update):
         """
         The admin sends authorize user message.
         """
 
         user_context = get_user_context(data_model, update)
-        message_text = update.message.text.strip().lower()
-        return (user_context.administrative_permission and
-                user_context.action == UserAction.ADMIN_USER_MANAGEMENT and
-                message_text == "авторизация пользователей")
+        return user_context.administrative_permission
 
     async def handler(data_model, update, context):
         """
@@ -245,15 +258,15 @@ def handle_authorize_user_cancel():
     Admin cancels user authorization.
     """
 
+    @message_filter(actions=(UserAction.ADMIN_USER_AUTHORIZATION,))
     def handler_filter(data_model, update):
         """
         The admin sends cancels when authorizing the user.
         """
 
         user_context = get_user_context(data_model, update)
-        message_text = update.message.text.strip().lower()
+        message_text = update.text
         return (user_context.administrative_permission and
-                user_context.action == UserAction.ADMIN_USER_AUTHORIZATION and
                 message_text.startswith("отмена"))
 
     async def handler(data_model, update, context):
@@ -277,15 +290,15 @@ def handle_authorize_user():
     Admin authorizing user.
     """
 
+    @message_filter(actions=(UserAction.ADMIN_USER_AUTHORIZATION,))
     def handler_filter(data_model, update):
         """
         The admin chooses user to authorize.
         """
 
         user_context = get_user_context(data_model, update)
-        message_text = update.message.text.strip().lower()
+        message_text = update.text
         return (user_context.administrative_permission and
-                user_context.action == UserAction.ADMIN_USER_AUTHORIZATION and
                 message_text.startswith("авторизовать "))
 
     async def handler(data_model, update, context):
@@ -324,6 +337,7 @@ def handle_assign_table():
     Handles table assigning to the user.
     """
 
+    @message_filter(actions=(UserAction.ADMIN_USER_ASSIGNING_TABLE,))
     def handler_filter(data_model, update):
         """
         The admin chooses table to assign to the user.
@@ -332,8 +346,7 @@ def handle_assign_table():
         user_context = get_user_context(data_model, update)
         table_name = update.message.text.strip()
         return (user_context.administrative_permission and
-                user_context.action == UserAction.ADMIN_USER_ASSIGNING_TABLE
-                and table_name in data_model.workout_plans.get_table_names())
+                table_name in data_model.workout_plans.get_table_names())
 
     async def handler(data_model, update, context):
         """
@@ -367,9 +380,7 @@ def handle_assign_table():
             parse_mode="MarkdownV2"
         )
 
-        user_context.action = UserAction.ADMIN_USER_MANAGEMENT
-        user_context.user_input_data = None
-        data_model.users.set_user_context(user_context)
+        return_to_user_management(data_model, user_context.user_id)
         await send_with_user_management_panel(
             context.bot,
             update.effective_chat.id
@@ -383,6 +394,7 @@ def handle_assign_wrong_table():
     Handles wrong table name assigning to the user.
     """
 
+    @message_filter(actions=(UserAction.ADMIN_USER_ASSIGNING_TABLE,))
     def handler_filter(data_model, update):
         """
         The admin chooses table to assign to the user.
@@ -391,9 +403,8 @@ def handle_assign_wrong_table():
         user_context = get_user_context(data_model, update)
         table_name = update.message.text
         return (user_context.administrative_permission and
-                user_context.action == UserAction.ADMIN_USER_ASSIGNING_TABLE
-                and
-                table_name not in data_model.workout_plans.get_table_names())
+                table_name not in
+                data_model.workout_plans.get_table_names())
 
     async def handler(data_model, update, context):
         """
@@ -421,15 +432,15 @@ def handle_block_user():
     Admin blocking user.
     """
 
+    @message_filter(actions=(UserAction.ADMIN_USER_AUTHORIZATION,))
     def handler_filter(data_model, update):
         """
         The admin chooses user to block.
         """
 
         user_context = get_user_context(data_model, update)
-        message_text = update.message.text.strip().lower()
+        message_text = update.text
         return (user_context.administrative_permission and
-                user_context.action == UserAction.ADMIN_USER_AUTHORIZATION and
                 message_text.startswith("блокировать "))
 
     async def handler(data_model, update, context):
@@ -449,15 +460,12 @@ def handle_block_user():
             )
             await send_with_user_management_panel(context.bot, chat_id)
         else:
-            user_context.action = UserAction.ADMIN_USER_BLOCKING
-            user_context.user_input_data = \
+            data_model.users.set_user_action_and_input_data(
+                user_context.user_id,
+                UserAction.ADMIN_USER_BLOCKING,
                 BlockUserContext(target_user_context.user_id)
-            data_model.users.set_user_context(user_context)
-            target_username = user_to_text_message(
-                data_model
-                .users
-                .get_user_context(user_context.user_input_data.user_id)
             )
+            target_username = user_to_text_message(target_user_context)
             await prompt_confirm_block(
                 context.bot,
                 chat_id,
@@ -472,16 +480,15 @@ def handle_confirm_block_yes():
     Handler for user blocking confirmation.
     """
 
+    @message_filter(actions=(UserAction.ADMIN_USER_BLOCKING,),
+                    texts=("да",))
     def handler_filter(data_model, update):
         """
         The admin is in ADMIN_USER_BLOCKING state and presses Yes.
         """
 
         user_context = get_user_context(data_model, update)
-        message_text = update.message.text.strip().lower()
-        return (user_context.administrative_permission and
-                user_context.action == UserAction.ADMIN_USER_BLOCKING and
-                message_text == "да")
+        return user_context.administrative_permission
 
     async def handler(data_model, update, context):
         """
@@ -495,9 +502,7 @@ def handle_confirm_block_yes():
             user_context.user_input_data.user_id
         )
         data_model.users.block_user(user_context.user_input_data.user_id)
-        user_context.action = UserAction.ADMIN_USER_MANAGEMENT
-        user_context.user_input_data = None
-        data_model.users.set_user_context(user_context)
+        return_to_user_management(data_model, user_context.user_id)
         await context.bot.send_message(
             chat_id,
             f"{target_username} заблокирован."
@@ -512,16 +517,15 @@ def handle_confirm_block_no():
     Handler for user blocking denial.
     """
 
+    @message_filter(actions=(UserAction.ADMIN_USER_BLOCKING,),
+                    texts=("нет",))
     def handler_filter(data_model, update):
         """
         The admin is in ADMIN_USER_BLOCKING state and presses No.
         """
 
         user_context = get_user_context(data_model, update)
-        message_text = update.message.text.strip().lower()
-        return (user_context.administrative_permission and
-                user_context.action == UserAction.ADMIN_USER_BLOCKING and
-                message_text == "нет")
+        return user_context.administrative_permission
 
     async def handler(data_model, update, context):
         """
@@ -530,9 +534,7 @@ def handle_confirm_block_no():
 
         user_context = get_user_context(data_model, update)
         chat_id = user_context.chat_id
-        user_context.action = UserAction.ADMIN_USER_MANAGEMENT
-        user_context.user_input_data = None
-        data_model.users.set_user_context(user_context)
+        return_to_user_management(data_model, user_context.user_id)
         await send_with_user_management_panel(context.bot, chat_id)
 
     return handler_filter, handler
@@ -543,14 +545,14 @@ def handle_confirm_block_unrecognized():
     Handler for user blocking unrecognized input.
     """
 
+    @message_filter(actions=(UserAction.ADMIN_USER_BLOCKING,))
     def handler_filter(data_model, update):
         """
         The admin is in ADMIN_USER_BLOCKING state and inputs unrecognized text.
         """
 
         user_context = get_user_context(data_model, update)
-        return (user_context.administrative_permission and
-                user_context.action == UserAction.ADMIN_USER_BLOCKING)
+        return user_context.administrative_permission
 
     async def handler(data_model, update, context):
         """
@@ -577,16 +579,15 @@ def handle_show_all_users():
     Show all users message handler.
     """
 
+    @message_filter(actions=(UserAction.ADMIN_USER_MANAGEMENT,),
+                    texts=("показать всех",))
     def handler_filter(data_model, update):
         """
         The admin sends show all users message.
         """
 
         user_context = get_user_context(data_model, update)
-        message_text = update.message.text.strip().lower()
-        return (user_context.administrative_permission and
-                user_context.action == UserAction.ADMIN_USER_MANAGEMENT and
-                message_text == "показать всех")
+        return user_context.administrative_permission
 
     async def handler(data_model, update, context):
         """
@@ -604,16 +605,15 @@ def handle_add_admin():
     Add admin message handler.
     """
 
+    @message_filter(actions=(UserAction.ADMIN_USER_MANAGEMENT,),
+                    texts=("добавить администратора",))
     def handler_filter(data_model, update):
         """
         The admin sends add admin message.
         """
 
         user_context = get_user_context(data_model, update)
-        message_text = update.message.text.strip().lower()
-        return (user_context.administrative_permission and
-                user_context.action == UserAction.ADMIN_USER_MANAGEMENT and
-                message_text == "добавить администратора")
+        return user_context.administrative_permission
 
     async def handler(data_model, update, context):
         """
@@ -647,18 +647,18 @@ def handle_add_admin_input():
     Admin adds admin.
     """
 
+    @message_filter(actions=(UserAction.ADMIN_ADDING_ADMIN,))
     def handler_filter(data_model, update):
         """
         The admin sends username to grant administrative permissions.
         """
 
         user_context = get_user_context(data_model, update)
-        message_text = update.message.text.strip().lower()
+        message_text = update.text
         new_admin = data_model.users.get_user_context_by_short_username(
             message_text
         )
         return (user_context.administrative_permission and
-                user_context.action == UserAction.ADMIN_ADDING_ADMIN and
                 new_admin is not None)
 
     async def handler(data_model, update, context):
@@ -672,9 +672,7 @@ def handle_add_admin_input():
             message_text
         )
         data_model.users.set_administrative_permission(new_admin.user_id)
-        user_context.action = UserAction.ADMIN_USER_MANAGEMENT
-        user_context.user_input_data = None
-        data_model.users.set_user_context(user_context)
+        return_to_user_management(data_model, user_context.user_id)
         await send_with_user_management_panel(
             context.bot,
             update.effective_chat.id
@@ -688,18 +686,18 @@ def handle_add_admin_wrong_input():
     Admin adds admin.
     """
 
+    @message_filter(actions=(UserAction.ADMIN_ADDING_ADMIN,))
     def handler_filter(data_model, update):
         """
         The admin sends wrong username.
         """
 
         user_context = get_user_context(data_model, update)
-        message_text = update.message.text.strip().lower()
+        message_text = update.text
         new_admin = data_model.users.get_user_context_by_short_username(
             message_text
         )
         return (user_context.administrative_permission and
-                user_context.action == UserAction.ADMIN_ADDING_ADMIN and
                 new_admin is None)
 
     async def handler(data_model, update, context):
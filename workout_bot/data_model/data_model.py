@@ -2,12 +2,19 @@
 Provides business data model objects.
 """
 
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date
 from google_sheets_feeder.google_sheets_adapter import GoogleSheetsAdapter
-from google_sheets_feeder.google_sheets_feeder import GoogleSheetsFeeder
+from google_sheets_feeder.google_sheets_feeder import (
+    DEFAULT_LOADING_WORKERS, GoogleSheetsFeeder
+)
 from google_sheets_feeder.google_sheets_loader import GoogleSheetsLoader
 from .exercise_links import ExerciseLinks
+from .message_cache import MessageCache
 from .statistics import Statistics
-from .users import Users
+from .users import DEFAULT_FLUSH_SIZE, UserAction, Users
 from .workout_plans import WorkoutPlans
 from .workout_table_names import WorkoutTableNames
 
@@ -15,48 +22,179 @@ from .workout_table_names import WorkoutTableNames
 class DataModel:
     """
     An interface to all business data model objects.
+
+    Workout plans are published as immutable versioned snapshots by swapping
+    the reference. A request pins the current snapshot for its lifetime by
+    pinned_workout_plans(), so it never mixes two versions of plans.
     """
 
+    # pylint: disable=too-many-instance-attributes
+
+    # pylint: disable=too-many-arguments
     def __init__(self,
                  users_storage_filename,
                  exercise_links_table_id,
                  exercise_links_pagename,
-                 table_ids_filename):
-        self.feeder = GoogleSheetsFeeder(GoogleSheetsLoader(),
-                                         GoogleSheetsAdapter())
-        self.users = Users(users_storage_filename)
+                 table_ids_filename,
+                 *,
+                 loading_workers=DEFAULT_LOADING_WORKERS,
+                 snapshot_filename=None,
+                 users_flush_size=DEFAULT_FLUSH_SIZE):
+        self.statistics = Statistics()
+        self.feeder = GoogleSheetsFeeder(GoogleSheetsLoader(self.statistics),
+                                         GoogleSheetsAdapter(),
+                                         loading_workers,
+                                         self.statistics)
+        self.users = Users(users_storage_filename,
+                           flush_size=users_flush_size,
+                           statistics=self.statistics)
         self.exercise_links = ExerciseLinks(exercise_links_table_id,
                                             exercise_links_pagename,
                                             self.feeder)
         self.workout_table_names = WorkoutTableNames(table_ids_filename)
-        self.statistics = Statistics()
         # Workouts has been read from tables
-        self.workout_plans = WorkoutPlans()
+        self.__workout_plans = WorkoutPlans()
+        # plans pinned by the current request
+        self.__pinned_workout_plans = ContextVar("pinned_workout_plans",
+                                                 default=None)
+        self.message_cache = MessageCache()
+        # workout plans are stored to the file after every update if set
+        self.snapshot_filename = snapshot_filename
+        self.update_lock = threading.Lock()
+
+    def load_snapshot(self):
+        """
+        Loads workout plans stored by the last update.
+        Returns True if the snapshot is loaded.
+        """
+
+        if not self.snapshot_filename:
+            return False
+        workout_plans = WorkoutPlans.load_snapshot(self.snapshot_filename)
+        if workout_plans is None:
+            return False
+        self.publish_workout_plans(workout_plans)
+        return True
+
+    @property
+    def workout_plans(self):
+        """
+        Workout plans pinned by the current request or the latest published
+        ones.
+        """
+
+        pinned = self.__pinned_workout_plans.get()
+        if pinned is not None:
+            return pinned
+        return self.__workout_plans
+
+    @property
+    def data_version(self):
+        """
+        Version of workout plans, is a part of cached message keys.
+        """
+
+        return self.workout_plans.version
+
+    def publish_workout_plans(self, workout_plans):
+        """
+        Makes workout plans available to the next requests. Requests in
+        progress keep the plans they pinned.
+        """
+
+        workout_plans.version = self.__workout_plans.version + 1
+        self.__workout_plans = workout_plans
+
+    @contextmanager
+    def pinned_workout_plans(self):
+        """
+        Pins the latest published workout plans for the current context, all
+        reads of workout_plans and data_version within it return the same
+        plans.
+        """
+
+        workout_plans = self.__workout_plans
+        token = self.__pinned_workout_plans.set(workout_plans)
+        try:
+            yield workout_plans
+        finally:
+            self.__pinned_workout_plans.reset(token)
 
     def update_tables(self):
         """
         Loads the latest workout plans from Google spreadsheets.
+        Concurrent updates, scheduled and requested by admin, run one by one.
         """
 
-        self.exercise_links.load_exercise_links()
-        self.workout_plans = self.feeder.get_workouts(self.workout_table_names)
-        self.statistics.set_training_plan_update_time()
+        with self.update_lock:
+            self.exercise_links.load_exercise_links()
+            workout_plans = self.feeder.get_workouts(
+                self.workout_table_names,
+                self.__workout_plans
+            )
+            self.publish_workout_plans(workout_plans)
+            self.statistics.set_training_plan_update_time()
+            if self.snapshot_filename:
+                workout_plans.save_snapshot(self.snapshot_filename)
 
     def next_workout_for_user(self, user_id):
         """
         Shifts the current workout for user if there are more workouts, if
-        there is no more workouts, does nothing.
-        """
-
-        user_context = self.users.get_user_context(user_id)
-        if user_context.current_workout < self.workout_plans \
-                .get_workout_number(user_context.current_table_id,
-                                    user_context.current_page,
-                                    user_context.current_week) - 1:
-            user_context.current_workout += 1
-        elif user_context.current_week < self.workout_plans \
-                .get_week_number(user_context.current_table_id,
-                                 user_context.current_page) - 1:
-            user_context.current_week += 1
+        there is no more workouts, does nothing. Weeks without workouts are
+        skipped.
+        """
+
+        workout_plans = self.workout_plans
+
+        def move(user_context):
+            sequence = workout_plans.get_workout_sequence(
+                user_context.current_table_id,
+                user_context.current_page
+            )
+            if sequence:
+                position = (user_context.current_week,
+                            user_context.current_workout)
+                cursor = sequence.get_cursor(*position)
+                if sequence.get_position(cursor) <= position:
+                    cursor = sequence.next(cursor)
+                # otherwise the user is on a week without workouts and the
+                # cursor is already the next workout
+                user_context.current_week, user_context.current_workout = \
+                    sequence.get_position(cursor)
+
+        self.users.update_user(user_id, move)
+
+    def advance_users_to_current_week(self, day=None):
+        """
+        Moves every training user behind the plan to the week containing the
+        day, today by default. The week is looked up once per plan, all the
+        users are updated in one batch. Waits for a running tables update, so
+        users are moved by the updated plans.
+
+        Returns the number of moved users.
+        """
+
+        if day is None:
+            day = date.today()
+        # map (table_id, page_name) -> week containing the day or None
+        current_weeks = {}
+
+        def advance(user_context):
+            plan = (user_context.current_table_id, user_context.current_page)
+            if plan not in current_weeks:
+                try:
+                    current_weeks[plan] = self.workout_plans \
+                        .get_workout_sequence(*plan).find_week(day)
+                except KeyError:
+                    current_weeks[plan] = None
+            week = current_weeks[plan]
+            if week is None or user_context.current_week is None \
+                    or week <= user_context.current_week:
+                return False
+            user_context.current_week = week
             user_context.current_workout = 0
-        self.users.set_user_context(user_context)
+            return True
+
+        # plans are not published while the lock is held
+        with self.update_lock:
+            return self.users.update_users(UserAction.TRAINING, advance)
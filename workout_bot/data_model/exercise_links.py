@@ -6,6 +6,99 @@ SHELVE_KEY_TABLE_ID = "table_id"
 SHELVE_KEY_PAGENAME = "pagename"
 
 
+class ExerciseLinkMatcher:
+    """
+    Aho-Corasick automaton over lowercased exercise names.
+
+    Finds the exercise name to be replaced with a link in a single pass over
+    the text. The longest name wins, names of the same length are prioritized
+    in the order of the links table, the first occurrence is used.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, exercise_links):
+        self.exercise_links = exercise_links
+
+        # Exercise links ordered by length, the longest first.
+        ranked = sorted(
+            ((name, link) for name, link in exercise_links.items() if name),
+            key=lambda item: len(item[0]),
+            reverse=True
+        )
+        self.__names = [name.lower() for name, _ in ranked]
+        self.__links = [link for _, link in ranked]
+
+        # automaton nodes: transitions, failure link and the best rank of a
+        # name ending in the node or in any of its suffixes
+        self.__goto = [{}]
+        self.__fail = [0]
+        self.__best = [None]
+        for rank, name in enumerate(self.__names):
+            node = 0
+            for char in name:
+                if char not in self.__goto[node]:
+                    self.__goto.append({})
+                    self.__fail.append(0)
+                    self.__best.append(None)
+                    self.__goto[node][char] = len(self.__goto) - 1
+                node = self.__goto[node][char]
+            if self.__best[node] is None:
+                self.__best[node] = rank
+        self.__build_failure_links()
+
+    def __build_failure_links(self):
+        """
+        Computes failure links breadth-first and propagates the best rank of
+        suffixes to every node.
+        """
+
+        queue = list(self.__goto[0].values())
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            suffix_best = self.__best[self.__fail[node]]
+            if suffix_best is not None and (
+                    self.__best[node] is None
+                    or suffix_best < self.__best[node]):
+                self.__best[node] = suffix_best
+            for char, child in self.__goto[node].items():
+                fail = self.__fail[node]
+                while fail and char not in self.__goto[fail]:
+                    fail = self.__fail[fail]
+                self.__fail[child] = self.__goto[fail].get(char, 0)
+                queue.append(child)
+
+    def find(self, text):
+        """
+        Searches text case-insensitively for an exercise name.
+
+        Returns tuple (begin, end, link) or None if no name found.
+        """
+
+        goto = self.__goto
+        fail = self.__fail
+        best = self.__best
+
+        best_rank = None
+        best_end = 0
+        node = 0
+        for index, char in enumerate(text.lower()):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            rank = best[node]
+            if rank is not None and (best_rank is None or rank < best_rank):
+                best_rank = rank
+                best_end = index + 1
+
+        if best_rank is None:
+            return None
+        return (best_end - len(self.__names[best_rank]), best_end,
+                self.__links[best_rank])
+
+
 class ExerciseLinks:
     """
     Provides access to exercise links.
@@ -18,19 +111,27 @@ class ExerciseLinks:
         self.table_id = table_id
         self.pagename = pagename
         self.feeder = feeder
-        self.exercise_links = {}
+        self.matcher = ExerciseLinkMatcher({})
 
     def load_exercise_links(self):
         """
-        Loads exercise links from Google table.
+        Loads exercise links from Google table and builds the matcher.
         """
-        self.exercise_links = self.feeder.get_exercise_links(
+        exercise_links = self.feeder.get_exercise_links(
             self.table_id,
             self.pagename
         )
+        # the matcher is replaced with a single reference assignment
+        self.matcher = ExerciseLinkMatcher(exercise_links)
 
     def get_exercise_links(self):
         """
         Returns loaded exercise links.
         """
-        return self.exercise_links
+        return self.matcher.exercise_links
+
+    def get_matcher(self):
+        """
+        Returns matcher for the loaded exercise links.
+        """
+        return self.matcher
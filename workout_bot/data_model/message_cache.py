@@ -0,0 +1,69 @@
+"""
+Cache of rendered messages.
+"""
+
+import threading
+from collections import OrderedDict
+
+DEFAULT_MESSAGE_CACHE_SIZE = 1024
+
+
+class MessageCache:
+    """
+    Thread-safe LRU cache of rendered text messages.
+
+    Keys are expected to contain the data version the message was rendered
+    from, so entries of the previous versions are never hit again and get
+    evicted eventually.
+    """
+
+    def __init__(self, max_size=DEFAULT_MESSAGE_CACHE_SIZE):
+        self.max_size = max_size
+        # map key -> rendered message, the least recently used first
+        self.__messages = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+        self.lock = threading.Lock()
+
+    def get_or_render(self, key, render):
+        """
+        Returns message by key. If message is not cached, calls render() and
+        caches its result.
+        """
+
+        with self.lock:
+            if key in self.__messages:
+                self.__hits += 1
+                self.__messages.move_to_end(key)
+                return self.__messages[key]
+            self.__misses += 1
+
+        message = render()
+
+        with self.lock:
+            self.__messages[key] = message
+            self.__messages.move_to_end(key)
+            while len(self.__messages) > self.max_size:
+                self.__messages.popitem(last=False)
+        return message
+
+    def get_hits(self):
+        """
+        Returns number of cache hits.
+        """
+
+        return self.__hits
+
+    def get_misses(self):
+        """
+        Returns number of cache misses.
+        """
+
+        return self.__misses
+
+    def get_size(self):
+        """
+        Returns number of cached messages.
+        """
+
+        return len(self.__messages)
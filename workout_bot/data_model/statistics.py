@@ -3,43 +3,181 @@ Stores application statistics.
 """
 
 from datetime import datetime
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram, generate_latest,
+    start_http_server
+)
+
+# Local address of metrics HTTP endpoint
+METRICS_ADDRESS = "127.0.0.1"
 
 
 class Statistics:
     """
-    Stores application statistics,
+    Stores application statistics as Prometheus metrics.
+
+    Every instance has its own registry, so several bots can run in one
+    process. Metrics are exposed in text format by start_metrics_server().
     """
 
-    total_requests = 0
-    total_commands = 0
-    training_time_update_time = datetime.min
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self):
+        self.registry = CollectorRegistry()
+        self.training_time_update_time = datetime.min
+
+        self.requests = Counter(
+            "workout_bot_requests",
+            "Messages handled.",
+            registry=self.registry
+        )
+        self.commands = Counter(
+            "workout_bot_commands",
+            "Commands handled.",
+            registry=self.registry
+        )
+        self.handler_seconds = Histogram(
+            "workout_bot_handler_seconds",
+            "Time spent in message and inline query handlers.",
+            ["handler"],
+            registry=self.registry
+        )
+        self.telegram_seconds = Histogram(
+            "workout_bot_telegram_request_seconds",
+            "Time spent in Telegram Bot API requests.",
+            ["method"],
+            registry=self.registry
+        )
+        self.sheets_requests = Counter(
+            "workout_bot_sheets_requests",
+            "Google Sheets API requests.",
+            ["method"],
+            registry=self.registry
+        )
+        self.sheets_errors = Counter(
+            "workout_bot_sheets_errors",
+            "Failed Google Sheets API requests.",
+            ["method"],
+            registry=self.registry
+        )
+        self.sheets_seconds = Histogram(
+            "workout_bot_sheets_request_seconds",
+            "Time spent in Google Sheets API requests.",
+            ["method"],
+            registry=self.registry
+        )
+        self.table_reload_seconds = Gauge(
+            "workout_bot_table_reload_seconds",
+            "Duration of the last workout table reload.",
+            ["table_id"],
+            registry=self.registry
+        )
+        self.users_reads = Counter(
+            "workout_bot_users_reads",
+            "User contexts read from the storage.",
+            registry=self.registry
+        )
+        self.users_writes = Counter(
+            "workout_bot_users_writes",
+            "User contexts written to the storage.",
+            registry=self.registry
+        )
+        self.training_plan_update = Gauge(
+            "workout_bot_training_plan_update_time_seconds",
+            "Unix time of the last training plan update.",
+            registry=self.registry
+        )
+
+    def start_metrics_server(self, port, address=METRICS_ADDRESS):
+        """
+        Starts HTTP server exposing metrics on `/metrics` in background
+        thread.
+        """
+
+        start_http_server(port, address, registry=self.registry)
+
+    def get_metrics(self):
+        """
+        Returns metrics in text exposition format.
+        """
+
+        return generate_latest(self.registry).decode("utf-8")
 
     def record_request(self):
         """
         Records request was handled.
         """
 
-        self.total_requests += 1
+        self.requests.inc()
 
     def get_total_requests(self):
         """
         Returnds total number of requests handled.
         """
 
-        return self.total_requests
+        return int(self.registry.get_sample_value(
+            "workout_bot_requests_total"
+        ))
 
     def record_command(self):
         """
         Records command was handled.
         """
 
-        self.total_commands += 1
+        self.commands.inc()
 
     def get_total_commands(self):
         """
         Returns total number of command called.
         """
-        return self.total_commands
+        return int(self.registry.get_sample_value(
+            "workout_bot_commands_total"
+        ))
+
+    def record_handler(self, handler, seconds):
+        """
+        Records time spent by the handler.
+        """
+
+        self.handler_seconds.labels(handler).observe(seconds)
+
+    def record_telegram_request(self, method, seconds):
+        """
+        Records time spent by Telegram Bot API request.
+        """
+
+        self.telegram_seconds.labels(method).observe(seconds)
+
+    def record_sheets_request(self, method, seconds, failed=False):
+        """
+        Records Google Sheets API request.
+        """
+
+        self.sheets_requests.labels(method).inc()
+        self.sheets_seconds.labels(method).observe(seconds)
+        if failed:
+            self.sheets_errors.labels(method).inc()
+
+    def record_table_reload(self, table_id, seconds):
+        """
+        Records duration of workout table reload.
+        """
+
+        self.table_reload_seconds.labels(table_id).set(seconds)
+
+    def record_users_read(self):
+        """
+        Records user context was read from the storage.
+        """
+
+        self.users_reads.inc()
+
+    def record_users_write(self):
+        """
+        Records user context was written to the storage.
+        """
+
+        self.users_writes.inc()
 
     def set_training_plan_update_time(self):
         """
@@ -47,6 +185,9 @@ class Statistics:
         """
 
         self.training_time_update_time = datetime.now()
+        self.training_plan_update.set(
+            self.training_time_update_time.timestamp()
+        )
 
     def get_training_plan_update_time(self):
         """
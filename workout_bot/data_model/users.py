@@ -2,11 +2,23 @@
 Provides access to user data.
 """
 
+import dbm
 import enum
+import logging
+import os
+import pickle
 import shelve
+import sqlite3
+import threading
 from dataclasses import dataclass
 from typing import Any
 from typing import Optional
+from performance.profiler import profiler
+
+SQLITE_SUFFIX = ".sqlite3"
+JOURNAL_SUFFIX = ".journal"
+# Number of changed users written to the database at once
+DEFAULT_FLUSH_SIZE = 100
 
 
 class UserAction(enum.IntEnum):
@@ -78,48 +90,284 @@ class UserContext:
 class Users:
     """
     Provides methods for the user data manipulation.
+
+    User contexts are stored in SQLite database in WAL mode, one row per user.
+    Columns used for lookups are stored besides the pickled UserContext and
+    indexed.
+
+    Mutations are written behind: they are kept in memory and written to the
+    database in one transaction by flush(). Flush happens when flush_size
+    users are changed, and should be called periodically and on shutdown.
+
+    Every mutation is also appended to the buffer of the journal file, so it
+    costs no disk I/O by itself. sync_journal() writes the buffer and fsyncs
+    the journal, it should be called more often than flush(). Not flushed
+    changes are restored from the journal after a process or OS crash,
+    changes made after the last sync_journal() may be lost.
+
+    Thread-safe, methods changing a user context read and store it
+    atomically.
     """
 
-    def __init__(self, filename):
+    # pylint: disable=too-many-instance-attributes
+    # pylint: disable=too-many-public-methods
+
+    def __init__(self, filename, flush_size=DEFAULT_FLUSH_SIZE,
+                 statistics=None):
         """
-        Sets shelve storage filename.
+        Sets storage filename. The database is stored in `filename.sqlite3`,
+        the journal in `filename.journal`. Users from shelve storage
+        `filename` are migrated on the first run. If statistics is set,
+        reads and writes of user contexts are recorded.
         """
-        # map user_id -> UserContext
-        self.__users = {}
 
         self.__storage_filename = filename
-        self.__users = shelve.open(self.__storage_filename, writeback=True)
+        self.flush_size = flush_size
+        self.statistics = statistics
+        # map user_id -> row not flushed to the database
+        self.__pending = {}
+        # journal has records not synced to disk
+        self.__journal_dirty = False
+        # reentrant, compound updates hold it while reading and writing
+        self.__lock = threading.RLock()
+        self.__connection = sqlite3.connect(
+            self.__storage_filename + SQLITE_SUFFIX,
+            check_same_thread=False,
+            isolation_level=None
+        )
+        with self.__lock:
+            self.__connection.execute("PRAGMA journal_mode=WAL")
+            # a commit is durable before the journal is truncated
+            self.__connection.execute("PRAGMA synchronous=FULL")
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS users ("
+                " user_id INTEGER PRIMARY KEY,"
+                " username TEXT,"
+                " action INTEGER NOT NULL,"
+                " administrative_permission INTEGER NOT NULL,"
+                " context BLOB NOT NULL)"
+            )
+            self.__connection.execute(
+                "CREATE INDEX IF NOT EXISTS users_username ON users (username)"
+            )
+            self.__connection.execute(
+                "CREATE INDEX IF NOT EXISTS users_action ON users (action)"
+            )
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS migrations (name TEXT PRIMARY KEY)"
+            )
+        self.__migrate_from_shelve()
+        self.__recover_journal()
+        self.__journal = open(  # pylint: disable=consider-using-with
+            self.__storage_filename + JOURNAL_SUFFIX, "ab"
+        )
+
+    def __migrate_from_shelve(self):
+        """
+        Copies all users from the shelve storage once.
+        """
+
+        with self.__lock:
+            migrated = self.__connection.execute(
+                "SELECT 1 FROM migrations WHERE name = 'shelve'"
+            ).fetchone()
+        if migrated:
+            return
+        user_contexts = []
+        if dbm.whichdb(self.__storage_filename):
+            with shelve.open(self.__storage_filename, flag="r") as storage:
+                user_contexts = list(storage.values())
+            logging.info("Migrating %d users from %s", len(user_contexts),
+                         self.__storage_filename)
+        with self.__lock:
+            self.__connection.execute("BEGIN")
+            self.__upsert([self.__to_row(user_context)
+                           for user_context in user_contexts])
+            self.__connection.execute(
+                "INSERT INTO migrations (name) VALUES ('shelve')"
+            )
+            self.__connection.execute("COMMIT")
+
+    def __recover_journal(self):
+        """
+        Writes to the database changes journaled but not flushed before the
+        last shutdown.
+        """
+
+        rows = {}
+        try:
+            with open(self.__storage_filename + JOURNAL_SUFFIX,
+                      "rb") as journal:
+                while True:
+                    row = pickle.load(journal)
+                    rows[row[0]] = row
+        except FileNotFoundError:
+            return
+        except (EOFError, pickle.UnpicklingError):
+            # the end of journal or the last record is partially written
+            pass
+        if rows:
+            logging.info("Recovering %d users from journal", len(rows))
+        with self.__lock:
+            self.__connection.execute("BEGIN")
+            self.__upsert(rows.values())
+            self.__connection.execute("COMMIT")
+            with open(self.__storage_filename + JOURNAL_SUFFIX, "wb"):
+                pass
+
+    @staticmethod
+    def __to_row(user_context):
+        """
+        Returns database row for user_context.
+        """
+
+        return (
+            user_context.user_id,
+            user_context.username,
+            int(user_context.action),
+            int(bool(user_context.administrative_permission)),
+            pickle.dumps(user_context, protocol=pickle.HIGHEST_PROTOCOL)
+        )
+
+    def __upsert(self, rows):
+        """
+        Inserts or updates rows, must be called under lock.
+        """
+
+        self.__connection.executemany(
+            "INSERT INTO users (user_id, username, action,"
+            " administrative_permission, context)"
+            " VALUES (?, ?, ?, ?, ?)"
+            " ON CONFLICT (user_id) DO UPDATE SET"
+            " username = excluded.username,"
+            " action = excluded.action,"
+            " administrative_permission = excluded.administrative_permission,"
+            " context = excluded.context",
+            rows
+        )
+
+    def __flush(self):
+        """
+        Writes pending changes to the database, must be called under lock.
+        """
+
+        if not self.__pending:
+            return
+        self.__connection.execute("BEGIN")
+        self.__upsert(self.__pending.values())
+        self.__connection.execute("COMMIT")
+        self.__pending.clear()
+        self.__journal.truncate(0)
+        # stale records must not survive a crash and override newer rows
+        os.fsync(self.__journal.fileno())
+        self.__journal_dirty = False
+
+    @profiler.profiled("Users.flush")
+    def flush(self):
+        """
+        Writes all pending changes to the database.
+        """
+
+        with self.__lock:
+            self.__flush()
+
+    @profiler.profiled("Users.sync_journal")
+    def sync_journal(self):
+        """
+        Writes journal records made since the last call and waits until they
+        are on disk.
+        """
+
+        with self.__lock:
+            if not self.__journal_dirty:
+                return
+            self.__journal.flush()
+            os.fsync(self.__journal.fileno())
+            self.__journal_dirty = False
+
+    def close(self):
+        """
+        Flushes pending changes and closes the storage.
+        """
+
+        with self.__lock:
+            self.__flush()
+            self.__journal.close()
+            self.__connection.close()
+
+    @profiler.profiled("Users.select")
+    def __select(self, condition="", parameters=()):
+        """
+        Returns user contexts from rows satisfying SQL condition.
+        """
+
+        if self.statistics is not None:
+            self.statistics.record_users_read()
+        with self.__lock:
+            self.__flush()
+            rows = self.__connection.execute(
+                "SELECT context FROM users " + condition,
+                parameters
+            ).fetchall()
+        return [pickle.loads(row[0]) for row in rows]
 
     def get_all_users(self):
         """
         Returns all user contexts
         """
 
-        return set(self.__users.values())
+        return set(self.__select())
 
+    @profiler.profiled("Users.is_present")
     def is_present(self, user_id):
         """
         Returns True if user is present.
         """
 
-        return str(user_id) in self.__users
+        with self.__lock:
+            if user_id in self.__pending:
+                return True
+            return self.__connection.execute(
+                "SELECT 1 FROM users WHERE user_id = ?",
+                (user_id,)
+            ).fetchone() is not None
 
+    @profiler.profiled("Users.set_user_context")
     def set_user_context(self, user_context):
         """
-        Stores user_context.
+        Stores user_context in memory and in the journal buffer, it is
+        written to disk by sync_journal() and to the database by flush().
         """
 
-        self.__users[str(user_context.user_id)] = user_context
-        self.__users.sync()
+        if self.statistics is not None:
+            self.statistics.record_users_write()
+        row = self.__to_row(user_context)
+        with self.__lock:
+            self.__pending[row[0]] = row
+            pickle.dump(row, self.__journal,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+            self.__journal_dirty = True
+            if len(self.__pending) >= self.flush_size:
+                self.__flush()
 
+    @profiler.profiled("Users.get_user_context")
     def get_user_context(self, user_id):
         """
         Returns UserContext for user_id or None if user_id is unknown.
         """
 
-        if str(user_id) not in self.__users:
+        if self.statistics is not None:
+            self.statistics.record_users_read()
+        with self.__lock:
+            if user_id in self.__pending:
+                return pickle.loads(self.__pending[user_id][-1])
+            row = self.__connection.execute(
+                "SELECT context FROM users WHERE user_id = ?",
+                (user_id,)
+            ).fetchone()
+        if row is None:
             return None
-        return self.__users[str(user_id)]
+        return pickle.loads(row[0])
 
     def get_user_context_by_username(self, username):
         """
@@ -129,10 +377,10 @@ class Users:
 
         if username.startswith('@'):
             username = username[1:]
-        for user in self.__users.values():
-            if username == user.username:
-                return user
-        return None
+        users = self.__select("WHERE username = ? LIMIT 1", (username,))
+        if not users:
+            return None
+        return users[0]
 
     def get_user_context_by_short_username(self, short_username):
         """
@@ -156,19 +404,37 @@ class Users:
         creates new one.
         """
 
-        if str(user_id) not in self.__users:
-            self.__users[str(user_id)] = UserContext(user_id=user_id)
-            self.__users.sync()
-        return self.__users[str(user_id)]
+        with self.__lock:
+            user_context = self.get_user_context(user_id)
+            if user_context is None:
+                user_context = UserContext(user_id=user_id)
+                self.set_user_context(user_context)
+            return user_context
+
+    def update_user(self, user_id, update):
+        """
+        Applies update to UserContext of user_id and stores it, the context is
+        read and written under the lock, so concurrent changes of the user
+        are kept. If user_id is not present, creates a new one.
+
+        Returns the updated UserContext.
+        """
+
+        with self.__lock:
+            user_context = self.get_or_create_user_context(user_id)
+            update(user_context)
+            self.set_user_context(user_context)
+            return user_context
 
     def set_user_action(self, user_id, action):
         """
         Sets action for user_id. If user_id is not present, creates a new one.
         """
 
-        user_context = self.get_or_create_user_context(user_id)
-        user_context.action = action
-        self.__users.sync()
+        with self.__lock:
+            user_context = self.get_or_create_user_context(user_id)
+            user_context.action = action
+            self.set_user_context(user_context)
 
     def is_user_awaiting_authorization(self, user_id):
         """
@@ -191,18 +457,20 @@ class Users:
         Sets table for user_id. If user_id is not present, creates a new one.
         """
 
-        user_context = self.get_or_create_user_context(user_id)
-        user_context.current_table_id = table_id
-        self.__users.sync()
+        with self.__lock:
+            user_context = self.get_or_create_user_context(user_id)
+            user_context.current_table_id = table_id
+            self.set_user_context(user_context)
 
     def set_page_for_user(self, user_id, page):
         """
         Sets page for user_id. If user_id is not present, creates a new one.
         """
 
-        user_context = self.get_or_create_user_context(user_id)
-        user_context.current_page = page
-        self.__users.sync()
+        with self.__lock:
+            user_context = self.get_or_create_user_context(user_id)
+            user_context.current_page = page
+            self.set_user_context(user_context)
 
     def set_administrative_permission(self, user_id):
         """
@@ -210,56 +478,108 @@ class Users:
         creates a new one.
         """
 
-        user_context = self.get_or_create_user_context(user_id)
-        user_context.administrative_permission = True
-        user_context.action = UserAction.ADMINISTRATION
-        user_context.user_input_data = None
-        self.__users.sync()
+        with self.__lock:
+            user_context = self.get_or_create_user_context(user_id)
+            user_context.administrative_permission = True
+            user_context.action = UserAction.ADMINISTRATION
+            user_context.user_input_data = None
+            self.set_user_context(user_context)
 
     def set_user_input_data(self, user_id, data):
         """
         Sets user data stored between messages. Depends on user action.
         """
 
-        user_context = self.get_or_create_user_context(user_id)
-        user_context.user_input_data = data
-        self.__users.sync()
+        with self.__lock:
+            user_context = self.get_or_create_user_context(user_id)
+            user_context.user_input_data = data
+            self.set_user_context(user_context)
+
+    def set_user_action_and_input_data(self, user_id, action, data):
+        """
+        Sets action and the data stored between messages for it in one write.
+        Other fields of the user are kept.
+        """
+
+        with self.__lock:
+            user_context = self.get_or_create_user_context(user_id)
+            user_context.action = action
+            user_context.user_input_data = data
+            self.set_user_context(user_context)
 
     def block_user(self, user_id):
         """
         Sets blocked action for user_id. If user_id is not present, creates a
         new one.
         """
-        user_context = self.get_or_create_user_context(user_id)
-        user_context.action = UserAction.BLOCKED
-        self.__users.sync()
+        with self.__lock:
+            user_context = self.get_or_create_user_context(user_id)
+            user_context.action = UserAction.BLOCKED
+            self.set_user_context(user_context)
 
+    @profiler.profiled("Users.get_users_number")
     def get_users_number(self):
         """
         Returns number of unique users
         """
 
-        return len(self.__users)
+        with self.__lock:
+            self.__flush()
+            return self.__connection.execute(
+                "SELECT COUNT(*) FROM users"
+            ).fetchone()[0]
 
     def get_users_awaiting_authorization(self):
         """
         Returns the set of users awaiting authorization.
         """
 
-        result = set()
-        for user in self.__users.values():
-            if user.action is UserAction.AWAITING_AUTHORIZATION:
-                result.add(user)
-        return result
+        return set(self.__select(
+            "WHERE action = ?",
+            (int(UserAction.AWAITING_AUTHORIZATION),)
+        ))
+
+    @profiler.profiled("Users.update_users")
+    def update_users(self, action, update):
+        """
+        Applies update to all the users with action and stores the changed
+        ones in one transaction. The update takes UserContext and returns True
+        if the context is changed. Other writes wait until all the users are
+        updated. A change made meanwhile is kept only if it is read and written
+        under the lock, as update_user() does, a context read before the batch
+        and written back after it overwrites the batch change.
+
+        Returns the number of changed users.
+        """
+
+        if self.statistics is not None:
+            self.statistics.record_users_read()
+        with self.__lock:
+            self.__flush()
+            rows = self.__connection.execute(
+                "SELECT context FROM users WHERE action = ?",
+                (int(action),)
+            ).fetchall()
+            changed = []
+            for row in rows:
+                user_context = pickle.loads(row[0])
+                if update(user_context):
+                    changed.append(self.__to_row(user_context))
+            if changed:
+                self.__connection.execute("BEGIN")
+                self.__upsert(changed)
+                self.__connection.execute("COMMIT")
+        if self.statistics is not None:
+            for _ in changed:
+                self.statistics.record_users_write()
+        return len(changed)
 
     def get_potential_admins(self):
         """
         Returns set of users without admin permissions and not blocked.
         """
 
-        result = set()
-        for user in self.__users.values():
-            if (user.action is not UserAction.BLOCKED
-                    and not user.administrative_permission):
-                result.add(user)
-        return result
+        return set(self.__select(
+            "WHERE action != ? AND administrative_permission = 0",
+            (int(UserAction.BLOCKED),)
+        ))
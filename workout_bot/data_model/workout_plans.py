@@ -2,14 +2,50 @@
 Provides access to workouts and plans.
 """
 
+import logging
+import os
+from bisect import bisect_right
+import pickle
 import threading
 from datetime import date
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from typing import List
 from typing import Dict
 
+# Incremented when the snapshot format or workout classes change
+SNAPSHOT_VERSION = 2
 
-@dataclass
+
+def slotted(cls):
+    """
+    Class decorator, recreates dataclass with __slots__ instead of per
+    instance __dict__, the same as dataclass(slots=True) of Python 3.10.
+    """
+
+    field_names = tuple(field.name for field in fields(cls))
+    cls_dict = dict(cls.__dict__)
+    cls_dict["__slots__"] = field_names
+    for name in field_names:
+        # defaults are kept by the generated __init__
+        cls_dict.pop(name, None)
+    cls_dict.pop("__dict__", None)
+    cls_dict.pop("__weakref__", None)
+    if cls.__dataclass_params__.frozen:
+        # pickle restores slots with setattr, that is forbidden for frozen
+        def getstate(self):
+            return [getattr(self, name) for name in field_names]
+
+        def setstate(self, state):
+            for name, value in zip(field_names, state):
+                object.__setattr__(self, name, value)
+
+        cls_dict["__getstate__"] = getstate
+        cls_dict["__setstate__"] = setstate
+    return type(cls)(cls.__name__, cls.__bases__, cls_dict)
+
+
+@slotted
+@dataclass(frozen=True)
 class Exercise:
     """
     It's a single exercise.
@@ -20,6 +56,7 @@ class Exercise:
     weight: str = ''
 
 
+@slotted
 @dataclass
 class Set:
     """
@@ -39,6 +76,7 @@ class Set:
         return not self.description and not self.exercises
 
 
+@slotted
 @dataclass
 class Workout:
     """
@@ -61,6 +99,7 @@ class Workout:
         return not self.description
 
 
+@slotted
 @dataclass
 class WeekRoutine:
     """
@@ -86,52 +125,259 @@ class WorkoutTable:
     pages: Dict[str, List[WeekRoutine]]
 
 
+class WorkoutSequence:
+    """
+    Flat sequence of all the workouts of a plan.
+
+    A workout is addressed by its position (week, workout) or by a cursor,
+    the number of the workout in the plan. Navigation is O(1), weeks without
+    workouts are skipped.
+
+    Weeks are also indexed by dates, the week containing a date is found in
+    O(log n).
+    """
+
+    def __init__(self, weeks):
+        # list of (week, workout) positions indexed by cursor
+        self.positions = []
+        # cursor of the first workout of every week
+        self.week_offsets = []
+        for week_number, week in enumerate(weeks):
+            self.week_offsets.append(len(self.positions))
+            self.positions.extend(
+                (week_number, workout_number)
+                for workout_number in range(len(week.workouts))
+            )
+        # list of (start_date, end_date, week) sorted by start_date
+        self.week_dates = sorted(
+            (week.start_date, week.end_date, week_number)
+            for week_number, week in enumerate(weeks)
+        )
+        self.week_start_dates = [start for start, _, _ in self.week_dates]
+
+    def __len__(self):
+        return len(self.positions)
+
+    def get_cursor(self, week, workout):
+        """
+        Returns cursor of the workout position. A week after the end of the
+        plan is the last week. If the week has no such workout, returns cursor
+        of the last workout of the week. If the week has no workouts, returns
+        cursor of the next workout in the plan, or of the last one.
+        """
+
+        week = min(week, len(self.week_offsets) - 1)
+        offset = self.week_offsets[week]
+        next_offset = self.week_offsets[week + 1] \
+            if week + 1 < len(self.week_offsets) else len(self.positions)
+        if offset == next_offset:
+            # the first workout of the next weeks
+            return min(offset, self.last())
+        return min(offset + workout, next_offset - 1)
+
+    def get_position(self, cursor):
+        """
+        Returns (week, workout) position of the cursor.
+        """
+
+        return self.positions[cursor]
+
+    def first(self):
+        """
+        Returns cursor of the first workout.
+        """
+
+        return 0
+
+    def last(self):
+        """
+        Returns cursor of the last workout.
+        """
+
+        return len(self.positions) - 1
+
+    def next(self, cursor):
+        """
+        Returns cursor of the next workout, the last workout has no next.
+        """
+
+        return min(cursor + 1, self.last())
+
+    def previous(self, cursor):
+        """
+        Returns cursor of the previous workout, the first workout has no
+        previous.
+        """
+
+        return max(cursor - 1, self.first())
+
+    def week_begin(self, cursor):
+        """
+        Returns cursor of the first workout of the week of the cursor.
+        """
+
+        return self.week_offsets[self.positions[cursor][0]]
+
+    def next_week(self, cursor):
+        """
+        Returns cursor of the first workout of the next week with workouts,
+        the last week has no next, so it is the first workout of the week.
+        """
+
+        week = self.positions[cursor][0]
+        if week + 1 < len(self.week_offsets) \
+                and self.week_offsets[week + 1] < len(self.positions):
+            return self.week_offsets[week + 1]
+        return self.week_offsets[week]
+
+    def previous_week(self, cursor):
+        """
+        Returns cursor of the first workout of the previous week with
+        workouts, the first week has no previous, so it is the first workout.
+        """
+
+        week_begin = self.week_begin(cursor)
+        if week_begin == self.first():
+            return self.first()
+        return self.week_begin(week_begin - 1)
+
+    def find_week(self, day):
+        """
+        Returns number of the week containing the day. If the week has no
+        workouts, for example it is a rest week, returns the next week with
+        workouts. Returns None if there is no such week.
+        """
+
+        index = bisect_right(self.week_start_dates, day) - 1
+        if index < 0:
+            return None
+        _, end_date, week_number = self.week_dates[index]
+        if day > end_date:
+            return None
+        # the first workout of the week or of the next weeks
+        cursor = self.week_offsets[week_number]
+        if cursor == len(self.positions):
+            return None
+        return self.positions[cursor][0]
+
+    def jump(self, number):
+        """
+        Returns cursor of the workout with the number in the plan, the number
+        is limited by the first and the last workouts.
+        """
+
+        return max(self.first(), min(number, self.last()))
+
+
 class WorkoutPlans:
     """
-    Thread-safe workout plans storage
+    Thread-safe workout plans storage.
+
+    The map of tables is never changed in place, update_workout_table()
+    replaces it with an updated copy. So readers take no lock and a reader
+    never sees a partially updated map. Plans published by DataModel are not
+    updated, a reload builds new WorkoutPlans with the next version.
     """
 
-    def __init__(self):
+    def __init__(self, version=0):
+        self.version = version
         # map {table_id -> WorkoutTable}
         self.__workout_tables = {}
-        self.lock = threading.Lock()
+        # map {(table_id, page_name) -> WorkoutSequence}
+        self.__workout_sequences = {}
+        # serializes writers only
+        self.__lock = threading.Lock()
+
+    def save_snapshot(self, filename):
+        """
+        Stores all workout tables to the file. The file is replaced
+        atomically, so a reader never sees a partially written snapshot.
+        """
+
+        workout_tables = self.__workout_tables
+        tmp_filename = filename + ".tmp"
+        with open(tmp_filename, "wb") as snapshot_file:
+            pickle.dump((SNAPSHOT_VERSION, workout_tables), snapshot_file,
+                        protocol=5)
+        os.replace(tmp_filename, filename)
+
+    @staticmethod
+    def load_snapshot(filename):
+        """
+        Returns WorkoutPlans loaded from the snapshot file or None if the file
+        is absent, corrupted or has another version.
+        """
+
+        try:
+            with open(filename, "rb") as snapshot_file:
+                version, workout_tables = pickle.load(snapshot_file)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError, TypeError, AttributeError,
+                ImportError, pickle.UnpicklingError) as err:
+            logging.error("Failed to load snapshot %s: %s", filename, err)
+            return None
+        if version != SNAPSHOT_VERSION:
+            logging.info("Snapshot %s version %s is outdated",
+                         filename, version)
+            return None
+
+        plans = WorkoutPlans()
+        for workout_table in workout_tables.values():
+            plans.update_workout_table(workout_table)
+        return plans
 
     def update_workout_table(self, workout_table):
         """
         Loads tables.
         """
 
-        with self.lock:
-            self.__workout_tables[workout_table.table_id] = workout_table
+        table_id = workout_table.table_id
+        with self.__lock:
+            workout_sequences = {
+                key: sequence for key, sequence
+                in self.__workout_sequences.items() if key[0] != table_id
+            }
+            for page_name, weeks in workout_table.pages.items():
+                workout_sequences[(table_id, page_name)] = \
+                    WorkoutSequence(weeks)
+            workout_tables = dict(self.__workout_tables)
+            workout_tables[table_id] = workout_table
+            self.__workout_sequences = workout_sequences
+            self.__workout_tables = workout_tables
+
+    def get_workout_table(self, table_id):
+        """
+        Returns WorkoutTable by table_id or None if table_id is not present.
+        """
+
+        return self.__workout_tables.get(table_id)
 
     def is_table_id_present(self, table_id):
         """
         Checks if table id is present.
         """
-        with self.lock:
-            return table_id in self.__workout_tables
+        return table_id in self.__workout_tables
 
     def get_table_names(self):
         """
         Returns all table names.
         """
 
-        with self.lock:
-            result = set()
-            for table in self.__workout_tables.values():
-                result.add(table.table_name)
-            return result
+        result = set()
+        for table in self.__workout_tables.values():
+            result.add(table.table_name)
+        return result
 
     def get_plan_name(self, table_id):
         """
         Returns table name for table_id.
         """
 
-        name = table_id
-        with self.lock:
-            if table_id in self.__workout_tables:
-                name = self.__workout_tables[table_id].table_name
-            return name
+        table = self.__workout_tables.get(table_id)
+        if table is not None:
+            return table.table_name
+        return table_id
 
     def get_table_id_by_name(self, name):
         """
@@ -139,44 +385,46 @@ class WorkoutPlans:
         """
 
         res = None
-        with self.lock:
-            for table_id, table in self.__workout_tables.items():
-                if table.table_name == name:
-                    res = table_id
-            return res
+        for table_id, table in self.__workout_tables.items():
+            if table.table_name == name:
+                res = table_id
+        return res
 
     def get_week_routine(self, table_id, page_name, week_number):
         """
         Returns week routine by table_id, page_name, and week_number.
         """
 
-        with self.lock:
-            return self.__workout_tables[table_id] \
-                .pages[page_name][week_number]
+        return self.__workout_tables[table_id].pages[page_name][week_number]
 
     def get_workout(self, table_id, page_name, week_number, workout_number):
         """
         Returns workout by table_id, page_name, week_number, and
         workout_number.
         """
-        with self.lock:
-            return self.__workout_tables[table_id] \
-                .pages[page_name][week_number].workouts[workout_number]
+        return self.__workout_tables[table_id] \
+            .pages[page_name][week_number].workouts[workout_number]
 
     def get_week_number(self, table_id, page_name):
         """
         Returns number of weeks in the plan with page_name in table with
         table_id.
         """
-        with self.lock:
-            return len(self.__workout_tables[table_id].pages[page_name])
+        return len(self.__workout_tables[table_id].pages[page_name])
 
     def get_workout_number(self, table_id, page_name, week_number):
         """
         Returns number of workouts in the plan with page_name in table with
         table_id in a week with week_number.
         """
-        with self.lock:
-            return len(self.__workout_tables[table_id]
-                       .pages[page_name][week_number]
-                       .workouts)
+        return len(self.__workout_tables[table_id]
+                   .pages[page_name][week_number]
+                   .workouts)
+
+    def get_workout_sequence(self, table_id, page_name):
+        """
+        Returns WorkoutSequence of the plan with page_name in table with
+        table_id.
+        """
+
+        return self.__workout_sequences[(table_id, page_name)]
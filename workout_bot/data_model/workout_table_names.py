@@ -3,11 +3,15 @@ Provides access to workout table ids and pages that need to be loaded.
 """
 
 import shelve
+import threading
 
 
 class WorkoutTableNames:
     """
     Stores google table ids and pages with workouts to be loaded.
+
+    Thread-safe, getters return copies, so the result is not changed by
+    concurrent updates.
     """
 
     __storage_filename = ""
@@ -22,6 +26,7 @@ class WorkoutTableNames:
         """
 
         self.__storage_filename = filename
+        self.__lock = threading.Lock()
         self.__workout_tables = shelve.open(self.__storage_filename,
                                             writeback=True)
 
@@ -32,7 +37,8 @@ class WorkoutTableNames:
 
         if table_id is None:
             return False
-        return table_id in self.__workout_tables
+        with self.__lock:
+            return table_id in self.__workout_tables
 
     def add_table(self, table_id, pages):
         """
@@ -42,12 +48,13 @@ class WorkoutTableNames:
 
         pages = set(pages)
         if pages:
-            if table_id in self.__workout_tables:
-                self.__workout_tables[table_id].update(pages)
-                self.__workout_tables.sync()
-            else:
-                self.__workout_tables[table_id] = pages
-                self.__workout_tables.sync()
+            with self.__lock:
+                if table_id in self.__workout_tables:
+                    self.__workout_tables[table_id].update(pages)
+                    self.__workout_tables.sync()
+                else:
+                    self.__workout_tables[table_id] = pages
+                    self.__workout_tables.sync()
 
     def remove_table(self, table_id, pages):
         """
@@ -55,33 +62,37 @@ class WorkoutTableNames:
         table_id has no pages, deletes the table.
         """
 
-        if table_id in self.__workout_tables:
-            self.__workout_tables[table_id].difference_update(pages)
-            self.__workout_tables.sync()
-            if not self.__workout_tables[table_id]:
-                self.__workout_tables.pop(table_id, None)
+        with self.__lock:
+            if table_id in self.__workout_tables:
+                self.__workout_tables[table_id].difference_update(pages)
                 self.__workout_tables.sync()
+                if not self.__workout_tables[table_id]:
+                    self.__workout_tables.pop(table_id, None)
+                    self.__workout_tables.sync()
 
     def switch_pages(self, table_id, page):
         """
         Adds page if the page is not present. If page is present, removes it.
         """
 
-        if table_id in self.__workout_tables:
-            if page in self.__workout_tables[table_id]:
-                self.__workout_tables[table_id].remove(page)
+        with self.__lock:
+            if table_id in self.__workout_tables:
+                if page in self.__workout_tables[table_id]:
+                    self.__workout_tables[table_id].remove(page)
+                else:
+                    self.__workout_tables[table_id].add(page)
             else:
-                self.__workout_tables[table_id].add(page)
-        else:
-            self.__workout_tables[table_id] = {page}
-        self.__workout_tables.sync()
+                self.__workout_tables[table_id] = {page}
+            self.__workout_tables.sync()
 
     def get_tables(self):
         """
-        Returns all the tables.
+        Returns all the tables, map {table_id: set of page names}.
         """
 
-        return self.__workout_tables
+        with self.__lock:
+            return {table_id: set(pages) for table_id, pages
+                    in self.__workout_tables.items()}
 
     def is_plan_present(self, table_id, plan):
         """
@@ -90,11 +101,13 @@ class WorkoutTableNames:
 
         if table_id is None or plan is None:
             return False
-        return plan in self.get_plan_names(table_id)
+        with self.__lock:
+            return plan in self.__workout_tables.get(table_id, ())
 
     def get_plan_names(self, table_id):
         """
         Returns all plans for a table with table_id.
         """
 
-        return self.__workout_tables.get(table_id, [])
+        with self.__lock:
+            return set(self.__workout_tables.get(table_id, []))
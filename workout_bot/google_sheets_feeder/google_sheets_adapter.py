@@ -3,11 +3,32 @@ Transforms loaded Google spreadsheets into data model.
 """
 
 import re
+from sys import intern
 from datetime import date
 from data_model.workout_plans import (
     Exercise, Set, WeekRoutine, Workout
 )
 
+# week dates at the beginning of week cell
+WEEK_DATES_PATTERN = re.compile(r"(^\d{1,2}\.?\d{0,2}-\d{1,2}\.\d{1,2})")
+# workout number at the beginning of workout cell
+WORKOUT_NUMBER_PATTERN = re.compile(r"(^\d+)")
+# set number at the beginning of set description
+SET_PATTERN = re.compile(r"^\d+\\")
+
+# Row tags, the content of row
+ROW_BLANK = 0
+ROW_SET = 1
+ROW_EXERCISE = 2
+ROW_EXERCISE_REPS = 3
+ROW_EXERCISE_WEIGHT = 4
+ROW_CONTENT = 0x7
+# Row tags, the row is the first or the last in week or workout
+ROW_WEEK_BEGIN = 0x8
+ROW_WEEK_END = 0x10
+ROW_WORKOUT_BEGIN = 0x20
+ROW_WORKOUT_END = 0x40
+
 
 class GoogleSheetsAdapter:
     """
@@ -26,12 +47,15 @@ class GoogleSheetsAdapter:
     def parse_merges(self, merges, values):
         """
         Parses merges in order to determine week indexes (begins and ends).
+
+        Rows not covered by a workout merge are one-row workouts. Merged and
+        one-row workouts are collected in a single sweep over sorted merges.
         """
 
         # list of weeks index pairs (begin, end)
         week_indexes = []
-        # list of workout index pairs (begin, end)
-        day_indexes = []
+        # list of merged workout index pairs (begin, end)
+        merged_day_indexes = []
 
         for merge in merges:
             if merge["startColumnIndex"] == 0 and merge["endColumnIndex"] == 1:
@@ -41,22 +65,25 @@ class GoogleSheetsAdapter:
             if merge["startColumnIndex"] == 1 and merge["endColumnIndex"] == 2:
                 start_day_index = merge["startRowIndex"] - 1
                 end_day_index = merge["endRowIndex"] - 1
-                day_indexes.append((start_day_index,
-                                    end_day_index))
+                merged_day_indexes.append((start_day_index,
+                                           end_day_index))
         week_indexes.sort()
-        day_indexes.sort()
+        merged_day_indexes.sort()
 
-        workout_num = 0
+        # list of workout index pairs (begin, end)
+        day_indexes = []
+        merged_num = 0
         i = 0
         while i < len(values):
-            if len(day_indexes) <= workout_num \
-                    or i < day_indexes[workout_num][0]:
+            if len(merged_day_indexes) <= merged_num \
+                    or i < merged_day_indexes[merged_num][0]:
                 day_indexes.append((i, i + 1))
-                day_indexes.sort()
                 i += 1
             else:
-                i = day_indexes[workout_num][1]
-            workout_num += 1
+                day_indexes.append(merged_day_indexes[merged_num])
+                i = merged_day_indexes[merged_num][1]
+                merged_num += 1
+        day_indexes.extend(merged_day_indexes[merged_num:])
 
         return week_indexes, day_indexes
 
@@ -65,10 +92,8 @@ class GoogleSheetsAdapter:
         Parses week date and comment.
         """
 
-        dates, week_comment = re.split(
-            r"(^\d{1,2}\.?\d{0,2}-\d{1,2}\.\d{1,2})",
-            to_parse,
-            maxsplit=1)[1:]
+        dates, week_comment = WEEK_DATES_PATTERN.split(to_parse,
+                                                       maxsplit=1)[1:]
         start_date, end_date = dates.split('-')
         if '.' in start_date:
             start_day, start_month = [int(x) for x in start_date.split('.')]
@@ -127,7 +152,7 @@ class GoogleSheetsAdapter:
         if to_parse and to_parse[0].isdigit():
             # it's a workout
             num, workout_description = \
-                re.split(r"(^\d+)", to_parse, maxsplit=1)[1:]
+                WORKOUT_NUMBER_PATTERN.split(to_parse, maxsplit=1)[1:]
             workout_number = int(num)
         else:
             # it's a homework
@@ -135,6 +160,63 @@ class GoogleSheetsAdapter:
             workout_description = to_parse
         return workout_number, workout_description
 
+    def classify_row_content(self, row):
+        """
+        Returns the content tag of the row, one of ROW_BLANK, ROW_SET,
+        ROW_EXERCISE, ROW_EXERCISE_REPS, ROW_EXERCISE_WEIGHT.
+        """
+
+        length = len(row)
+        if length > 2 and SET_PATTERN.match(row[2]):
+            return ROW_SET
+        if length >= 5:
+            return ROW_EXERCISE_WEIGHT
+        if length == 4:
+            return ROW_EXERCISE_REPS
+        if length == 3:
+            return ROW_EXERCISE
+        return ROW_BLANK
+
+    def classify_rows(self, merges, values):
+        """
+        Tags every row with its content and with week and workout boundaries
+        in one pass.
+
+        Yields pairs (row, tag), ROW_CONTENT bits of the tag are one of
+        ROW_BLANK, ROW_SET, ROW_EXERCISE, ROW_EXERCISE_REPS,
+        ROW_EXERCISE_WEIGHT, other bits are ROW_WEEK_BEGIN, ROW_WEEK_END,
+        ROW_WORKOUT_BEGIN, ROW_WORKOUT_END.
+
+        A week or a workout ends on its last row or on the last row of the
+        page if it is not complete. Rows out of any week merge get no week
+        boundaries, so a page without week merges has no weeks.
+        """
+
+        week_indexes, workout_indexes = self.parse_merges(merges, values)
+        weeks = iter(week_indexes)
+        workouts = iter(workout_indexes)
+        # (begin, end) of the current or the next week and workout, None if
+        # there are no more
+        week = next(weeks, None)
+        workout = next(workouts, None)
+
+        last_row = len(values) - 1
+        for i, row in enumerate(values):
+            tag = self.classify_row_content(row)
+            if workout is not None and i == workout[0]:
+                tag |= ROW_WORKOUT_BEGIN
+            if week is not None and i == week[0]:
+                tag |= ROW_WEEK_BEGIN
+            if workout is not None and i >= workout[0] \
+                    and i in (workout[1] - 1, last_row):
+                tag |= ROW_WORKOUT_END
+                workout = next(workouts, None)
+            if week is not None and i >= week[0] \
+                    and i in (week[1] - 1, last_row):
+                tag |= ROW_WEEK_END
+                week = next(weeks, None)
+            yield row, tag
+
     def parse_table_page(self, merges, values):
         """
         Parses google spreadsheet page with a training program.
@@ -143,47 +225,39 @@ class GoogleSheetsAdapter:
         Retruns list_of_week_workouts
         """
 
+        week_routines = []
         week_routine = WeekRoutine(date.today(), date.today(), 0, [], "")
         workout = Workout("", [], 0)
         workout_set = Set("", 0, [])
         workout_actual_number = 0  # actual workout number including homework
 
-        week_indexes, workout_indexes = self.parse_merges(merges, values)
-
-        all_weeks = []
-        current_week = 0
-        current_workout = 0
-        for i, row in enumerate(values):
-            # Set
-            if len(row) > 2 and re.match(r"^\d+\\", row[2]):
+        week_number = 0
+        for row, tag in self.classify_rows(merges, values):
+            content = tag & ROW_CONTENT
+            if content == ROW_SET:
                 # it is a set description if starts with set number
-                # if set_number != 0:
                 workout.sets.append(workout_set)
                 workout_set = self.parse_workout_set(row)
-            else:
+            elif content == ROW_EXERCISE_WEIGHT:
                 # it is an exercise with reps window and weight
-                if len(row) >= 5:
-                    workout_set.exercises.append(
-                        Exercise(
-                            row[2].strip(),
-                            row[3].strip(),
-                            row[4].strip()
-                        )
-                    )
+                workout_set.exercises.append(Exercise(
+                    intern(row[2].strip()),
+                    intern(row[3].strip()),
+                    intern(row[4].strip())
+                ))
+            elif content == ROW_EXERCISE_REPS:
                 # it is an exercise with reps window
-                if len(row) == 4:
-                    # exercise reps present
-                    workout_set.exercises.append(
-                        Exercise(row[2].strip(), row[3].strip())
-                    )
-                # it is an exercise with reps window only
-                elif len(row) == 3:
-                    # exercise reps not present
-                    workout_set.exercises.append(Exercise(row[2].strip()))
-                # otherwise empty string - no exercise
+                workout_set.exercises.append(Exercise(
+                    intern(row[2].strip()),
+                    intern(row[3].strip())
+                ))
+            elif content == ROW_EXERCISE:
+                # exercise reps not present
+                workout_set.exercises.append(Exercise(intern(row[2].strip())))
+            # otherwise empty string - no exercise
 
             # workout begin
-            if i == workout_indexes[current_workout][0]:
+            if tag & ROW_WORKOUT_BEGIN:
                 workout.sets = []
                 # if not an empty workout
                 if len(row) >= 2:
@@ -193,11 +267,11 @@ class GoogleSheetsAdapter:
                         self.parse_workout(row[1])
 
             # begin of week
-            if i == week_indexes[current_week][0]:
+            if tag & ROW_WEEK_BEGIN:
                 week_routine = self.parse_week_begin(row[0])
 
             # Workout end
-            if i in (workout_indexes[current_workout][1] - 1, len(values) - 1):
+            if tag & ROW_WORKOUT_END:
                 workout.sets.append(workout_set)
                 workout_set = Set("", 0, [])
                 workout.actual_number = workout_actual_number
@@ -205,13 +279,15 @@ class GoogleSheetsAdapter:
                 if not workout.empty():
                     week_routine.workouts.append(workout)
                 workout = Workout("", [], 0)
-                current_workout += 1
 
             # end of week
-            if i in (week_indexes[current_week][1] - 1, len(values) - 1):
-                current_week += 1
-                week_routine.number = current_week
-                all_weeks.append(week_routine)
+            if tag & ROW_WEEK_END:
+                week_number += 1
+                week_routine.number = week_number
                 workout_actual_number = 0
+                week_routines.append(week_routine)
+                # rows out of weeks do not change the stored week
+                week_routine = WeekRoutine(date.today(), date.today(), 0,
+                                           [], "")
 
-        return all_weeks
+        return week_routines
@@ -2,18 +2,65 @@
 The feeder provides data from Google sheets.
 """
 
+import hashlib
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
 from data_model.workout_plans import WorkoutTable, WorkoutPlans
 
+# Number of tables loaded concurrently
+DEFAULT_LOADING_WORKERS = 4
+
 
 class GoogleSheetsFeeder:
     """
     Loads and transforms data from Google Spreadsheets.
+
+    If statistics is set, duration of workout tables reload is recorded.
     """
 
-    def __init__(self, loader, adapter):
+    def __init__(self, loader, adapter, max_workers=DEFAULT_LOADING_WORKERS,
+                 statistics=None):
         self.loader = loader
         self.adapter = adapter
+        self.max_workers = max_workers
+        self.statistics = statistics
+        # map (table_id, page_name) -> (fingerprint, parsed weeks)
+        self.__parsed_pages = {}
+        self.__parsed_pages_lock = threading.Lock()
+
+    @staticmethod
+    def get_page_fingerprint(merges, values):
+        """
+        Returns hash of raw page data.
+        """
+
+        # week dates are parsed for the current year, so the page is parsed
+        # again when the year changes
+        raw = repr((date.today().year, merges, values))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def parse_page(self, table_id, page_name, merges, values):
+        """
+        Parses table page if it has changed since the last parsing. Otherwise,
+        returns the previously parsed weeks.
+        """
+
+        fingerprint = self.get_page_fingerprint(merges, values)
+        with self.__parsed_pages_lock:
+            parsed = self.__parsed_pages.get((table_id, page_name))
+        if parsed is not None and parsed[0] == fingerprint:
+            logging.info("Not changed %s - %s", table_id, page_name)
+            return parsed[1]
+
+        logging.info("Parsing %s - %s", table_id, page_name)
+        all_weeks = self.adapter.parse_table_page(merges, values)
+        with self.__parsed_pages_lock:
+            self.__parsed_pages[(table_id, page_name)] = (fingerprint,
+                                                          all_weeks)
+        return all_weeks
 
     def get_exercise_links(self, table_id, page_name):
         """
@@ -28,31 +75,62 @@ class GoogleSheetsFeeder:
         Parses a single workout table from Google Spreadsheet document.
         """
 
-        table = WorkoutTable(table_id, "", {})
+        start = time.perf_counter()
+        page_names = list(page_names)
+        text = (
+            "Loading "
+            "https://docs.google.com/spreadsheets/d/"
+            f"{table_id}/edit#gid=0 - {page_names}"
+        )
+        logging.info(text)
+        (table_name, pages) = self.loader \
+            .get_table_values_and_merges(table_id, page_names)
+        table = WorkoutTable(table_id, table_name, {})
         for page_name in page_names:
-            text = (
-                "Loading "
-                "https://docs.google.com/spreadsheets/d/"
-                f"{table_id}/edit#gid=0 - \"{page_name}\""
-            )
-            logging.info(text)
-            (table_name, merges, values) = self.loader \
-                .get_values_and_merges(table_id, page_name)
-            table.table_name = table_name
-            logging.info("Parsing %s - %s", table_name, page_name)
-            all_weeks = self.adapter.parse_table_page(merges, values)
-            table.pages[page_name] = all_weeks
+            merges, values = pages[page_name]
+            table.pages[page_name] = self.parse_page(table_id, page_name,
+                                                     merges, values)
             logging.info("Loaded %s - %s", table_name, page_name)
+        if self.statistics is not None:
+            self.statistics.record_table_reload(table_id,
+                                                time.perf_counter() - start)
         return table
 
-    def get_workouts(self, workout_tables):
+    def get_workouts(self, workout_tables, previous_plans=None):
         """
         Loads workouts.
+
+        Tables are loaded concurrently by at most max_workers threads. If a
+        table fails to load, the error is logged and the table from
+        previous_plans is kept if present. Only changed pages are parsed.
         """
 
         plans = WorkoutPlans()
-        for table_id, page_names in workout_tables.get_tables().items():
-            plans.update_workout_table(self.get_workout_table(table_id,
-                                                              page_names))
+        tables = [(table_id, list(page_names)) for table_id, page_names
+                  in workout_tables.get_tables().items()]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self.get_workout_table, table_id, page_names):
+                table_id
+                for table_id, page_names in tables
+            }
+            for future in as_completed(futures):
+                table_id = futures[future]
+                try:
+                    plans.update_workout_table(future.result())
+                except Exception:  # pylint: disable=broad-exception-caught
+                    logging.exception("Failed to load table %s", table_id)
+                    if previous_plans is not None and \
+                            previous_plans.is_table_id_present(table_id):
+                        plans.update_workout_table(
+                            previous_plans.get_workout_table(table_id)
+                        )
+
+        # forget pages that are not loaded anymore
+        loaded_pages = {(table_id, page_name) for table_id, page_names
+                        in tables for page_name in page_names}
+        with self.__parsed_pages_lock:
+            for key in set(self.__parsed_pages) - loaded_pages:
+                del self.__parsed_pages[key]
 
         return plans
@@ -3,7 +3,10 @@ Loads Google spreadsheets.
 """
 
 import logging
+import threading
+import time
 
+from contextlib import contextmanager
 from pathlib import Path
 
 from google.auth.transport.requests import Request
@@ -17,11 +20,37 @@ SCOPES = ['https://www.googleapis.com/auth/spreadsheets.readonly']
 GOOGLE_TOKEN_FILENAME = 'secrets/google_token.json'
 
 
+def get_range_title(range_name):
+    """
+    Returns sheet title of A1 notation range, for example `Plan` for
+    `'Plan'!A1:E100`.
+    """
+
+    title = range_name.rsplit("!", 1)[0]
+    if len(title) > 1 and title.startswith("'") and title.endswith("'"):
+        title = title[1:-1].replace("''", "'")
+    return title
+
+
 class GoogleSheetsLoader:
     """
     Loads raw data from Google sheets.
+
+    Credentials are read once and refreshed in memory when expired. Sheets
+    services are built once and reused, each service is used by one thread
+    at a time.
+
+    If statistics is set, the number, duration and errors of requests are
+    recorded.
     """
 
+    def __init__(self, statistics=None):
+        self.statistics = statistics
+        self.__credentials = None
+        # services not used by any thread at the moment
+        self.__idle_services = []
+        self.__lock = threading.Lock()
+
     def get_credentials(self, google_token_file):
         """
         Reads google credentials from token file.
@@ -47,23 +76,77 @@ class GoogleSheetsLoader:
 
         return creds
 
+    def get_authorized_credentials(self):
+        """
+        Returns valid credentials, reads them from the token file only once.
+        """
+
+        with self.__lock:
+            if self.__credentials is None:
+                self.__credentials = self.get_credentials(
+                    GOOGLE_TOKEN_FILENAME
+                )
+            elif not self.__credentials.valid:
+                self.__credentials.refresh(Request())
+            return self.__credentials
+
+    @contextmanager
+    def service(self):
+        """
+        Provides Sheets service for exclusive use by the calling thread.
+        Builds a new one only if all the services are in use.
+        """
+
+        creds = self.get_authorized_credentials()
+        with self.__lock:
+            service = self.__idle_services.pop() \
+                if self.__idle_services else None
+        if service is None:
+            service = build("sheets", "v4", credentials=creds)
+        try:
+            yield service
+        finally:
+            with self.__lock:
+                self.__idle_services.append(service)
+
+    def execute(self, method, request):
+        """
+        Executes Sheets API request and records its statistics.
+        """
+
+        start = time.perf_counter()
+        failed = False
+        try:
+            return request.execute()
+        except HttpError:
+            failed = True
+            raise
+        finally:
+            if self.statistics is not None:
+                self.statistics.record_sheets_request(
+                    method,
+                    time.perf_counter() - start,
+                    failed
+                )
+
     def get_values(self, spreadsheet_id, pagename):
         """
         Reads values B:C from google table.
         """
         range_name = pagename + "!B:C"
-        creds = self.get_credentials(GOOGLE_TOKEN_FILENAME)
 
         try:
-            service = build("sheets", "v4", credentials=creds)
+            with self.service() as service:
+                # Call the Sheets API
+                # pylint: disable=E1101
+                sheet = service.spreadsheets()
 
-            # Call the Sheets API
-            # pylint: disable=E1101
-            sheet = service.spreadsheets()
-
-            # get values
-            result = sheet.values().get(spreadsheetId=spreadsheet_id,
-                                        range=range_name).execute()
+                # get values
+                result = self.execute(
+                    "spreadsheets.values.get",
+                    sheet.values().get(spreadsheetId=spreadsheet_id,
+                                       range=range_name)
+                )
             values = result.get("values", [])
 
             return values[1:]
@@ -81,23 +164,27 @@ class GoogleSheetsLoader:
         return spreadsheet cells merges and values
         """
         range_name = pagename + '!A:E'
-        creds = self.get_credentials(GOOGLE_TOKEN_FILENAME)
 
         try:
-            service = build("sheets", "v4", credentials=creds)
-
-            # Call the Sheets API
-            # pylint: disable=E1101
-            sheet = service.spreadsheets()
+            with self.service() as service:
+                # Call the Sheets API
+                # pylint: disable=E1101
+                sheet = service.spreadsheets()
 
-            # get cell merges
-            result_merges = sheet.get(spreadsheetId=spreadsheet_id,
-                                      ranges=range_name,
-                                      includeGridData=False).execute()
+                # get cell merges
+                result_merges = self.execute(
+                    "spreadsheets.get",
+                    sheet.get(spreadsheetId=spreadsheet_id,
+                              ranges=range_name,
+                              includeGridData=False)
+                )
 
-            # get values
-            result = sheet.values().get(spreadsheetId=spreadsheet_id,
-                                        range=range_name).execute()
+                # get values
+                result = self.execute(
+                    "spreadsheets.values.get",
+                    sheet.values().get(spreadsheetId=spreadsheet_id,
+                                       range=range_name)
+                )
             values = result.get("values", [])
 
             return (result_merges["properties"]["title"],
@@ -107,20 +194,81 @@ class GoogleSheetsLoader:
             logging.error(err)
             return None
 
+    def get_table_values_and_merges(self, spreadsheet_id, pagenames):
+        """
+        Reads several pages of google spreadsheet in specific format with two
+        requests for all the pages.
+
+        str spreadsheet_id -- is an id of the table, can be found in page http
+        list pagenames -- names of table pages
+        return table name and map {pagename: (cells merges, values)}
+        """
+        range_names = [pagename + '!A:E' for pagename in pagenames]
+
+        try:
+            with self.service() as service:
+                # Call the Sheets API
+                # pylint: disable=E1101
+                sheet = service.spreadsheets()
+
+                # get cell merges of all pages
+                result_merges = self.execute("spreadsheets.get", sheet.get(
+                    spreadsheetId=spreadsheet_id,
+                    ranges=range_names,
+                    includeGridData=False,
+                    fields="properties.title,sheets(properties.title,merges)"
+                ))
+
+                # get values of all pages
+                result = self.execute(
+                    "spreadsheets.values.batchGet",
+                    sheet.values().batchGet(spreadsheetId=spreadsheet_id,
+                                            ranges=range_names)
+                )
+
+            return result_merges["properties"]["title"], \
+                self.match_pages(spreadsheet_id, pagenames,
+                                 result_merges.get("sheets", []),
+                                 result["valueRanges"])
+
+        except HttpError as err:
+            logging.error(err)
+            return None
+
+    def match_pages(self, spreadsheet_id, pagenames, sheets, value_ranges):
+        """
+        Matches sheets metadata and value ranges of the requested pages.
+        Returns map {pagename: (cells merges, values)}.
+        """
+
+        merges = {}
+        for sheet in sheets:
+            merges[sheet["properties"]["title"]] = sheet.get("merges", [])
+        pages = {}
+        for pagename, value_range in zip(pagenames, value_ranges):
+            values = value_range.get("values", [])
+            # the range has the sheet title as it is in the spreadsheet
+            title = get_range_title(value_range.get("range", pagename))
+            if title not in merges:
+                logging.warning("No sheet %s in %s, page %s is parsed "
+                                "without merges", title, spreadsheet_id,
+                                pagename)
+            pages[pagename] = (merges.get(title, []), values[1:])
+        return pages
+
     def get_sheet_names(self, spreadsheet_id):
         """
         Loads google sheet names from spreadsheet.
         """
 
-        creds = self.get_credentials(GOOGLE_TOKEN_FILENAME)
-
         try:
-            service = build("sheets", "v4", credentials=creds)
-
-            # Call the Sheets API
-            # pylint: disable=E1101
-            sheet_metadata = service.spreadsheets() \
-                .get(spreadsheetId=spreadsheet_id).execute()
+            with self.service() as service:
+                # Call the Sheets API
+                # pylint: disable=E1101
+                sheet_metadata = self.execute(
+                    "spreadsheets.get",
+                    service.spreadsheets().get(spreadsheetId=spreadsheet_id)
+                )
             sheets = sheet_metadata.get("sheets", "")
             result = []
             for sheet in sheets:
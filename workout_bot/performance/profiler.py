@@ -0,0 +1,133 @@
+"""
+Opt-in timing of hot paths.
+"""
+
+import functools
+import threading
+import time
+from collections import deque
+
+# Number of the latest calls kept for every path
+DEFAULT_WINDOW = 1000
+# Number of paths in the report
+DEFAULT_TOP = 10
+
+
+class Profiler:
+    """
+    Keeps wall time of the latest calls for every profiled path.
+
+    Disabled by default, then profiled functions only check the flag.
+    """
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.enabled = False
+        self.window = window
+        # map path -> deque of the latest call durations in seconds
+        self.__samples = {}
+        # map path -> total number of calls
+        self.__calls = {}
+        self.__lock = threading.Lock()
+
+    def record(self, path, seconds):
+        """
+        Records call duration of path.
+        """
+
+        with self.__lock:
+            samples = self.__samples.get(path)
+            if samples is None:
+                samples = deque(maxlen=self.window)
+                self.__samples[path] = samples
+                self.__calls[path] = 0
+            samples.append(seconds)
+            self.__calls[path] += 1
+
+    def reset(self):
+        """
+        Forgets all recorded calls.
+        """
+
+        with self.__lock:
+            self.__samples.clear()
+            self.__calls.clear()
+
+    def get_top(self, number=DEFAULT_TOP):
+        """
+        Returns the slowest paths by 95th percentile of the latest calls as
+        list of tuples (path, calls, mean, median, p95, max), durations are
+        in seconds.
+        """
+
+        with self.__lock:
+            snapshot = [(path, self.__calls[path], sorted(samples))
+                        for path, samples in self.__samples.items()]
+        top = []
+        for path, calls, samples in snapshot:
+            top.append((
+                path,
+                calls,
+                sum(samples) / len(samples),
+                samples[len(samples) // 2],
+                samples[min(len(samples) - 1, len(samples) * 95 // 100)],
+                samples[-1]
+            ))
+        top.sort(key=lambda stats: stats[4], reverse=True)
+        return top[:number]
+
+    def format_top(self, number=DEFAULT_TOP):
+        """
+        Returns text report of the slowest paths, durations in milliseconds.
+        """
+
+        lines = ["path calls mean p50 p95 max"]
+        for path, calls, mean, median, p95, maximum in self.get_top(number):
+            lines.append(
+                f"{path} {calls} {mean * 1000:.2f} {median * 1000:.2f} "
+                f"{p95 * 1000:.2f} {maximum * 1000:.2f}"
+            )
+        return "\n".join(lines)
+
+    def profiled(self, path):
+        """
+        Decorator recording call duration of function to path.
+        """
+
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.record(path, time.perf_counter() - start)
+
+            return wrapper
+
+        return decorator
+
+    def profiled_async(self, path):
+        """
+        Decorator recording call duration of coroutine function to path.
+        """
+
+        def decorator(function):
+            @functools.wraps(function)
+            async def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return await function(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return await function(*args, **kwargs)
+                finally:
+                    self.record(path, time.perf_counter() - start)
+
+            return wrapper
+
+        return decorator
+
+
+# The profiler of the application, enabled by `profiling` configuration
+profiler = Profiler()
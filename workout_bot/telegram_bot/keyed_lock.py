@@ -0,0 +1,43 @@
+"""
+Asyncio lock by key.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+
+class KeyedLock:
+    """
+    Holds a separate asyncio lock for every key. Coroutines holding the same
+    key run one by one in the order they acquired it, coroutines with
+    different keys run concurrently.
+
+    A lock exists only while it is held or awaited, so the number of locks
+    does not grow with the number of keys ever used.
+    """
+
+    def __init__(self):
+        # map key -> [lock, number of holding and waiting coroutines]
+        self.__locks = {}
+
+    def __len__(self):
+        return len(self.__locks)
+
+    @asynccontextmanager
+    async def acquire(self, key):
+        """
+        Holds the lock of the key within the context.
+        """
+
+        entry = self.__locks.get(key)
+        if entry is None:
+            entry = [asyncio.Lock(), 0]
+            self.__locks[key] = entry
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self.__locks[key]
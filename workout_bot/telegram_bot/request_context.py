@@ -0,0 +1,55 @@
+"""
+Data of one update shared by filters and handlers.
+"""
+
+
+class RequestContext:
+    """
+    Wraps telegram Update for the time of its handling.
+
+    Attributes not defined here are taken from the update, so the request
+    context is passed to controllers in place of the update. The user context
+    and the plan validity are loaded from storage once, when first needed.
+    """
+
+    def __init__(self, data_model, update, telegram_user, text=""):
+        """
+        telegram_user - sender of the message or the inline query,
+        text - message text.
+        """
+
+        self.update = update
+        self.data_model = data_model
+        self.user_id = telegram_user.id
+        # normalized message text
+        self.text = text.strip().lower()
+        self.__user_context = None
+        self.__plan_valid = None
+
+    def __getattr__(self, name):
+        return getattr(self.update, name)
+
+    @property
+    def user_context(self):
+        """
+        UserContext of the sender, created if the sender is unknown.
+        """
+
+        if self.__user_context is None:
+            self.__user_context = self.data_model.users \
+                .get_or_create_user_context(self.user_id)
+        return self.__user_context
+
+    @property
+    def plan_valid(self):
+        """
+        True if the table and the page chosen by the user are present.
+        """
+
+        if self.__plan_valid is None:
+            table_id = self.user_context.current_table_id
+            current_page = self.user_context.current_page
+            table_names = self.data_model.workout_table_names
+            self.__plan_valid = table_names.is_table_present(table_id) \
+                and table_names.is_plan_present(table_id, current_page)
+        return self.__plan_valid
@@ -2,19 +2,68 @@
 Telegram bot related code resides here.
 """
 
+import functools
 from telegram import Update
 from telegram.ext import (
-    filters, ContextTypes, CommandHandler, MessageHandler, CallbackQueryHandler
+    filters, ApplicationBuilder, ContextTypes, CommandHandler, MessageHandler,
+    CallbackQueryHandler
 )
 from controllers.controllers import Controllers
 from controllers.training_management import start_training
 from data_model.users import UserAction
+from performance.profiler import profiler
 from view.utils import escape_text
+from telegram_bot.keyed_lock import KeyedLock
+from telegram_bot.request_context import RequestContext
+from telegram_bot.update_queue import PendingUpdatesQueue
+
+# Default address of the webhook listener, a reverse proxy terminating TLS
+# forwards Telegram requests to it
+WEBHOOK_LISTEN = "127.0.0.1"
+WEBHOOK_PORT = 8443
+# Maximum simultaneous connections of Telegram to the webhook, the same as
+# Telegram uses by default
+WEBHOOK_MAX_CONNECTIONS = 40
+
+
+def build_application(token, request, concurrent_updates, pending_updates):
+    """
+    Builds telegram application handling up to concurrent_updates at once.
+    Receiving of updates is paused while pending_updates are not handled.
+    """
+
+    return ApplicationBuilder() \
+        .token(token) \
+        .request(request) \
+        .concurrent_updates(concurrent_updates) \
+        .update_queue(PendingUpdatesQueue(pending_updates)) \
+        .build()
+
+
+def webhook_arguments(webhook):
+    """
+    Returns arguments of the webhook listener for the webhook config section.
+    Telegram sends updates to the public url, the listener accepts only
+    requests with the secret token.
+    """
+
+    return {
+        "listen": webhook.get("listen", WEBHOOK_LISTEN),
+        "port": webhook.get("port", WEBHOOK_PORT),
+        "url_path": webhook.get("url_path", ""),
+        "webhook_url": webhook["url"],
+        "secret_token": webhook["secret_token"],
+        "max_connections": webhook.get("max_connections",
+                                       WEBHOOK_MAX_CONNECTIONS)
+    }
 
 
 class TelegramBot:
     """
     Telegram bot class.
+
+    Updates may be handled concurrently, updates of one chat are handled one
+    by one in order of arrival.
     """
 
     def __init__(self, application, loader, data_model, version):
@@ -22,30 +71,52 @@ class TelegramBot:
         self.bot = application.bot
         self.data_model = data_model
         self.version = version
+        self.chat_locks = KeyedLock()
 
         # init controllers
         self.controllers = Controllers(loader, data_model)
 
         self.telegram_application.add_handler(
-            CommandHandler("start", self.handle_start)
+            CommandHandler("start", self.serialized(self.handle_start))
+        )
+
+        self.telegram_application.add_handler(
+            CommandHandler("system_stats",
+                           self.serialized(self.handle_system_stats))
         )
 
         self.telegram_application.add_handler(
-            CommandHandler("system_stats", self.handle_system_stats)
+            CommandHandler("about", self.serialized(self.handle_command_about))
         )
 
         self.telegram_application.add_handler(
-            CommandHandler("about", self.handle_command_about)
+            CommandHandler("profile", self.serialized(self.handle_profile))
         )
 
         self.telegram_application.add_handler(
-            MessageHandler(filters.TEXT, self.handle_message)
+            MessageHandler(filters.TEXT, self.serialized(self.handle_message))
         )
 
         self.telegram_application.add_handler(
-            CallbackQueryHandler(self.handle_query)
+            CallbackQueryHandler(self.serialized(self.handle_query))
         )
 
+    def serialized(self, handler):
+        """
+        Wraps update handler, so updates of the same chat are handled one by
+        one in order of arrival.
+        """
+
+        @functools.wraps(handler)
+        async def wrapper(update, context):
+            chat = update.effective_chat
+            if chat is None:
+                return await handler(update, context)
+            async with self.chat_locks.acquire(chat.id):
+                return await handler(update, context)
+
+        return wrapper
+
     async def register_commands(self):
         """
         Registers the list of commands.
@@ -59,12 +130,18 @@ class TelegramBot:
             ]
         )
 
-    def start_bot(self):
+    def start_bot(self, webhook=None):
         """
-        Starts telegram bot and enters infinity polling loop.
+        Starts telegram bot and enters infinity polling loop. If webhook
+        config section is set, serves the webhook instead.
         """
 
-        self.telegram_application.run_polling()
+        if webhook is None:
+            self.telegram_application.run_polling()
+        else:
+            self.telegram_application.run_webhook(
+                **webhook_arguments(webhook)
+            )
 
     async def handle_start(
             self,
@@ -93,10 +170,8 @@ class TelegramBot:
         user_context.current_week = None
         user_context.current_workout = None
 
-        if not (self.data_model.users
-                .is_user_awaiting_authorization(user_context.user_id)
-                or self.data_model.users
-                .is_user_blocked(user_context.user_id)):
+        if user_context.action not in (UserAction.AWAITING_AUTHORIZATION,
+                                       UserAction.BLOCKED):
             user_context.action = UserAction.CHOOSING_PLAN
             self.data_model.users.set_user_context(user_context)
             await start_training(self.data_model, update, context)
@@ -129,7 +204,33 @@ class TelegramBot:
             text += str(self.data_model.statistics.get_total_commands()) + "\n"
             text += "Количество пользователей: "
             text += str(self.data_model.users.get_users_number()) + "\n"
+            message_cache = self.data_model.message_cache
+            text += "Кэш сообщений: "
+            text += f"попаданий {message_cache.get_hits()}, "
+            text += f"промахов {message_cache.get_misses()}\n"
+
+        await self.bot.send_message(update.effective_chat.id, text)
+
+    async def handle_profile(
+            self,
+            update: Update,
+            _context: ContextTypes.DEFAULT_TYPE
+    ):
+        """
+        Handler for admin command /profile shows the slowest handlers,
+        rendering and storage calls.
+        """
 
+        self.data_model.statistics.record_command()
+        user_context = self.data_model \
+            .users.get_user_context(update.message.from_user.id)
+        if not (user_context and user_context.administrative_permission):
+            return
+
+        if profiler.enabled:
+            text = "Самые медленные вызовы, мс:\n" + profiler.format_top()
+        else:
+            text = "Профилирование выключено"
         await self.bot.send_message(update.effective_chat.id, text)
 
     async def handle_command_about(
@@ -162,11 +263,14 @@ class TelegramBot:
         """
 
         self.data_model.statistics.record_request()
-        await self.controllers.handle_message(
-            self.data_model,
-            update,
-            context
-        )
+        request = RequestContext(self.data_model, update,
+                                 update.message.from_user, update.message.text)
+        with self.data_model.pinned_workout_plans():
+            await self.controllers.handle_message(
+                self.data_model,
+                request,
+                context
+            )
 
     async def handle_query(self, update: Update,
                            context: ContextTypes.DEFAULT_TYPE):
@@ -175,5 +279,8 @@ class TelegramBot:
         """
 
         query = update.callback_query
-        await self.controllers.handle_query(self.data_model, update, context)
+        request = RequestContext(self.data_model, update, query.from_user)
+        with self.data_model.pinned_workout_plans():
+            await self.controllers.handle_query(self.data_model, request,
+                                                context)
         await query.answer()
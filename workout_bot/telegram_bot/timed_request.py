@@ -0,0 +1,35 @@
+"""
+Telegram Bot API requests with latency statistics.
+"""
+
+import time
+from telegram.request import HTTPXRequest
+
+# Number of concurrent Bot API connections, the same as python-telegram-bot
+# uses by default
+CONNECTION_POOL_SIZE = 256
+
+
+class TimedRequest(HTTPXRequest):
+    """
+    Records duration of every Bot API request by its method, for example
+    `sendMessage`.
+    """
+
+    def __init__(self, statistics, connection_pool_size=CONNECTION_POOL_SIZE):
+        super().__init__(connection_pool_size=connection_pool_size)
+        self.statistics = statistics
+
+    async def do_request(self, url, method, *args, **kwargs):
+        """
+        Makes the request and records its duration.
+        """
+
+        start = time.perf_counter()
+        try:
+            return await super().do_request(url, method, *args, **kwargs)
+        finally:
+            self.statistics.record_telegram_request(
+                url.rsplit("/", 1)[-1],
+                time.perf_counter() - start
+            )
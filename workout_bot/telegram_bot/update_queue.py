@@ -0,0 +1,42 @@
+"""
+Queue of received Telegram updates with backpressure.
+"""
+
+import asyncio
+
+
+class PendingUpdatesQueue(asyncio.Queue):
+    """
+    Update queue bounded by the number of pending updates, received and not
+    handled yet.
+
+    With concurrent updates the application takes an update from the queue
+    as soon as it arrives and handles it in a task, task_done() is called
+    when the update is handled. So maxsize of a plain queue never limits
+    anything. put() waits while the limit of updates is pending, so the
+    webhook does not answer Telegram and polling does not fetch the next
+    updates until the bot catches up.
+
+    Only put() is bounded, the application does not use put_nowait().
+    """
+
+    def __init__(self, limit):
+        super().__init__()
+        self.limit = limit
+        self.__free_slots = asyncio.Semaphore(limit)
+
+    async def put(self, item):
+        """
+        Waits for a free slot and puts the item into the queue.
+        """
+
+        await self.__free_slots.acquire()
+        self.put_nowait(item)
+
+    def task_done(self):
+        """
+        Marks the item as handled and frees its slot.
+        """
+
+        super().task_done()
+        self.__free_slots.release()
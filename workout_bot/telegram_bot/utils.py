@@ -2,11 +2,17 @@
 Helper functions.
 """
 
+from telegram_bot.request_context import RequestContext
+
 
 def get_user_context(data_model, update):
     """
     Helper function, returns user_context of message sender.
+
+    The user context of RequestContext is loaded once per update.
     """
 
+    if isinstance(update, RequestContext):
+        return update.user_context
     user_id = update.message.from_user.id
     return data_model.users.get_user_context(user_id)
@@ -2,9 +2,11 @@
 Representation of workouts.
 """
 
+from performance.profiler import profiler
 from .utils import escape_text
 
 
+@profiler.profiled("view.workouts.exercises_to_text_message")
 def exercises_to_text_message(data_model, exercise):
     """
     Returns single exercise text representation.
@@ -16,26 +18,19 @@ def exercises_to_text_message(data_model, exercise):
     if exercise.weight:
         text += f", вес {exercise.weight}"
     text += "\n"
-    text = escape_text(text)
-    # Exercise links ordered by length, the longest first.
-    # Find the longest match.
-    exercise_links = sorted(
-        list(data_model.exercise_links.get_exercise_links().items()),
-        key=lambda key: len(key[0]),
-        reverse=True
-    )
-    for name, link in exercise_links:
-        name = escape_text(name.lower())
-        if name in text.lower():
-            index_name = text.lower().index(name)
-            # preserve actual case in string
-            actual_name = text[index_name:index_name + len(name)]
-            link = f"[{actual_name}]({escape_text(link)})"
-            text = text[:index_name] + link + text[index_name + len(name):]
-            break
+    match = data_model.exercise_links.get_matcher().find(text)
+    if match is None:
+        return escape_text(text)
+    begin, end, link = match
+    # preserve actual case in string
+    actual_name = escape_text(text[begin:end])
+    text = escape_text(text[:begin]) \
+        + f"[{actual_name}]({escape_text(link)})" \
+        + escape_text(text[end:])
     return text
 
 
+@profiler.profiled("view.workouts.set_to_text_message")
 def set_to_text_message(data_model, workout_set):
     """
     Returns workout set text representation.
@@ -54,6 +49,7 @@ def set_to_text_message(data_model, workout_set):
     return text
 
 
+@profiler.profiled("view.workouts.workout_to_text_message")
 def workout_to_text_message(data_model, workout):
     """
     Returns workout text representation.
@@ -71,6 +67,7 @@ def workout_to_text_message(data_model, workout):
     return text
 
 
+@profiler.profiled("view.workouts.get_workout_text_message")
 def get_workout_text_message(data_model, table_id, page_name, week_number,
                              workout_number):
     """
@@ -85,6 +82,7 @@ def get_workout_text_message(data_model, table_id, page_name, week_number,
     return text
 
 
+@profiler.profiled("view.workouts.get_week_routine_text_message")
 def get_week_routine_text_message(data_model, table_id, page_name,
                                   week_number):
     """